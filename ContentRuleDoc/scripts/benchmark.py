@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the WordRun! level-generation pipeline.
+
+Stages (run in order, each in a fresh process):
+1. merge_phrases      - merge + dedupe batch CSVs
+2. calculate_ces      - batch CES
+3. calculate_pfs      - PFS + compiled index
+4. analyze_phrase_bank - early-game filter over the bank
+5. find_path          - Pathfinder.find_path from the top start words
+6. generate_levels    - full tier pipeline (tier 3 config)
+
+Datasets:
+- repo: the repo's batch CSVs and spoken PFS file (copied, never modified).
+  The pathfinder stages are skipped: the repo bank is a sample whose longest
+  chains fall well short of a 15-phrase level, so they would time nothing.
+- synthetic: synthetic_bank.py banks of N phrases with a given average
+  out-degree and degree distribution
+
+Per stage it records wall time, peak RSS and stage stats (pathfinder
+branches/backtracks/pruning). Results are compared against a stored
+baseline; a stage slower or larger than baseline by more than the tolerance
+is flagged as a regression, as is any drop in paths found or levels
+generated. Runs fully offline.
+
+Usage:
+    python benchmark.py                          # repo + 1k/10k/100k
+    python benchmark.py --sizes 1000,1000000 --avg-degree 3
+    python benchmark.py --save-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic_bank import DEGREE_DISTRIBUTIONS
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data")
+PHRASES_DIR = DATA_DIR / "phrases"
+BENCHMARK_DIR = DATA_DIR / "benchmarks"
+BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+RESULTS_FILE = BENCHMARK_DIR / "latest.json"
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_AVG_DEGREE = 3.0
+DEFAULT_TOLERANCE = 0.25      # 25% slower/larger than baseline = regression
+# Absolute slack on top of the tolerance, so timer noise on millisecond stages is not flagged
+MIN_REGRESSION = {"wall_s": 0.05, "peak_rss_mb": 5.0}
+# Stage stats where any drop below baseline is a regression (a faster stage that finds less is not a win)
+OUTPUT_STATS = ("paths_found", "levels")
+PATHFINDER_STARTS = 200       # find_path calls in the pathfinder stage
+PATH_LENGTH = 15
+# Stages not run on the repo dataset (no start word reaches PATH_LENGTH in the repo bank)
+REPO_SKIP_STAGES = {"find_path", "generate_levels"}
+
+# =============================================================================
+# DATASETS
+# =============================================================================
+
+def prepare_repo_dataset(workdir: Path):
+    """Copy the repo's source CSVs and spoken PFS file into workdir."""
+    from merge_phrases import BATCH_FILES, SCORED_FILE
+    for name in BATCH_FILES + [SCORED_FILE, "spoken_pfs_manual.json"]:
+        source = PHRASES_DIR / name
+        if source.exists():
+            shutil.copy(source, workdir / name)
+
+
+def prepare_synthetic_dataset(workdir: Path, num_phrases: int, avg_degree: float, degree_distribution: str = "poisson"):
+    """Write a synthetic bank (see synthetic_bank.py) as batch CSVs plus spoken PFS."""
+    from synthetic_bank import SyntheticConfig, generate_bank, write_batches, write_spoken_pfs
+
+    config = SyntheticConfig(
+        num_phrases=num_phrases,
+        num_words=max(2, int(num_phrases / avg_degree)),
+        degree_distribution=degree_distribution,
+    )
+    rows = generate_bank(config)
+    write_batches(rows, workdir)
+    write_spoken_pfs(rows, workdir / "spoken_pfs_manual.json")
+
+
+# =============================================================================
+# STAGES (each runs in its own process against workdir)
+# =============================================================================
+
+def stage_merge_phrases(workdir: Path) -> dict:
+    import merge_phrases
+    merge_phrases.DATA_DIR = workdir
+    merge_phrases.OUTPUT_FILE = workdir / "phrases_master.csv"
+    unique_phrases, duplicates = merge_phrases.merge_and_deduplicate()
+    return {"unique": len(unique_phrases), "duplicates": len(duplicates)}
+
+
+def stage_calculate_ces(workdir: Path) -> dict:
+    import calculate_ces
+    calculate_ces.MASTER_FILE = workdir / "phrases_master.csv"
+    calculate_ces.OUTPUT_FILE = workdir / "phrases_master_ces.csv"
+    calculate_ces.process_phrases()
+    return {}
+
+
+def stage_calculate_pfs(workdir: Path) -> dict:
+    import calculate_pfs
+    calculate_pfs.INPUT_FILE = workdir / "phrases_master_ces.csv"
+    calculate_pfs.OUTPUT_FILE = workdir / "phrases_master_pfs.csv"
+    calculate_pfs.process_phrases()
+    return {}
+
+
+def _use_workdir_filter_data(workdir: Path):
+    import early_filter
+    early_filter.INPUT_FILE = workdir / "phrases_master_pfs.csv"
+    early_filter.SPOKEN_PFS_FILE = workdir / "spoken_pfs_manual.json"
+    early_filter.STORE_FILE = workdir / "frequency_store.db"
+
+
+def stage_analyze_phrase_bank(workdir: Path) -> dict:
+    import early_filter
+    _use_workdir_filter_data(workdir)
+    early_filter.analyze_phrase_bank()
+    return {}
+
+
+def stage_find_path(workdir: Path) -> dict:
+    _use_workdir_filter_data(workdir)
+    from early_filter import create_filter_function
+    from generate_early_levels import TIER_CONFIG, rank_start_words
+    from pathfinder import Pathfinder
+    from phrase_index import open_index
+
+    with open_index(workdir / "phrases_master_pfs.csv") as index:
+        graph = index.to_graph()
+        source = index.path
+
+    config = TIER_CONFIG[3]
+    filter_func = create_filter_function(
+        config["entropy_cap"], config["min_pfs"], enforce_categories=False, source=source
+    )
+    pathfinder = Pathfinder(graph, filter_func=filter_func, max_reuse=1)
+
+    totals = {"calls": 0, "paths_found": 0, "branches": 0, "backtracks": 0, "dead_ends": 0, "pruned": 0}
+    for start_word, _ in rank_start_words(graph)[:PATHFINDER_STARTS]:
+        result = pathfinder.find_path(start_word, target_length=PATH_LENGTH, seed=42)
+        totals["calls"] += 1
+        totals["paths_found"] += result.stats.paths_found
+        totals["branches"] += result.stats.total_branches_explored
+        totals["backtracks"] += result.stats.backtracks
+        totals["dead_ends"] += result.stats.dead_ends
+        totals["pruned"] += result.stats.pruned
+    return totals
+
+
+def stage_generate_levels(workdir: Path) -> dict:
+    _use_workdir_filter_data(workdir)
+    import generate_early_levels
+    generate_early_levels.INPUT_FILE = workdir / "phrases_master_pfs.csv"
+    generate_early_levels.OUTPUT_FILE = workdir / "levels.json"
+    result = generate_early_levels.generate_levels(
+        num_levels=10, tier=3, seed=42, checkpoint_file=workdir / "levels.checkpoint.json"
+    )
+    return {"levels": len(result["levels"]) if result else 0}
+
+
+STAGES = [
+    ("merge_phrases", stage_merge_phrases),
+    ("calculate_ces", stage_calculate_ces),
+    ("calculate_pfs", stage_calculate_pfs),
+    ("analyze_phrase_bank", stage_analyze_phrase_bank),
+    ("find_path", stage_find_path),
+    ("generate_levels", stage_generate_levels),
+]
+
+
+def _peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _stage_process(stage_name: str, workdir: str, queue):
+    """Child process: run one stage quietly and report measurements."""
+    logging.disable(logging.WARNING)
+    stage_func = dict(STAGES)[stage_name]
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = stage_func(Path(workdir))
+        wall = time.perf_counter() - start
+        queue.put({"wall_s": round(wall, 4), "peak_rss_mb": round(_peak_rss_mb(), 1), "stats": stats})
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_stage(stage_name: str, workdir: Path) -> dict:
+    """Run a stage in a fresh (spawned) process so RSS is per stage."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_stage_process, args=(stage_name, str(workdir), queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+# =============================================================================
+# BASELINE COMPARISON
+# =============================================================================
+
+def compare_to_baseline(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    Flag stages whose wall time or peak RSS exceeds baseline by > tolerance
+    (and by more than MIN_REGRESSION), or whose OUTPUT_STATS fall below baseline.
+
+    Returns:
+        List of regression messages
+    """
+    regressions = []
+    for dataset, stages in results.items():
+        for stage_name, measured in stages.items():
+            base = baseline.get(dataset, {}).get(stage_name)
+            if not base or "error" in measured or "error" in base:
+                continue
+            for metric in ("wall_s", "peak_rss_mb"):
+                limit = max(base[metric] * (1 + tolerance), base[metric] + MIN_REGRESSION[metric])
+                if measured[metric] > limit:
+                    regressions.append(
+                        f"{dataset}/{stage_name}: {metric} {measured[metric]} > "
+                        f"{base[metric]} (+{tolerance:.0%})"
+                    )
+            for stat in OUTPUT_STATS:
+                if stat in base["stats"] and measured["stats"].get(stat, 0) < base["stats"][stat]:
+                    regressions.append(
+                        f"{dataset}/{stage_name}: {stat} {measured['stats'].get(stat, 0)} < {base['stats'][stat]}"
+                    )
+    return regressions
+
+
+def print_results(dataset: str, stages: Dict[str, dict], baseline: Dict[str, dict]):
+    """Print one dataset's results as a table."""
+    print(f"\n{dataset}")
+    print(f"  {'Stage':<22} {'Wall (s)':>10} {'Base (s)':>10} {'RSS (MB)':>10}  Stats")
+    print("  " + "-" * 76)
+    for stage_name, measured in stages.items():
+        if "error" in measured:
+            print(f"  {stage_name:<22} ERROR: {measured['error']}")
+            continue
+        base = baseline.get(dataset, {}).get(stage_name, {})
+        base_wall = f"{base['wall_s']:.3f}" if "wall_s" in base else "-"
+        stats = ", ".join(f"{k}={v}" for k, v in measured["stats"].items())
+        print(f"  {stage_name:<22} {measured['wall_s']:>10.3f} {base_wall:>10} {measured['peak_rss_mb']:>10.1f}  {stats}")
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def run_benchmarks(
+    sizes: List[int],
+    avg_degree: float = DEFAULT_AVG_DEGREE,
+    degree_distribution: str = "poisson",
+    include_repo: bool = True,
+    stages: Optional[List[str]] = None
+) -> Dict[str, Dict[str, dict]]:
+    """
+    Run every stage on every dataset.
+
+    Returns:
+        Dict of dataset label -> stage name -> measurements
+    """
+    datasets: List[Tuple[str, Optional[int]]] = []
+    if include_repo:
+        datasets.append(("repo", None))
+    datasets.extend((f"synthetic_{n}_d{avg_degree:g}_{degree_distribution}", n) for n in sizes)
+    # A subset still runs every earlier stage (unreported) to produce its inputs
+    stage_names = [name for name, _ in STAGES]
+    if stages:
+        stage_names = stage_names[:max(stage_names.index(name) for name in stages) + 1]
+
+    results = {}
+    for label, size in datasets:
+        with tempfile.TemporaryDirectory(prefix="wordrun_bench_") as temp_dir:
+            workdir = Path(temp_dir)
+            print(f"Preparing {label}...")
+            if size is None:
+                prepare_repo_dataset(workdir)
+            else:
+                prepare_synthetic_dataset(workdir, size, avg_degree, degree_distribution)
+
+            results[label] = {}
+            for stage_name in stage_names:
+                if size is None and stage_name in REPO_SKIP_STAGES:
+                    continue
+                print(f"  {stage_name}...")
+                measured = run_stage(stage_name, workdir)
+                if not stages or stage_name in stages:
+                    results[label][stage_name] = measured
+    return results
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the level-generation pipeline.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated synthetic bank sizes (phrases)")
+    parser.add_argument("--avg-degree", type=float, default=DEFAULT_AVG_DEGREE,
+                        help="average out-degree (connectivity) of synthetic banks")
+    parser.add_argument("--degree", choices=DEGREE_DISTRIBUTIONS, default="poisson",
+                        help="out-degree distribution of synthetic banks")
+    parser.add_argument("--no-repo", action="store_true", help="skip the repo dataset")
+    parser.add_argument("--stages", default="", help="comma-separated subset of stages")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    stages = [s for s in args.stages.split(",") if s]
+
+    print("=" * 60)
+    print("WORDRUN PIPELINE BENCHMARK")
+    print("=" * 60)
+
+    results = run_benchmarks(sizes, args.avg_degree, args.degree, include_repo=not args.no_repo, stages=stages)
+
+    baseline = {}
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    for dataset, stage_results in results.items():
+        print_results(dataset, stage_results, baseline)
+
+    BENCHMARK_DIR.mkdir(parents=True, exist_ok=True)
+    record = {"recorded_at": datetime.now().isoformat(), "results": results}
+    with open(RESULTS_FILE, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+        return
+
+    if not baseline:
+        print(f"\nNo baseline at {BASELINE_FILE} (run with --save-baseline)")
+        return
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n[REGRESSION] {len(regressions)} stage(s) over baseline:")
+        for message in regressions:
+            print(f"  - {message}")
+        sys.exit(1)
+    print("\n[PASS] No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
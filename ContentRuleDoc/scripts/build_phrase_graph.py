@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Phrase-Node Graph Builder for WordRun! (ContentRuleDoc.md §8)
+
+PhraseGraph (pathfinder) is word-node: words are nodes, phrases are edges.
+This builds the §8 phrase-node graph instead:
+- Node = phrase
+- Edge A -> B iff A.word2 == B.word1
+- No self-loops, no duplicate edges (duplicate phrase rows are one node)
+
+Build: a single hash-join on the shared word. Phrases are bucketed by word1
+once; each phrase's successors are the bucket of its word2. Cost is
+O(phrases + edges) instead of the O(phrases^2) pairwise comparison.
+
+Output (edges grow like sum(in-degree x out-degree) per word):
+- phrase_graph.csr: compact binary graph, memory-mapped by load_phrase_graph()
+      header   MAGIC, version, n_nodes, n_edges
+      sections name_offsets (q, n+1), name_blob (UTF-8), offsets (q, n+1),
+               edges (i, node IDs)
+- phrase_graph.json: the §8 adjacency list, streamed one node per line
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pathfinder import Phrase
+from phrase_index import open_index
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data")
+INPUT_FILE = DATA_DIR / "phrases" / "phrases_master_pfs.csv"
+GRAPHS_DIR = DATA_DIR / "graphs"
+JSON_FILE = GRAPHS_DIR / "phrase_graph.json"
+CSR_FILE = GRAPHS_DIR / "phrase_graph.csr"
+
+GRAPH_VERSION = 1
+MAGIC = b"WRPGRF\x00\x01"
+
+# magic, version, n_nodes, n_edges
+HEADER = struct.Struct("<8sIIq")
+SECTION_NAMES = ("name_offsets", "name_blob", "offsets", "edges")
+SECTION_CODES = ("q", "B", "q", "i")
+
+
+# =============================================================================
+# BUILD (hash-join on the shared word)
+# =============================================================================
+
+def build_phrase_node_graph(phrases: List[Phrase]) -> Tuple[List[str], array, array]:
+    """
+    Build the phrase-node graph as CSR arrays.
+
+    Returns:
+        (names, offsets, edges): node i is names[i]; its successors are
+        edges[offsets[i]:offsets[i + 1]], in input order
+    """
+    # One node per distinct phrase (first row wins)
+    names: List[str] = []
+    node_words: List[Tuple[str, str]] = []
+    node_ids: Dict[str, int] = {}
+    for p in phrases:
+        key = p.phrase.lower().strip()
+        if key in node_ids:
+            continue
+        node_ids[key] = len(names)
+        names.append(p.phrase)
+        node_words.append((p.word1.lower(), p.word2.lower()))
+
+    # Build side of the join: word1 -> nodes
+    by_word1: Dict[str, List[int]] = {}
+    for node, (word1, _) in enumerate(node_words):
+        by_word1.setdefault(word1, []).append(node)
+
+    # Probe side: each node's word2 bucket, minus the node itself
+    offsets = array("q", [0])
+    edges = array("i")
+    for node, (_, word2) in enumerate(node_words):
+        for succ in by_word1.get(word2, ()):
+            if succ != node:
+                edges.append(succ)
+        offsets.append(len(edges))
+
+    return names, offsets, edges
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def write_csr(path: Path, names: List[str], offsets: array, edges: array) -> Path:
+    """Write the compact binary graph atomically."""
+    name_offsets = array("q", [0])
+    blob = bytearray()
+    for name in names:
+        blob += name.encode("utf-8")
+        name_offsets.append(len(blob))
+
+    payloads = [name_offsets.tobytes(), bytes(blob), offsets.tobytes(), edges.tobytes()]
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, GRAPH_VERSION, len(names), len(edges)))
+        for payload in payloads:
+            f.write(struct.pack("<q", len(payload)))
+            f.write(payload)
+            f.write(b"\x00" * (_align(f.tell()) - f.tell()))
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_json(path: Path, names: List[str], offsets: array, edges: array) -> Path:
+    """Stream the §8 adjacency-list JSON, one node per line."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    dumps = json.dumps
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for node, name in enumerate(names):
+            successors = [names[succ] for succ in edges[offsets[node]:offsets[node + 1]]]
+            f.write(("\n" if node == 0 else ",\n") + dumps(name) + ": " + dumps(successors))
+        f.write("\n}\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _align(offset: int, boundary: int = 8) -> int:
+    return (offset + boundary - 1) // boundary * boundary
+
+
+# =============================================================================
+# MEMORY-MAPPED READER
+# =============================================================================
+
+class PhraseNodeGraph:
+    """Read-only, memory-mapped view of a phrase_graph.csr file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.num_nodes, self.num_edges = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != GRAPH_VERSION:
+            raise ValueError(f"{self.path} is not a phrase graph (version {GRAPH_VERSION})")
+
+        self._views = [memoryview(self._mm)]
+        sections = {}
+        offset = HEADER.size
+        for name, code in zip(SECTION_NAMES, SECTION_CODES):
+            (nbytes,) = struct.unpack_from("<q", self._mm, offset)
+            offset += 8
+            section = self._views[0][offset:offset + nbytes]
+            typed = section.cast(code)
+            self._views.extend([section, typed])
+            sections[name] = typed
+            offset = _align(offset + nbytes)
+
+        self._name_offsets = sections["name_offsets"]
+        self._name_blob = sections["name_blob"]
+        self.offsets = sections["offsets"]
+        self.edges = sections["edges"]
+        self._node_ids: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self.num_nodes
+
+    def name(self, node: int) -> str:
+        return str(self._name_blob[self._name_offsets[node]:self._name_offsets[node + 1]], "utf-8")
+
+    def node_id(self, phrase: str) -> Optional[int]:
+        """Node ID of a phrase (lookup table built on first use)."""
+        if self._node_ids is None:
+            self._node_ids = {self.name(i).lower().strip(): i for i in range(self.num_nodes)}
+        return self._node_ids.get(phrase.lower().strip())
+
+    def successors(self, node: int):
+        """Successor node IDs (CSR slice, no copy)."""
+        return self.edges[self.offsets[node]:self.offsets[node + 1]]
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mm.close()
+
+
+def load_phrase_graph(path: Path = CSR_FILE) -> PhraseNodeGraph:
+    return PhraseNodeGraph(path)
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Build the §8 phrase-node graph.")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE)
+    parser.add_argument("--csr", type=Path, default=CSR_FILE)
+    parser.add_argument("--json", type=Path, default=JSON_FILE)
+    parser.add_argument("--no-json", action="store_true", help="write only the compact CSR file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PHRASE-NODE GRAPH BUILD")
+    print("=" * 60)
+
+    with open_index(args.input) as index:
+        phrases = list(index.iter_phrases())
+    names, offsets, edges = build_phrase_node_graph(phrases)
+    print(f"\nNodes: {len(names)} ({len(phrases) - len(names)} duplicate rows merged)")
+    print(f"Edges: {len(edges)}")
+
+    args.csr.parent.mkdir(parents=True, exist_ok=True)
+    write_csr(args.csr, names, offsets, edges)
+    print(f"\nWrote: {args.csr} ({args.csr.stat().st_size} bytes)")
+    if not args.no_json:
+        write_json(args.json, names, offsets, edges)
+        print(f"Wrote: {args.json} ({args.json.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
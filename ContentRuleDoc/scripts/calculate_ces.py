@@ -8,12 +8,27 @@ competing alternatives make the answer less intuitive.
 
 CES = count of high-frequency bigrams starting with word1 that share
       the same first letter as word2
+
+Modes (process_phrases / calculate_ces_batch):
+- known_bigrams: KNOWN_BIGRAMS plus the phrase bank's own word1 -> word2
+  pairings (the original estimate, default)
+- validated: ContentRuleDoc Section 3.3 entropy, the count of phrases Q in
+  the validated database with Q.word1 == word1 and Q.word2 starting with
+  the first letter of word2 (including the phrase itself)
+
+Both modes run as one group-by pass over (word1, first letter of word2),
+so the whole master DB is scored at once instead of phrase by phrase.
+calculate_ces() / build_corpus_bigrams() are the per-phrase reference the
+known_bigrams mode must reproduce (checked in test_invariants.py); the
+pipeline does not call them.
 """
 
+import argparse
 import csv
 import json
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
 
 # Paths
 DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
@@ -146,7 +161,7 @@ KNOWN_BIGRAMS = {
 
 
 def build_corpus_bigrams(phrases):
-    """Build bigram index from phrase bank itself."""
+    """Build bigram index from phrase bank itself (reference only, see calculate_ces)."""
     bigram_index = defaultdict(set)
     for p in phrases:
         w1 = p["word1"].lower()
@@ -162,6 +177,9 @@ def calculate_ces(word1, word2, corpus_bigrams):
 
     CES = count of alternatives starting with same letter as word2
     that are also high-frequency pairings with word1.
+
+    Reference implementation only: scoring goes through
+    calculate_ces_batch(), and test_invariants.py checks it against this.
     """
     word1 = word1.lower()
     word2 = word2.lower()
@@ -185,7 +203,58 @@ def calculate_ces(word1, word2, corpus_bigrams):
     return ces
 
 
-def process_phrases():
+CES_MODES = ("known_bigrams", "validated")
+
+
+def entropy_group(word1: str, word2: str) -> Tuple[str, str]:
+    """Group key a phrase's CES depends on: (word1, first letter of word2)."""
+    word1 = word1.lower()
+    word2 = word2.lower()
+    return word1, word2[:1]
+
+
+def calculate_ces_batch(phrases: List[dict], mode: str = "known_bigrams") -> List[int]:
+    """
+    Calculate CES for every phrase in one grouped pass.
+
+    Gives the same values as calling calculate_ces() per phrase (mode
+    "known_bigrams"), or the Section 3.3 database count (mode "validated").
+
+    Returns:
+        CES values, in the same order as phrases
+    """
+    if mode not in CES_MODES:
+        raise ValueError(f"Unknown CES mode '{mode}' (expected one of {CES_MODES})")
+
+    keys = [entropy_group(p["word1"], p["word2"]) for p in phrases]
+
+    if mode == "validated":
+        # count of phrases Q with Q.word1 == starter and Q.word2[0] == letter
+        group_counts = Counter(key for key in keys if key[1])
+        return [group_counts[key] if key[1] else 1 for key in keys]
+
+    # known_bigrams: distinct word2 options per word1 (known list + bank)
+    options: Dict[str, set] = defaultdict(set)
+    for word1, word2 in ((p["word1"].lower(), p["word2"].lower()) for p in phrases):
+        if word1 and word2:
+            options[word1].add(word2)
+
+    letter_counts: Dict[str, Counter] = {}
+    values = []
+    for word1, letter in keys:
+        if not letter:
+            values.append(1)
+            continue
+        counts = letter_counts.get(word1)
+        if counts is None:
+            all_options = options.get(word1, set()) | set(KNOWN_BIGRAMS.get(word1, []))
+            counts = Counter(w[0] for w in all_options if w)
+            letter_counts[word1] = counts
+        values.append(max(1, counts[letter]))
+    return values
+
+
+def process_phrases(mode: str = "known_bigrams"):
     """Process all phrases and calculate CES."""
     # Read master file
     phrases = []
@@ -196,14 +265,10 @@ def process_phrases():
 
     print(f"Loaded {len(phrases)} phrases from master file")
 
-    # Build corpus bigrams
-    corpus_bigrams = build_corpus_bigrams(phrases)
-    print(f"Built bigram index with {len(corpus_bigrams)} word1 entries")
-
-    # Calculate CES for each phrase
+    # Calculate CES for every phrase in one grouped pass
+    print(f"CES mode: {mode}")
     ces_distribution = defaultdict(int)
-    for p in phrases:
-        ces = calculate_ces(p["word1"], p["word2"], corpus_bigrams)
+    for p, ces in zip(phrases, calculate_ces_batch(phrases, mode=mode)):
         p["CES_estimate"] = ces
         ces_distribution[ces] += 1
 
@@ -235,4 +300,10 @@ def process_phrases():
 
 
 if __name__ == "__main__":
-    process_phrases()
+    parser = argparse.ArgumentParser(description="Calculate CES for the master phrase file.")
+    parser.add_argument(
+        "--mode", choices=CES_MODES, default="known_bigrams",
+        help="known_bigrams (default) or validated (ContentRuleDoc Section 3.3 count)"
+    )
+    args = parser.parse_args()
+    process_phrases(mode=args.mode)
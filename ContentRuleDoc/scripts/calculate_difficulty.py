@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Calculate Difficulty Score for each phrase (ContentRuleDoc.md §3.4).
+
+difficulty_score = 5 * entropy + 3 * avg_word_length + 2 * (7 - avg_zipf)
+
+- entropy: CES_estimate (§3.3, written by calculate_ces.py)
+- avg_word_length: (len(word1) + len(word2)) / 2, no rounding (§3.1)
+- avg_zipf: familiarity; inverted so rarer words score harder
+
+Computed column-wise for the whole master DB in one pass. The compiled
+phrase index keeps the scores sorted, so each tier's §10.1 window
+(difficulty_target ± window) is a binary-searched range slice
+(PhraseIndex.difficulty_range) instead of a rescan.
+"""
+
+import argparse
+import csv
+import os
+import sys
+from array import array
+from pathlib import Path
+from collections import defaultdict
+from typing import List
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from phrase_index import build_index
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
+INPUT_FILE = DATA_DIR / "phrases_master_pfs.csv"
+
+# §3.4 constants (locked)
+W_ENTROPY = 5
+W_LENGTH = 3
+W_FAMILIARITY = 2
+ZIPF_MAX = 7
+
+
+def calculate_difficulty(entropy: float, avg_word_length: float, avg_zipf: float) -> float:
+    """§3.4 difficulty score of one phrase."""
+    return W_ENTROPY * entropy + W_LENGTH * avg_word_length + W_FAMILIARITY * (ZIPF_MAX - avg_zipf)
+
+
+def calculate_difficulty_batch(phrases: List[dict]) -> array:
+    """
+    Difficulty scores for every phrase row, in row order.
+
+    Rows with unparseable inputs fall back to the index defaults
+    (CES_estimate 1, avg_zipf 5.0).
+    """
+    entropy = array("d")
+    word_length = array("d")
+    zipf = array("d")
+    for p in phrases:
+        try:
+            entropy.append(float(p.get("CES_estimate") or 1))
+        except ValueError:
+            entropy.append(1.0)
+        try:
+            zipf.append(float(p.get("avg_zipf") or 5.0))
+        except ValueError:
+            zipf.append(5.0)
+        word_length.append((len(p.get("word1") or "") + len(p.get("word2") or "")) / 2)
+
+    return array("d", map(calculate_difficulty, entropy, word_length, zipf))
+
+
+def process_phrases(input_file: Path = INPUT_FILE):
+    """Recompute difficulty_score in place and recompile the phrase index."""
+    with open(input_file, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        phrases = list(reader)
+
+    print(f"Loaded {len(phrases)} phrases")
+
+    scores = calculate_difficulty_batch(phrases)
+    distribution = defaultdict(int)
+    for p, score in zip(phrases, scores):
+        p["difficulty_score"] = score
+        distribution[int(score // 5) * 5] += 1
+
+    if "difficulty_score" not in fieldnames:
+        fieldnames.append("difficulty_score")
+
+    tmp_file = input_file.with_suffix(input_file.suffix + ".tmp")
+    with open(tmp_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for p in phrases:
+            writer.writerow(p)
+    os.replace(tmp_file, input_file)
+
+    print(f"\nWrote {len(phrases)} phrases to {input_file}")
+
+    index_path = build_index(input_file)
+    print(f"Compiled phrase index: {index_path}")
+
+    print("\nDifficulty Distribution:")
+    for bucket in sorted(distribution):
+        count = distribution[bucket]
+        bar = "#" * (count // 20)
+        print(f"  {bucket:3d}-{bucket + 5:<3d}: {count:4d} {bar}")
+
+    return phrases
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calculate §3.4 difficulty scores for the scored phrase file.")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE)
+    args = parser.parse_args()
+    process_phrases(args.input)
@@ -17,13 +17,22 @@ Tiered thresholds:
 
 import csv
 import math
+import sys
 from pathlib import Path
 from collections import defaultdict
 
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from phrase_index import build_index
+from calculate_difficulty import calculate_difficulty_batch
+from calculate_tone import calculate_tone_batch, load_word_categories
+
 # Paths
 DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
 INPUT_FILE = DATA_DIR / "phrases_master_ces.csv"
 OUTPUT_FILE = DATA_DIR / "phrases_master_pfs.csv"
+WORD_CATEGORIES_FILE = DATA_DIR / "word_categories.json"
 
 # Frequency mapping for bigram categories
 # These map to approximate per-million frequencies
@@ -182,6 +191,15 @@ def process_phrases():
         pfs_bucket = round(pfs * 10) / 10
         pfs_distribution[pfs_bucket] += 1
 
+    # §3.4 difficulty score, one batch pass (PFS does not enter it)
+    for p, score in zip(phrases, calculate_difficulty_batch(phrases)):
+        p["difficulty_score"] = score
+
+    # §5 tone score, as calculate_tone.py writes it
+    tones, _ = calculate_tone_batch(phrases, load_word_categories(WORD_CATEGORIES_FILE))
+    for p, tone in zip(phrases, tones):
+        p["tone_score"] = int(tone)
+
     # Write output
     fieldnames = list(phrases[0].keys())
     with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
@@ -192,6 +210,10 @@ def process_phrases():
 
     print(f"\nWrote {len(phrases)} phrases to {OUTPUT_FILE}")
 
+    # Compile the index every downstream stage memory-maps
+    index_path = build_index(OUTPUT_FILE)
+    print(f"Compiled phrase index: {index_path}")
+
     # Print tier distribution
     print("\nLevel Tier Distribution:")
     for tier, count in sorted(tier_counts.items()):
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Calculate Tone Score for each phrase (ContentRuleDoc.md §5, TONE_SCORE_RULES.md).
+
+word.tone_score   = MAX(category tone) over the word's semantic categories
+phrase.tone_score = MAX(word1.tone_score, word2.tone_score)
+
+- Word categories come from the Master Word DB (§4.1 semantic_categories,
+  data/phrases/word_categories.json: word -> [category, ...]) when present
+- A word missing from it takes the categories of the phrase row
+  (category_tag, ";"-separated)
+- Categories outside the §4.4 locked list carry no tone; a word with no
+  locked category scores UNCATEGORIZED_TONE (the object_neutral baseline)
+
+Computed for the whole master DB in one pass, each word scored once. The
+compiled phrase index keeps the scores sorted, so the phrases allowed under
+a level's tone_cap are a binary-searched prefix (PhraseIndex.tone_prefix).
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from array import array
+from pathlib import Path
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from phrase_index import build_index
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
+INPUT_FILE = DATA_DIR / "phrases_master_pfs.csv"
+WORD_CATEGORIES_FILE = DATA_DIR / "word_categories.json"
+
+# TONE_SCORE_RULES.md category -> base tone (§4.4 locked category list)
+CATEGORY_TONES = {
+    "nature": 10,
+    "animal": 15,
+    "pest": 45,
+    "food": 5,
+    "drink": 10,
+    "alcohol": 40,
+    "household": 5,
+    "object_neutral": 5,
+    "clothing": 10,
+    "emotion": 50,
+    "relationship": 35,
+    "social": 25,
+    "commerce": 15,
+    "trade": 15,
+    "transport": 10,
+    "maritime": 20,
+    "architecture": 15,
+    "civic": 25,
+    "religious": 35,
+    "abstract": 45,
+    "conflict": 70,
+    "violence": 90,
+    "medical": 40,
+    "anatomy": 30,
+    "grime": 55,
+    "disease": 60,
+    "political": 50,
+    "communication": 20,
+    "music": 15,
+    "agriculture": 10,
+    "craft": 15,
+    "law": 45,
+    "festival": 20,
+}
+UNCATEGORIZED_TONE = CATEGORY_TONES["object_neutral"]
+
+
+def split_categories(value: str) -> List[str]:
+    """Category names from a "a;b" category field."""
+    return [c.strip().lower() for c in (value or "").split(";") if c.strip()]
+
+
+def word_tone(categories: Iterable[str]) -> Optional[int]:
+    """MAX tone over a word's locked categories; None if it has none."""
+    tones = [CATEGORY_TONES[c] for c in categories if c in CATEGORY_TONES]
+    return max(tones) if tones else None
+
+
+def load_word_categories(path: Path = WORD_CATEGORIES_FILE) -> Dict[str, List[str]]:
+    """Master Word DB categories (word -> categories); empty if the file is absent."""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {word.lower(): [c.lower() for c in categories] for word, categories in data.items()}
+
+
+def calculate_tone_batch(phrases: List[dict], word_categories: Dict[str, List[str]]) -> Tuple[array, Counter]:
+    """
+    Tone scores for every phrase row, in row order.
+
+    Returns:
+        (scores, unmapped): unmapped counts the non-locked categories seen
+    """
+    word_tones: Dict[str, Optional[int]] = {w: word_tone(c) for w, c in word_categories.items()}
+    category_tones: Dict[str, Optional[int]] = {}
+    category_unmapped: Dict[str, List[str]] = {}
+    unmapped = Counter()
+
+    scores = array("d")
+    for p in phrases:
+        category_tag = p.get("category_tag") or ""
+        if category_tag not in category_tones:
+            categories = split_categories(category_tag)
+            category_tones[category_tag] = word_tone(categories)
+            category_unmapped[category_tag] = [c for c in categories if c not in CATEGORY_TONES]
+        unmapped.update(category_unmapped[category_tag])
+
+        phrase_tone = None
+        for word in ((p.get("word1") or "").lower(), (p.get("word2") or "").lower()):
+            tone = word_tones[word] if word in word_tones else category_tones[category_tag]
+            if tone is None:
+                tone = UNCATEGORIZED_TONE
+            phrase_tone = tone if phrase_tone is None else max(phrase_tone, tone)
+        scores.append(phrase_tone)
+
+    return scores, unmapped
+
+
+def process_phrases(input_file: Path = INPUT_FILE, word_categories_file: Path = WORD_CATEGORIES_FILE):
+    """Recompute tone_score in place and recompile the phrase index."""
+    with open(input_file, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        phrases = list(reader)
+
+    word_categories = load_word_categories(word_categories_file)
+    print(f"Loaded {len(phrases)} phrases, {len(word_categories)} words with categories")
+
+    scores, unmapped = calculate_tone_batch(phrases, word_categories)
+    distribution = defaultdict(int)
+    for p, score in zip(phrases, scores):
+        p["tone_score"] = int(score)
+        distribution[int(score // 10) * 10] += 1
+
+    if "tone_score" not in fieldnames:
+        fieldnames.append("tone_score")
+
+    tmp_file = input_file.with_suffix(input_file.suffix + ".tmp")
+    with open(tmp_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for p in phrases:
+            writer.writerow(p)
+    os.replace(tmp_file, input_file)
+
+    print(f"\nWrote {len(phrases)} phrases to {input_file}")
+
+    index_path = build_index(input_file)
+    print(f"Compiled phrase index: {index_path}")
+
+    print("\nTone Distribution:")
+    for bucket in sorted(distribution):
+        count = distribution[bucket]
+        bar = "#" * (count // 20)
+        print(f"  {bucket:3d}-{bucket + 10:<3d}: {count:4d} {bar}")
+
+    if unmapped:
+        print(f"\nCategories outside §4.4 (scored {UNCATEGORIZED_TONE} unless the word has another):")
+        for category, count in unmapped.most_common():
+            print(f"  {category}: {count} rows")
+
+    return phrases
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calculate §5 tone scores for the scored phrase file.")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE)
+    parser.add_argument("--word-categories", type=Path, default=WORD_CATEGORIES_FILE)
+    args = parser.parse_args()
+    process_phrases(args.input, args.word_categories)
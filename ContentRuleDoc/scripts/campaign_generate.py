@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+Campaign Generation for WordRun!
+
+Generates the full 3,024-level campaign in level order and streams it out
+land by land in the data/baseline land_*.json schema.
+
+Schedules (ContentRuleDoc.md):
+- §9.1 Global difficulty tiers 1-10 (filter config and §10 constraints per tier)
+- §5.2 Tone cap per level: Act 1 0-33.33, Act 2 33.33-80, Act 3 80-100
+  (optional; phrases above the cap are blocked using the index's tone
+  order, see ToneSchedule). The §5.2 formula starts Act 1 at 0, but no
+  §4.4 category scores below 5 (calculate_tone.CATEGORY_TONES), so the cap
+  admits nothing before level 153. A level whose cap admits no phrase
+  aborts the run with that reason; it is not relaxed.
+- §0.1 9 nations x 3 acts, 112 levels per nation visit, split into
+  LANDS_PER_VISIT lands; land numbers continue across acts (land_1_01-08
+  in Act 1, land_1_09-16 in Act 2, land_1_17-24 in Act 3)
+- §6 Land theme: the nation's opposing abstraction in Acts 1-2, its
+  primary abstraction in Act 3
+
+Reuse follows PhraseReuseTracker (no repeats in the first 20 levels, then a
+10-level gap), so the campaign is not limited to one use per phrase.
+
+Bounded memory:
+- Only the filtered graph of the current tier config is held (tiers 3-10
+  share one)
+- Each land is written atomically as soon as it is complete and dropped
+- The reuse tracker keeps one bitset per level for the last 10 levels
+
+Restartable: lands already on disk (from a run with the same config) are
+replayed into the reuse tracker instead of being regenerated, and the land
+in progress is checkpointed after every level.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pathfinder import ENGINES, Pathfinder, PhraseBitset, PhraseGraph, Phrase, intern_phrase
+from phrase_index import PhraseIndex, open_index
+from early_filter import PhraseReuseTracker
+from level_constraints import constraints_for, difficulty_window, nation_abstraction
+from checkpoint import clear_checkpoint, file_sha256, load_checkpoint, save_checkpoint
+from rng_streams import level_rng
+from tag_themes import phrase_theme_masks
+from generate_early_levels import (
+    build_filtered_graph, create_tier_filtered_phrases, rank_start_words, validate_level
+)
+from parallel_generate import (
+    LEVELS_PER_ACT, LEVELS_PER_NATION, NATIONS, TOTAL_LEVELS,
+    level_act, level_nation, level_tier, tier_filter_config
+)
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data")
+PHRASES_DIR = DATA_DIR / "phrases"
+INPUT_FILE = PHRASES_DIR / "phrases_master_pfs.csv"
+OUTPUT_DIR = DATA_DIR / "levels" / "campaign"
+MANIFEST_NAME = "campaign_manifest.json"
+CHECKPOINT_NAME = "campaign.checkpoint.json"
+
+# Land layout
+LANDS_PER_VISIT = 8
+LEVELS_PER_LAND = LEVELS_PER_NATION // LANDS_PER_VISIT  # 14
+
+# Level defaults (data/baseline/schema.json)
+TIME_LIMIT_SECONDS = 180
+BASE_WORD_COUNT = 12
+BONUS_WORD_COUNT = 3
+DEFAULT_SURGE_CONFIG = {
+    "max_value": 100.0,
+    "fill_per_word": 15.0,
+    "thresholds": [30.0, 60.0, 80.0],
+    "section_drain_times": [15.3, 9.35, 5.95, 4.25],
+    "bust_drain_rate": 25.0,
+    "multipliers": [1.0, 1.5, 2.0, 3.0],
+}
+NATION_OBSTACLES = {1: "padlock", 2: "random_blocks", 3: "sand"}
+
+# §5.2 tone bands per act: (start, end)
+ACT_TONE_BANDS = {1: (0.0, 33.33), 2: (33.33, 80.0), 3: (80.0, 100.0)}
+
+MAX_ATTEMPTS_PER_LEVEL = 25
+
+
+@dataclass
+class Land:
+    """A block of consecutive levels written to one land_*.json file."""
+    land_id: str
+    nation: str
+    nation_num: int
+    land_num: int
+    act: int
+    levels: List[int] = field(default_factory=list)
+
+
+# =============================================================================
+# SCHEDULES
+# =============================================================================
+
+def tone_cap(level: int) -> float:
+    """§5.2 maximum tone score allowed at a level (linear within each act)."""
+    act = level_act(level)
+    start, end = ACT_TONE_BANDS[act]
+    first_level = (act - 1) * LEVELS_PER_ACT + 1
+    return start + (level - first_level) / (LEVELS_PER_ACT - 1) * (end - start)
+
+
+class ToneSchedule:
+    """
+    Phrases above tone_cap(level), as a PhraseBitset kept level to level.
+
+    Phrases are ordered by tone once (the index's tone order), so the
+    phrases a cap admits are a prefix. The cap rises through the campaign:
+    moving to the next level only clears the phrases the higher cap newly
+    admits; a lower cap rebuilds the mask. A phrase on several rows is
+    admitted once its highest tone is.
+    """
+
+    def __init__(self, index: PhraseIndex):
+        highest = {}
+        for pid, tone in zip(index.tone_order, index.tone_sorted):
+            highest[intern_phrase(index.value(pid, "phrase"))] = tone
+        self.ids = array("i", sorted(highest, key=highest.__getitem__))
+        self.tones = array("d", (highest[phrase_id] for phrase_id in self.ids))
+        self.admitted = -1
+        self.blocked = PhraseBitset()
+
+    def admits_any(self, level: int) -> bool:
+        """True if at least one phrase is at or under the level's cap."""
+        return bisect_right(self.tones, tone_cap(level)) > 0
+
+    def first_level(self) -> Optional[int]:
+        """First campaign level whose cap admits a phrase (None if none does)."""
+        return next((level for level in range(1, TOTAL_LEVELS + 1) if self.admits_any(level)), None)
+
+    def blocked_at(self, level: int) -> PhraseBitset:
+        """Phrases whose tone exceeds the level's cap (shared; do not modify)."""
+        end = bisect_right(self.tones, tone_cap(level))
+        if end < self.admitted or self.admitted < 0:
+            self.blocked = PhraseBitset()
+            for phrase_id in self.ids[end:]:
+                self.blocked.add_id(phrase_id)
+        else:
+            for phrase_id in self.ids[self.admitted:end]:
+                self.blocked.discard_id(phrase_id)
+        self.blocked.commit()
+        self.admitted = end
+        return self.blocked
+
+
+def load_tone_schedule(input_file: Path) -> Optional[ToneSchedule]:
+    """ToneSchedule for a phrase CSV; None if it has no tone_score column."""
+    with open_index(input_file) as index:
+        if "tone_score" not in index.fieldnames:
+            print(f"  [ABORT] {input_file} has no tone_score column; run calculate_tone.py first")
+            return None
+        tones = ToneSchedule(index)
+    print(f"  Tone schedule: {len(tones.ids)} phrases, tone {tones.tones[0]:g}-{tones.tones[-1]:g}, "
+          f"first admitted at level {tones.first_level()}")
+    return tones
+
+
+def level_difficulty(tier: int) -> int:
+    """Schema difficulty rating (1-5) for a global tier (1-10)."""
+    return (tier + 1) // 2
+
+
+def land_for_level(level: int) -> Land:
+    """The land a campaign level belongs to."""
+    first = (level - 1) // LEVELS_PER_LAND * LEVELS_PER_LAND + 1
+    act = level_act(first)
+    nation = level_nation(first)
+    nation_num = NATIONS.index(nation) + 1
+    land_num = (act - 1) * LANDS_PER_VISIT + ((first - 1) % LEVELS_PER_NATION) // LEVELS_PER_LAND + 1
+    return Land(
+        land_id=f"land_{nation_num}_{land_num:02d}",
+        nation=nation,
+        nation_num=nation_num,
+        land_num=land_num,
+        act=act,
+        levels=list(range(first, first + LEVELS_PER_LAND))
+    )
+
+
+def plan_lands(last_level: int = TOTAL_LEVELS) -> List[Land]:
+    """Split levels 1..last_level (rounded up to a whole land) into lands."""
+    last_level = min(TOTAL_LEVELS, -(-last_level // LEVELS_PER_LAND) * LEVELS_PER_LAND)
+    return [land_for_level(first) for first in range(1, last_level + 1, LEVELS_PER_LAND)]
+
+
+# =============================================================================
+# GRAPHS (one tier config held at a time)
+# =============================================================================
+
+class GraphCache:
+    """
+    Filtered graph for the current tier config; replaced when it changes.
+
+    With difficulty_bands, a tier graph holds only phrases in the tier's
+    §10.1 difficulty window (an index range slice).
+    """
+
+    def __init__(self, input_file: Path, difficulty_bands: bool = False):
+        self.input_file = input_file
+        self.difficulty_bands = difficulty_bands
+        self.key = None
+        self.graph: Optional[PhraseGraph] = None
+        self.start_words: List[Tuple[str, int]] = []
+
+    def get(self, tier: int) -> Tuple[PhraseGraph, List[Tuple[str, int]]]:
+        config = tier_filter_config(tier)
+        enforce_categories = tier <= 2
+        difficulty_range = difficulty_window(tier) if self.difficulty_bands else None
+        key = (config["entropy_cap"], config["min_pfs"], enforce_categories, difficulty_range)
+        if key != self.key:
+            self.graph = None  # release the previous graph before building the next
+            with contextlib.redirect_stdout(io.StringIO()):
+                pids, _ = create_tier_filtered_phrases(
+                    self.input_file,
+                    tier=tier,
+                    entropy_cap=config["entropy_cap"],
+                    min_pfs=config["min_pfs"],
+                    enforce_categories=enforce_categories,
+                    difficulty_range=difficulty_range
+                )
+                self.graph, _ = build_filtered_graph(self.input_file, pids)
+            self.start_words = rank_start_words(self.graph)
+            self.key = key
+            print(f"  Graph for tier {tier}: {len(self.graph.phrases)} phrases, {len(self.start_words)} start words")
+        return self.graph, self.start_words
+
+
+# =============================================================================
+# LEVEL / LAND JSON
+# =============================================================================
+
+def build_campaign_level(land: Land, index: int, level: int, tier: int, start_word: str, path: List[Phrase]) -> dict:
+    """Level in the data/baseline schema (starter pair, then one pair per phrase)."""
+    word_pairs = [{"word_a": "", "word_b": start_word}]
+    word_pairs.extend({"word_a": p.word1, "word_b": p.word2, "phrase": p.phrase} for p in path)
+    return {
+        "level_id": f"{land.land_id}_{index:02d}",
+        "level_name": f"Level {level}",
+        "campaign_level": level,
+        "tier": tier,
+        "tone_cap": tone_cap(level),
+        "time_limit_seconds": TIME_LIMIT_SECONDS,
+        "base_word_count": BASE_WORD_COUNT,
+        "bonus_word_count": BONUS_WORD_COUNT,
+        "difficulty": level_difficulty(tier),
+        "word_pairs": word_pairs,
+        "surge_config": dict(DEFAULT_SURGE_CONFIG),
+        "obstacle_configs": [],
+    }
+
+
+def build_land(land: Land, levels: List[dict]) -> dict:
+    """Land file in the data/baseline schema."""
+    data = {
+        "land_id": land.land_id,
+        "display_name": f"Land {land.nation_num}-{land.land_num}",
+        "nation": land.nation_num,
+        "nation_name": land.nation,
+        "act": land.act,
+    }
+    if land.nation_num in NATION_OBSTACLES:
+        data["obstacle_type"] = NATION_OBSTACLES[land.nation_num]
+    data["theme"] = nation_abstraction(land.nation, land.act)
+    data["levels"] = levels
+    return data
+
+
+def level_phrases(level_data: dict) -> List[str]:
+    """Phrase texts of a campaign level (skips the starter pair)."""
+    return [pair["phrase"] for pair in level_data["word_pairs"][1:]]
+
+
+def write_land(land_data: dict, output_dir: Path) -> Path:
+    """Write a land file atomically (a crash leaves the old file or none)."""
+    output_file = output_dir / f"{land_data['land_id']}.json"
+    tmp_file = output_file.with_suffix(".json.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(land_data, f, indent=2)
+    os.replace(tmp_file, output_file)
+    return output_file
+
+
+def load_completed_land(land: Land, output_dir: Path) -> Optional[dict]:
+    """A land file from an earlier run, if present and complete."""
+    land_file = output_dir / f"{land.land_id}.json"
+    if not land_file.exists():
+        return None
+    with open(land_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if [l.get("campaign_level") for l in data.get("levels", [])] != land.levels:
+        return None
+    return data
+
+
+# =============================================================================
+# GENERATION
+# =============================================================================
+
+def land_pathfinder(
+    graph: PhraseGraph,
+    tier: int,
+    land: Land,
+    engine: str,
+    level_constraints: bool,
+    phrase_masks=None
+) -> Pathfinder:
+    """Pathfinder for levels of one tier within a land (phrase_masks: tag_themes theme masks)."""
+    constraints = constraints_for(tier, land.nation, land.act, phrase_masks) if level_constraints else None
+    return Pathfinder(graph, reuse_penalty=0.3, max_reuse=1, engine=engine, constraints=constraints)
+
+
+def generate_level(
+    pathfinder: Pathfinder,
+    start_words: List[Tuple[str, int]],
+    blocked: PhraseBitset,
+    path_length: int,
+    rng: random.Random
+) -> Optional[Tuple[str, List[Phrase]]]:
+    """
+    Search one level, rotating through start words from a point drawn from
+    the level's RNG stream; None if every attempt fails.
+
+    Args:
+        blocked: Phrases the reuse rules forbid at this level
+    """
+    cursor = rng.randrange(len(start_words))
+    for attempt in range(min(MAX_ATTEMPTS_PER_LEVEL, len(start_words))):
+        start_word = start_words[(cursor + attempt) % len(start_words)][0]
+        result = pathfinder.find_path(
+            start_word=start_word,
+            target_length=path_length,
+            used_phrases=blocked,
+            rng=rng
+        )
+        if len(result.path) >= path_length:
+            return start_word, result.path[:path_length]
+    return None
+
+
+def validate_campaign_level(level_data: dict, tracker: PhraseReuseTracker, level: int) -> List[str]:
+    """Chain/count/duplicate checks plus the campaign reuse rules."""
+    phrases = [
+        {"phrase": pair["phrase"], "word1": pair["word_a"], "word2": pair["word_b"]}
+        for pair in level_data["word_pairs"][1:]
+    ]
+    result = validate_level({"level": level, "phrases": phrases}, set())
+    errors = list(result.errors)
+    for p in phrases:
+        if not tracker.can_use_phrase(p["phrase"], level):
+            errors.append(f"Level {level}: Phrase '{p['phrase']}' breaks the reuse rules")
+    return errors
+
+
+def generate_campaign(
+    last_level: int = TOTAL_LEVELS,
+    phrases_per_level: int = 16,
+    seed: int = 42,
+    engine: str = "dfs",
+    level_constraints: bool = False,
+    tone_schedule: bool = False,
+    input_file: Path = INPUT_FILE,
+    output_dir: Path = OUTPUT_DIR,
+    resume: bool = True
+) -> bool:
+    """
+    Generate the campaign up to last_level, one land file at a time.
+
+    Args:
+        last_level: Last level to generate (rounded up to a whole land)
+        phrases_per_level: Words per level (paths are one phrase shorter)
+        seed: Base seed; output is deterministic for a given seed
+        engine: Pathfinder engine ("dfs" or "beam")
+        level_constraints: Enforce §10 difficulty band / theme density in the search
+        tone_schedule: Exclude phrases whose tone_score (calculate_tone.py)
+            is above tone_cap(level)
+        input_file: Scored phrase CSV (compiled index is used)
+        output_dir: Directory for land_*.json files and the run manifest
+        resume: Keep lands already written by a run with the same config
+
+    Returns:
+        True if every land was generated and validated
+    """
+    print("\n" + "=" * 60)
+    print("WORDRUN CAMPAIGN GENERATION")
+    print("=" * 60)
+
+    lands = plan_lands(last_level)
+    path_length = phrases_per_level - 1
+    print(f"\nConfig: levels 1-{lands[-1].levels[-1]}, {len(lands)} lands, engine {engine}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = output_dir / MANIFEST_NAME
+    config = {
+        "phrases_per_level": phrases_per_level,
+        "seed": seed,
+        "engine": engine,
+        "level_constraints": level_constraints,
+        "tone_schedule": tone_schedule,
+        "rng_streams": "per-level-v1",
+        "input_file": str(input_file),
+        "input_sha256": file_sha256(input_file),
+    }
+    if manifest_file.exists():
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        if resume and previous.get("config") != config:
+            print(f"  [ABORT] {output_dir} holds a campaign with a different config; use --fresh or another --out")
+            return False
+    checkpoint_file = output_dir / CHECKPOINT_NAME
+    if not resume:
+        for old_file in output_dir.glob("land_*.json"):
+            old_file.unlink()
+        clear_checkpoint(checkpoint_file)
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "config": config}, f, indent=2)
+
+    tones = load_tone_schedule(input_file) if tone_schedule else None
+    if tone_schedule and tones is None:
+        return False
+    phrase_masks = phrase_theme_masks(input_file) if level_constraints else None
+    tracker = PhraseReuseTracker()
+    graphs = GraphCache(input_file, difficulty_bands=level_constraints)
+    resumed = 0
+    replaying = resume
+
+    print("\n" + "=" * 60)
+    print("PATHFINDING")
+    print("=" * 60)
+
+    for land in lands:
+        # Resume: replay the leading run of finished lands into the tracker
+        if replaying:
+            existing = load_completed_land(land, output_dir)
+            if existing is not None:
+                for level_data in existing["levels"]:
+                    for phrase in level_phrases(level_data):
+                        tracker.mark_used(phrase, level_data["campaign_level"])
+                resumed += 1
+                continue
+            replaying = False
+            if resumed:
+                print(f"  Resumed {resumed} lands (levels 1-{land.levels[0] - 1})")
+
+        # Levels of this land finished before an interruption
+        land_levels = []
+        state = load_checkpoint(checkpoint_file, config)
+        if state is not None and state["land_id"] == land.land_id:
+            land_levels = state["levels"]
+            for level_data in land_levels:
+                for phrase in level_phrases(level_data):
+                    tracker.mark_used(phrase, level_data["campaign_level"])
+            print(f"  {land.land_id}: resumed {len(land_levels)} levels from checkpoint")
+
+        pathfinder, pathfinder_tier = None, None
+        for index, level in enumerate(land.levels, start=1):
+            if index <= len(land_levels):
+                continue
+            tier = level_tier(level)
+            graph, start_words = graphs.get(tier)
+            if pathfinder is None or pathfinder.graph is not graph or pathfinder_tier != tier:
+                pathfinder_tier = tier
+                pathfinder = land_pathfinder(graph, tier, land, engine, level_constraints, phrase_masks)
+
+            blocked = tracker.get_blocked_bitset(level)
+            if tones is not None:
+                if not tones.admits_any(level):
+                    print(f"  [ABORT] Tone cap {tone_cap(level):g} admits no phrases at level {level} "
+                          f"(lowest tone score {tones.tones[0]:g})")
+                    return False
+                blocked = blocked.union(tones.blocked_at(level))
+
+            rng = level_rng(seed, tier, land.nation, level)
+            found = generate_level(pathfinder, start_words, blocked, path_length, rng)
+            if found is None:
+                print(f"  [ABORT] Level {level} ({land.land_id}): no path after {MAX_ATTEMPTS_PER_LEVEL} attempts")
+                return False
+
+            start_word, path = found
+            level_data = build_campaign_level(land, index, level, tier, start_word, path)
+            errors = validate_campaign_level(level_data, tracker, level)
+            if errors:
+                print(f"  [ABORT] Level {level} failed validation:")
+                for err in errors[:10]:
+                    print(f"    - {err}")
+                return False
+
+            for p in path:
+                tracker.mark_used(p.phrase, level)
+            land_levels.append(level_data)
+            save_checkpoint(checkpoint_file, config, {"land_id": land.land_id, "levels": land_levels})
+
+        land_file = write_land(build_land(land, land_levels), output_dir)
+        clear_checkpoint(checkpoint_file)
+        print(f"  {land.land_id}: levels {land.levels[0]}-{land.levels[-1]} "
+              f"(tier {level_tier(land.levels[-1])}, {land.nation}, act {land.act}) -> {land_file.name}")
+
+    print(f"\n  [SUCCESS] {len(lands) - resumed} lands written, {resumed} resumed, in {output_dir}")
+    return True
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Generate the campaign land by land.")
+    parser.add_argument("--last-level", type=int, default=TOTAL_LEVELS, help="rounded up to a whole land")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--engine", choices=ENGINES, default="dfs", help="pathfinder engine")
+    parser.add_argument("--constraints", action="store_true", help="enforce §10 difficulty band and theme density")
+    parser.add_argument("--tone", action="store_true", help="enforce the §5.2 tone cap (needs tone_score; Act 1 admits nothing before level 153 unless a phrase scores below 5)")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE)
+    parser.add_argument("--out", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--fresh", action="store_true", help="discard lands from an earlier run")
+    args = parser.parse_args()
+
+    success = generate_campaign(
+        last_level=args.last_level,
+        seed=args.seed,
+        engine=args.engine,
+        level_constraints=args.constraints,
+        tone_schedule=args.tone,
+        input_file=args.input,
+        output_dir=args.out,
+        resume=not args.fresh
+    )
+
+    if not success:
+        print("\n[PIPELINE FAILED]")
+        sys.exit(1)
+    else:
+        print("\n[PIPELINE SUCCESS]")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Generation Checkpoints for WordRun!
+
+Long generation runs save their state periodically so an interrupted or
+failed run resumes where it stopped instead of starting from zero:
+- Levels generated so far
+- Reuse tracker history (used phrases are rebuilt from it)
+- Attempt counters (start words and tie-breaks come from per-level RNG
+  streams, see rng_streams.py, so no RNG state needs saving)
+- Levels that failed validation, so a rerun regenerates them under a new
+  RNG revision instead of replaying the failure
+
+Checkpoints are JSON, written atomically (temp file + rename), and tagged
+with the run config: a checkpoint from a run with a different config is
+ignored. Run configs include the input file's content hash (file_sha256),
+so a changed phrase bank never resumes a stale run. Resuming replays exactly
+the state an uninterrupted run would have had, so the output is identical.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+CHECKPOINT_VERSION = 2
+
+
+def file_sha256(path: Path) -> str:
+    """Content hash of a source file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_checkpoint(path: Path, config: dict, state: dict):
+    """Atomically write a checkpoint (a crash leaves the previous one intact)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CHECKPOINT_VERSION, "config": config, "state": state}, f)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: Optional[Path], config: dict) -> Optional[dict]:
+    """State from a checkpoint written by a run with the same config, else None."""
+    if path is None or not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != CHECKPOINT_VERSION or data.get("config") != config:
+        return None
+    return data["state"]
+
+
+def clear_checkpoint(path: Optional[Path]):
+    """Remove a checkpoint once its run has been written out."""
+    if path is not None and path.exists():
+        path.unlink()
+
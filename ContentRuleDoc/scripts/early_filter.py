@@ -9,6 +9,7 @@ Enforces ONLY documented constraints:
 - Entropy <= entropy_cap
 - Category whitelist for Tier 1-2
 - Blocklist/Allowlist checks
+- Profanity / safe-word lists (compiled matcher, profanity_filter.py)
 - Phrase reuse rules
 
 PFS DEFINITION (per Stabilization Directive):
@@ -21,28 +22,47 @@ REMOVED (drift from spec):
 - abstraction_level (not documented)
 """
 
-import csv
-import json
+import sys
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional, Callable, Set, Dict
 
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from frequency_store import FrequencyStore
+from pathfinder import PhraseBitset, intern_phrase
+from profanity_filter import ProfanityFilter, load_profanity_filter
+
 # Paths
 DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
 INPUT_FILE = DATA_DIR / "phrases_master_pfs.csv"
 SPOKEN_PFS_FILE = DATA_DIR / "spoken_pfs_manual.json"
+STORE_FILE = DATA_DIR / "frequency_store.db"
 
 # Load spoken PFS data
 _SPOKEN_PFS_CACHE: Dict[str, int] = {}
 
 def _load_spoken_pfs() -> Dict[str, int]:
-    """Load spoken PFS data from JSON file."""
+    """Load spoken PFS data from the frequency store (seeded from SPOKEN_PFS_FILE)."""
     global _SPOKEN_PFS_CACHE
-    if not _SPOKEN_PFS_CACHE and SPOKEN_PFS_FILE.exists():
-        with open(SPOKEN_PFS_FILE, "r") as f:
-            _SPOKEN_PFS_CACHE = json.load(f)
+    if not _SPOKEN_PFS_CACHE and (STORE_FILE.exists() or SPOKEN_PFS_FILE.exists()):
+        with FrequencyStore(STORE_FILE, legacy_ngram_cache=None, legacy_spoken_pfs=SPOKEN_PFS_FILE) as store:
+            _SPOKEN_PFS_CACHE = store.spoken_pfs_map()
     return _SPOKEN_PFS_CACHE
 
+# Compiled profanity filter (None if the list file is absent)
+_PROFANITY_FILTER: Optional[ProfanityFilter] = None
+_PROFANITY_LOADED = False
+
+def _load_profanity_filter() -> Optional[ProfanityFilter]:
+    """Compile the profanity / safe-word lists once."""
+    global _PROFANITY_FILTER, _PROFANITY_LOADED
+    if not _PROFANITY_LOADED:
+        _PROFANITY_FILTER = load_profanity_filter()
+        _PROFANITY_LOADED = True
+    return _PROFANITY_FILTER
+
 # =============================================================================
 # BLOCKLIST - Explicit phrases that should NEVER appear in early game
 # =============================================================================
@@ -237,6 +257,13 @@ def early_game_filter(
     if phrase in EARLY_GAME_BLOCKLIST:
         return FilterResult(False, f"Blocklist: '{phrase}' explicitly blocked")
 
+    # Check profanity (before the allowlist, which cannot override it)
+    profanity = _load_profanity_filter()
+    if profanity is not None:
+        term = profanity.check_phrase(word1, word2)
+        if term is not None:
+            return FilterResult(False, f"Profanity: '{term}' in '{phrase}'")
+
     # Check explicit allowlist (fast-pass)
     if phrase in EARLY_GAME_ALLOWLIST:
         return FilterResult(True, "Allowlist: verified familiar phrase")
@@ -273,25 +300,30 @@ def early_game_filter(
     return FilterResult(True, f"Passed all constraints (PFS={pfs})")
 
 
-def create_filter_function(
-    entropy_cap: int = 2,
-    min_pfs: int = 4,
-    enforce_categories: bool = True
-) -> Callable:
+class CompiledFilter:
+    """
+    Tier filter compiled to a mask over interned phrase IDs.
+
+    Each phrase is run through early_game_filter once; the verdict is stored
+    in a bytearray indexed by Phrase.phrase_id (0 = not yet evaluated,
+    1 = rejected, 2 = passed), so every later check is a single byte test.
+    Verdicts are keyed by phrase text, which is unique within a phrase bank,
+    so create_filter_function() keeps one filter per bank file.
+    Dicts and objects without a phrase_id are evaluated directly.
     """
-    Create a filter function for the pathfinder.
 
-    Args:
-        entropy_cap: Maximum entropy allowed (default 2 for Tier 1)
-        min_pfs: Minimum PHRASE FREQUENCY SCORE (default 4 for Tier 1, 3 for Tier 2)
-        enforce_categories: Whether to enforce category whitelist
+    def __init__(self, entropy_cap: int, min_pfs: int, enforce_categories: bool):
+        self.entropy_cap = entropy_cap
+        self.min_pfs = min_pfs
+        self.enforce_categories = enforce_categories
+        self.mask = bytearray()
 
-    Returns:
-        Filter function compatible with pathfinder
-    """
-    def filter_func(phrase) -> bool:
-        # Handle both Phrase objects and dicts
-        if hasattr(phrase, '__dict__'):
+    def evaluate(self, phrase) -> bool:
+        """Run the full (uncached) filter."""
+        # Handle both Phrase objects (__slots__, no __dict__) and dicts
+        if isinstance(phrase, dict):
+            phrase_dict = phrase
+        else:
             phrase_dict = {
                 "phrase": phrase.phrase,
                 "word1": phrase.word1,
@@ -299,18 +331,76 @@ def create_filter_function(
                 "CES_estimate": getattr(phrase, 'ces', 1),
                 "category_tag": getattr(phrase, 'category_tag', ''),
             }
-        else:
-            phrase_dict = phrase
 
         result = early_game_filter(
             phrase_dict,
-            entropy_cap=entropy_cap,
-            min_pfs=min_pfs,
-            enforce_categories=enforce_categories
+            entropy_cap=self.entropy_cap,
+            min_pfs=self.min_pfs,
+            enforce_categories=self.enforce_categories
         )
         return result.passed
 
-    return filter_func
+    def compile(self, phrases) -> "CompiledFilter":
+        """Evaluate a batch of phrases up front (e.g. a whole tier graph)."""
+        for phrase in phrases:
+            self(phrase)
+        return self
+
+    def __call__(self, phrase) -> bool:
+        phrase_id = getattr(phrase, "phrase_id", None)
+        if phrase_id is None:
+            return self.evaluate(phrase)
+        return self.check_id(phrase_id, phrase)
+
+    def check_id(self, phrase_id: int, phrase) -> bool:
+        """Verdict for an interned phrase ID; phrase (Phrase or dict) is evaluated on first sight."""
+        mask = self.mask
+        if phrase_id < len(mask):
+            state = mask[phrase_id]
+            if state:
+                return state == 2
+        else:
+            mask.extend(bytes(phrase_id + 1 - len(mask)))
+
+        passed = self.evaluate(phrase)
+        mask[phrase_id] = 2 if passed else 1
+        return passed
+
+
+# Compiled filters by (bank path, bank mtime, entropy_cap, min_pfs, enforce_categories)
+_COMPILED_FILTERS: Dict[tuple, CompiledFilter] = {}
+
+
+def create_filter_function(
+    entropy_cap: int = 2,
+    min_pfs: int = 4,
+    enforce_categories: bool = True,
+    source: Optional[Path] = None
+) -> Callable:
+    """
+    Create a filter function for the pathfinder.
+
+    The same tier config on the same phrase bank always returns the same
+    CompiledFilter, so verdicts (and the pathfinder's reachability table,
+    keyed by filter) are shared. A rebuilt bank gets a fresh filter.
+
+    Args:
+        entropy_cap: Maximum entropy allowed (default 2 for Tier 1)
+        min_pfs: Minimum PHRASE FREQUENCY SCORE (default 4 for Tier 1, 3 for Tier 2)
+        enforce_categories: Whether to enforce category whitelist
+        source: Phrase bank the phrases come from (e.g. PhraseIndex.path);
+            None shares verdicts with every other caller that passes None
+
+    Returns:
+        Filter function compatible with pathfinder
+    """
+    bank = (str(source), source.stat().st_mtime_ns) if source is not None else None
+    key = (bank, entropy_cap, min_pfs, enforce_categories)
+    compiled = _COMPILED_FILTERS.get(key)
+    if compiled is None:
+        compiled = CompiledFilter(entropy_cap, min_pfs, enforce_categories)
+        _COMPILED_FILTERS[key] = compiled
+    return compiled
 
 
 # =============================================================================
@@ -324,10 +414,20 @@ class PhraseReuseTracker:
     Rules:
     - No phrase may repeat within the first 20 levels.
     - After that, minimum reuse gap = 10 levels.
+
+    Blocked sets are built from PhraseBitsets instead of walking the whole
+    history: one bitset of every phrase ever used (first-20 rule) and one per
+    level for the last REUSE_GAP levels (gap rule).
     """
 
+    NO_REPEAT_LEVELS = 20
+    REUSE_GAP = 10
+
     def __init__(self):
         self.phrase_last_used: dict[str, int] = {}  # phrase -> level number
+        self.ever_used = PhraseBitset()
+        self.level_used: Dict[int, PhraseBitset] = {}  # level -> phrases used there (sliding window)
+        self._latest_level = 0
 
     def can_use_phrase(self, phrase: str, current_level: int) -> bool:
         """Check if a phrase can be used at the current level."""
@@ -339,25 +439,62 @@ class PhraseReuseTracker:
         last_used_level = self.phrase_last_used[phrase]
 
         # Rule: No phrase may repeat within the first 20 levels
-        if current_level <= 20:
+        if current_level <= self.NO_REPEAT_LEVELS:
             return False  # Already used, and we're in first 20 levels
 
         # Rule: After level 20, minimum reuse gap = 10 levels
         gap = current_level - last_used_level
-        return gap >= 10
+        return gap >= self.REUSE_GAP
 
     def mark_used(self, phrase: str, level: int):
         """Mark a phrase as used at a specific level."""
         phrase = phrase.lower().strip()
         self.phrase_last_used[phrase] = level
 
+        phrase_id = intern_phrase(phrase)
+        self.ever_used.add_id(phrase_id)
+        level_bits = self.level_used.get(level)
+        if level_bits is None:
+            level_bits = self.level_used[level] = PhraseBitset()
+        level_bits.add_id(phrase_id)
+
+        # Slide the window: older levels can never block a later query
+        if level > self._latest_level:
+            self._latest_level = level
+            for old_level in [l for l in self.level_used if l <= level - self.REUSE_GAP]:
+                del self.level_used[old_level]
+
+    def get_blocked_bitset(self, current_level: int) -> PhraseBitset:
+        """Phrases that cannot be used at current level, as a PhraseBitset."""
+        if current_level <= self.NO_REPEAT_LEVELS:
+            return self.ever_used
+        window_start = current_level - self.REUSE_GAP + 1
+        if window_start < self._latest_level - self.REUSE_GAP + 1:
+            # Query behind the window: fall back to the per-phrase history
+            return PhraseBitset(
+                phrase for phrase in self.phrase_last_used if not self.can_use_phrase(phrase, current_level)
+            )
+        blocked = PhraseBitset()
+        for level, level_bits in self.level_used.items():
+            if level >= window_start:
+                blocked = blocked.union(level_bits)
+        return blocked
+
     def get_blocked_phrases(self, current_level: int) -> Set[str]:
         """Get set of phrases that cannot be used at current level."""
-        blocked = set()
-        for phrase, last_used in self.phrase_last_used.items():
-            if not self.can_use_phrase(phrase, current_level):
-                blocked.add(phrase)
-        return blocked
+        return set(self.get_blocked_bitset(current_level))
+
+    def to_state(self) -> Dict[str, int]:
+        """Usage history as JSON-serializable data (phrase -> last level used)."""
+        return dict(self.phrase_last_used)
+
+    @classmethod
+    def from_state(cls, state: Dict[str, int]) -> "PhraseReuseTracker":
+        """Rebuild a tracker from to_state() output; blocks the same phrases."""
+        tracker = cls()
+        for phrase, level in sorted(state.items(), key=lambda item: item[1]):
+            tracker.mark_used(phrase, level)
+        return tracker
 
 
 # =============================================================================
@@ -421,12 +558,10 @@ def analyze_phrase_bank():
     print("PHRASE BANK ANALYSIS (STABILIZED)")
     print("=" * 60)
 
-    # Load phrases
-    phrases = []
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            phrases.append(row)
+    # Load phrases from the compiled index
+    from phrase_index import open_index
+    with open_index(INPUT_FILE) as index:
+        phrases = list(index.rows())
 
     print(f"Total phrases: {len(phrases)}")
 
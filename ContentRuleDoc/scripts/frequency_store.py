@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Durable Frequency Store for WordRun!
+
+One SQLite database (WAL mode) replacing ngram_cache.json and
+spoken_pfs_manual.json:
+- ngram_counts: raw corpus pseudo-counts per phrase, with source, query
+  window (years, corpus) and fetch timestamp
+- spoken_pfs:   curated spoken PFS (1-5) per phrase, read by early_filter
+
+Why SQLite/WAL:
+- Each write is a small upsert transaction; cost no longer grows with the
+  cache size, and a crash mid-write cannot corrupt committed rows
+- Readers (filter, audit) run concurrently with a writer (fetcher)
+
+The JSON files stay the reviewable, hand-edited seed: whenever one changes
+on disk (mtime differs from the last import) it is re-imported on open.
+Manual spoken PFS is replaced wholesale so deletions propagate; ngram counts
+are upserted, so rows fetched since the last export are kept. `--export` writes both tables back
+out as JSON for review and diffs.
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
+STORE_FILE = DATA_DIR / "frequency_store.db"
+LEGACY_NGRAM_CACHE = DATA_DIR / "ngram_cache.json"
+LEGACY_SPOKEN_PFS = DATA_DIR / "spoken_pfs_manual.json"
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ngram_counts (
+    phrase      TEXT PRIMARY KEY,
+    count       INTEGER NOT NULL,
+    source      TEXT NOT NULL,
+    year_start  INTEGER,
+    year_end    INTEGER,
+    corpus      TEXT,
+    fetched_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS spoken_pfs (
+    phrase      TEXT PRIMARY KEY,
+    pfs         INTEGER NOT NULL,
+    source      TEXT NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    path        TEXT PRIMARY KEY,
+    mtime       REAL NOT NULL
+);
+"""
+
+
+class FrequencyStore:
+    """SQLite-backed phrase frequency store (one connection per instance)."""
+
+    def __init__(self, path: Path = STORE_FILE, legacy_ngram_cache: Optional[Path] = LEGACY_NGRAM_CACHE,
+                 legacy_spoken_pfs: Optional[Path] = LEGACY_SPOKEN_PFS):
+        self.path = path
+        self.conn = sqlite3.connect(str(path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+        # Pick up new or edited JSON files
+        if legacy_ngram_cache and self._legacy_changed(legacy_ngram_cache):
+            self.import_ngram_cache(legacy_ngram_cache)
+        if legacy_spoken_pfs and self._legacy_changed(legacy_spoken_pfs):
+            self.import_spoken_pfs(legacy_spoken_pfs)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def count_rows(self, table: str) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _legacy_changed(self, path: Path) -> bool:
+        if not path.exists():
+            return False
+        row = self.conn.execute("SELECT mtime FROM imports WHERE path = ?", (str(path),)).fetchone()
+        return row is None or row[0] != path.stat().st_mtime
+
+    def _record_import(self, path: Path):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO imports (path, mtime) VALUES (?, ?)", (str(path), path.stat().st_mtime)
+        )
+
+    # -------------------------------------------------------------------------
+    # Raw corpus counts
+    # -------------------------------------------------------------------------
+
+    def put_counts(
+        self,
+        counts: Dict[str, int],
+        source: str = "google_ngrams",
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        corpus: Optional[str] = None
+    ):
+        """Upsert counts in one transaction."""
+        with self.conn:
+            self._upsert_counts(counts, source, year_start, year_end, corpus)
+
+    def _upsert_counts(self, counts, source, year_start=None, year_end=None, corpus=None):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT INTO ngram_counts (phrase, count, source, year_start, year_end, corpus, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(phrase) DO UPDATE SET count=excluded.count, source=excluded.source, "
+            "year_start=excluded.year_start, year_end=excluded.year_end, corpus=excluded.corpus, "
+            "fetched_at=excluded.fetched_at",
+            [(phrase.lower().strip(), count, source, year_start, year_end, corpus, now)
+             for phrase, count in counts.items()]
+        )
+
+    def get_count(self, phrase: str) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT count FROM ngram_counts WHERE phrase = ?", (phrase.lower().strip(),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def all_counts(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT phrase, count FROM ngram_counts"))
+
+    # -------------------------------------------------------------------------
+    # Spoken PFS
+    # -------------------------------------------------------------------------
+
+    def put_spoken_pfs(self, values: Dict[str, int], source: str = "manual"):
+        """Upsert spoken PFS values in one transaction."""
+        with self.conn:
+            self._upsert_spoken_pfs(values, source)
+
+    def _upsert_spoken_pfs(self, values, source):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT INTO spoken_pfs (phrase, pfs, source, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(phrase) DO UPDATE SET pfs=excluded.pfs, source=excluded.source, "
+            "updated_at=excluded.updated_at",
+            [(phrase.lower().strip(), pfs, source, now) for phrase, pfs in values.items()]
+        )
+
+    def get_spoken_pfs(self, phrase: str) -> int:
+        row = self.conn.execute(
+            "SELECT pfs FROM spoken_pfs WHERE phrase = ?", (phrase.lower().strip(),)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def spoken_pfs_map(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT phrase, pfs FROM spoken_pfs"))
+
+    # -------------------------------------------------------------------------
+    # JSON import/export
+    # -------------------------------------------------------------------------
+
+    def import_ngram_cache(self, path: Path, source: str = "google_ngrams"):
+        """Upsert an ngram_cache.json file (existing rows not in it are kept)."""
+        with open(path, "r") as f:
+            counts = json.load(f)
+        with self.conn:
+            self._upsert_counts(counts, source)
+            self._record_import(path)
+
+    def import_spoken_pfs(self, path: Path, source: str = "manual"):
+        """Replace all rows from `source` with a spoken_pfs_manual.json file."""
+        with open(path, "r") as f:
+            values = json.load(f)
+        with self.conn:
+            self.conn.execute("DELETE FROM spoken_pfs WHERE source = ?", (source,))
+            self._upsert_spoken_pfs(values, source)
+            self._record_import(path)
+
+    def export_json(self, ngram_path: Path, spoken_pfs_path: Path):
+        """Write both tables back out in the legacy JSON formats."""
+        with open(ngram_path, "w") as f:
+            json.dump(dict(sorted(self.all_counts().items())), f, indent=2)
+        with open(spoken_pfs_path, "w") as f:
+            json.dump(dict(sorted(self.spoken_pfs_map().items())), f, indent=2)
+
+
+def open_store(path: Path = STORE_FILE) -> FrequencyStore:
+    """Open the store next to the legacy JSON files (imported on first use)."""
+    return FrequencyStore(
+        path,
+        legacy_ngram_cache=path.parent / LEGACY_NGRAM_CACHE.name,
+        legacy_spoken_pfs=path.parent / LEGACY_SPOKEN_PFS.name
+    )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Inspect or export the frequency store.")
+    parser.add_argument("--store", type=Path, default=STORE_FILE)
+    parser.add_argument("--export", type=Path, default=None, help="directory to write the legacy JSON files to")
+    args = parser.parse_args()
+
+    with open_store(args.store) as store:
+        print("=" * 60)
+        print("FREQUENCY STORE")
+        print("=" * 60)
+        print(f"\nStore: {args.store}")
+        print(f"  ngram_counts: {store.count_rows('ngram_counts')} phrases")
+        print(f"  spoken_pfs:   {store.count_rows('spoken_pfs')} phrases")
+
+        if args.export:
+            args.export.mkdir(parents=True, exist_ok=True)
+            store.export_json(args.export / LEGACY_NGRAM_CACHE.name, args.export / LEGACY_SPOKEN_PFS.name)
+            print(f"\nExported JSON to: {args.export}")
+
+
+if __name__ == "__main__":
+    main()
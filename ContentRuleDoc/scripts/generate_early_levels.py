@@ -12,7 +12,6 @@ Flow:
 5. Refuse to commit on validation failure
 """
 
-import csv
 import json
 import sys
 from pathlib import Path
@@ -24,8 +23,11 @@ from typing import List, Dict, Set, Optional, Tuple
 # Add scripts directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from pathfinder import Pathfinder, PhraseGraph, load_phrases, Phrase
+from pathfinder import Pathfinder, PhraseBitset, PhraseGraph, load_phrases, Phrase, intern_phrase, word_for_id
 from early_filter import early_game_filter, create_filter_function, PhraseReuseTracker, get_spoken_pfs
+from phrase_index import open_index
+from checkpoint import clear_checkpoint, file_sha256, load_checkpoint, save_checkpoint
+from rng_streams import level_rng
 
 # Paths
 DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data")
@@ -33,6 +35,7 @@ PHRASES_DIR = DATA_DIR / "phrases"
 LEVELS_DIR = DATA_DIR / "levels"
 INPUT_FILE = PHRASES_DIR / "phrases_master_pfs.csv"
 OUTPUT_FILE = LEVELS_DIR / "early_game_test.json"
+CHECKPOINT_FILE = LEVELS_DIR / "early_game_test.checkpoint.json"
 REPORT_FILE = DATA_DIR / "validation_report.md"
 
 # Minimum graph requirements
@@ -40,6 +43,13 @@ MIN_PHRASES_FOR_GENERATION = 50
 MIN_UNIQUE_WORDS = 30
 MIN_AVG_CONNECTIVITY = 1.5
 
+# Tier filter settings (ContentRuleDoc.md section 9.2; tier 3 config covers "Tier 3+")
+TIER_CONFIG = {
+    1: {"entropy_cap": 2, "min_pfs": 4},
+    2: {"entropy_cap": 3, "min_pfs": 3},
+    3: {"entropy_cap": 4, "min_pfs": 0},
+}
+
 
 @dataclass
 class ValidationResult:
@@ -69,81 +79,85 @@ def create_tier_filtered_phrases(
     tier: int = 1,
     entropy_cap: int = 2,
     min_pfs: int = 4,
-    enforce_categories: bool = True
-) -> Tuple[List[Phrase], Dict]:
+    enforce_categories: bool = True,
+    difficulty_range: Optional[Tuple[float, float]] = None
+) -> Tuple[List[int], Dict]:
     """
     STEP 1: Filter phrases by tier constraints BEFORE graph construction.
 
+    Rows are filtered straight from the compiled index; only the rows that
+    pass become Phrase objects, in STEP 2.
+
+    Args:
+        difficulty_range: Optional §10.1 (min, max) difficulty window; only
+            phrases inside it are loaded (range slice of the index's sorted
+            difficulty order, no rescan)
+
     Returns:
-        Tuple of (filtered_phrases, filter_stats)
+        Tuple of (index row IDs of the filtered phrases in CSV order, filter_stats)
     """
     print("=" * 60)
     print(f"STEP 1: TIER {tier} PHRASE FILTERING")
     print("=" * 60)
 
-    # Load all phrases
-    all_phrases = []
-    with open(input_file, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                phrase = Phrase(
-                    phrase=row["phrase"],
-                    word1=row["word1"],
-                    word2=row["word2"],
-                    pfs=float(row.get("PFS", 1.5)),
-                    ces=int(float(row.get("CES_estimate", 1))),
-                    avg_zipf=float(row.get("avg_zipf", 5.0)),
-                    tone_tag=row.get("tone_tag", "neutral"),
-                    category_tag=row.get("category_tag", "general"),
-                    level_tier=row.get("level_tier", "mid (21-50)")
-                )
-                all_phrases.append(phrase)
-            except (ValueError, KeyError) as e:
-                pass  # Skip invalid rows
-
-    print(f"Loaded {len(all_phrases)} total phrases from CSV")
-
-    # Create filter function
-    filter_func = create_filter_function(
-        entropy_cap=entropy_cap,
-        min_pfs=min_pfs,
-        enforce_categories=enforce_categories
-    )
-
-    # Apply tier filter
-    filtered_phrases = []
+    filtered_pids = []
     rejection_reasons = defaultdict(int)
 
-    for p in all_phrases:
-        result = early_game_filter(
-            {
-                "phrase": p.phrase,
-                "word1": p.word1,
-                "word2": p.word2,
-                "CES_estimate": p.ces,
-                "category_tag": p.category_tag,
-            },
+    # Load phrases from the compiled index (invalid rows are skipped)
+    with open_index(input_file) as index:
+        if difficulty_range is None:
+            pids = [pid for pid in range(len(index)) if index.valid[pid]]
+            print(f"Loaded {len(pids)} total phrases from index")
+        else:
+            low, high = difficulty_range
+            pids = sorted(index.difficulty_range(low, high))  # back to CSV order
+            print(f"Loaded {len(pids)} phrases in difficulty window [{low:g}, {high:g}] from index")
+
+        # Create filter function
+        filter_func = create_filter_function(
             entropy_cap=entropy_cap,
             min_pfs=min_pfs,
-            enforce_categories=enforce_categories
+            enforce_categories=enforce_categories,
+            source=index.path
         )
 
-        if result.passed:
-            filtered_phrases.append(p)
-        else:
+        # Apply tier filter
+        has_category = "category_tag" in index.fieldnames
+        for pid in pids:
+            row = {
+                "phrase": index.value(pid, "phrase"),
+                "word1": index.value(pid, "word1"),
+                "word2": index.value(pid, "word2"),
+                "CES_estimate": index.ces[pid],
+                "category_tag": index.value(pid, "category_tag") if has_category else "general",
+            }
+
+            # Compiled filter decides (and caches the verdict); re-run the full
+            # filter only for rejects, to get the reason
+            if filter_func.check_id(intern_phrase(row["phrase"]), row):
+                filtered_pids.append(pid)
+                continue
+
+            result = early_game_filter(
+                row,
+                entropy_cap=entropy_cap,
+                min_pfs=min_pfs,
+                enforce_categories=enforce_categories
+            )
+
             reason_key = result.reason.split(":")[0]
             rejection_reasons[reason_key] += 1
 
     # Compile stats
     filter_stats = {
-        "total_input": len(all_phrases),
-        "total_passed": len(filtered_phrases),
-        "pass_rate": round(len(filtered_phrases) / len(all_phrases) * 100, 1) if all_phrases else 0,
+        "total_input": len(pids),
+        "total_passed": len(filtered_pids),
+        "pass_rate": round(len(filtered_pids) / len(pids) * 100, 1) if pids else 0,
         "rejection_breakdown": dict(rejection_reasons),
         "tier": tier,
         "entropy_cap": entropy_cap,
         "min_pfs": min_pfs,
+        "difficulty_range": list(difficulty_range) if difficulty_range else None,
     }
 
     print(f"\nFilter Results:")
@@ -152,17 +166,20 @@ def create_tier_filtered_phrases(
     for reason, count in sorted(rejection_reasons.items(), key=lambda x: -x[1]):
         print(f"  {reason}: {count}")
 
-    return filtered_phrases, filter_stats
+    return filtered_pids, filter_stats
 
 
 # =============================================================================
 # STEP 2: BUILD GRAPH (Only from Filtered Phrases)
 # =============================================================================
 
-def build_filtered_graph(filtered_phrases: List[Phrase]) -> Tuple[PhraseGraph, GraphStats]:
+def build_filtered_graph(input_file: Path, filtered_pids: List[int]) -> Tuple[PhraseGraph, GraphStats]:
     """
     STEP 2: Build adjacency graph ONLY from tier-filtered phrases.
 
+    The graph comes from the index's CSR adjacency, restricted to the
+    filtered rows (PhraseGraph.from_index).
+
     Returns:
         Tuple of (graph, graph_stats)
     """
@@ -170,26 +187,25 @@ def build_filtered_graph(filtered_phrases: List[Phrase]) -> Tuple[PhraseGraph, G
     print("STEP 2: BUILD FILTERED GRAPH")
     print("=" * 60)
 
-    graph = PhraseGraph()
-    for p in filtered_phrases:
-        graph.add_phrase(p)
+    with open_index(input_file) as index:
+        graph = index.to_graph(filtered_pids)
 
     # Calculate graph statistics
-    unique_words = graph.get_unique_words()
+    unique_words = graph.word_ids
     out_degrees = []
     isolated = 0
 
-    for word in unique_words:
-        out_deg = len(graph.get_outgoing(word))
+    for word_id in unique_words:
+        out_deg = len(graph.get_outgoing_ids(word_id))
         out_degrees.append(out_deg)
-        if out_deg == 0 and len(graph.get_incoming(word)) == 0:
+        if out_deg == 0 and len(graph.get_incoming_ids(word_id)) == 0:
             isolated += 1
 
     avg_out = sum(out_degrees) / len(out_degrees) if out_degrees else 0
     max_out = max(out_degrees) if out_degrees else 0
 
     stats = GraphStats(
-        total_phrases=len(filtered_phrases),
+        total_phrases=len(filtered_pids),
         unique_words=len(unique_words),
         avg_out_degree=round(avg_out, 2),
         max_out_degree=max_out,
@@ -208,6 +224,43 @@ def build_filtered_graph(filtered_phrases: List[Phrase]) -> Tuple[PhraseGraph, G
     return graph, stats
 
 
+def rank_start_words(graph: PhraseGraph) -> List[Tuple[str, int]]:
+    """
+    Rank candidate start words (out-degree >= 2) by 2*out + in degree.
+
+    Returns:
+        List of (word, score), best first
+    """
+    start_words = []
+    for word_id in graph.word_ids:
+        outgoing = graph.get_outgoing_ids(word_id)
+        if len(outgoing) >= 2:
+            incoming = graph.get_incoming_ids(word_id)
+            score = len(outgoing) * 2 + len(incoming)
+            start_words.append((word_for_id(word_id), score))
+    start_words.sort(key=lambda x: -x[1])
+    return start_words
+
+
+def build_level_data(level_num: int, start_word: str, path: List[Phrase]) -> dict:
+    """Convert a pathfinder path into the level JSON structure."""
+    return {
+        "level": level_num,
+        "start_word": start_word,
+        "phrases": [
+            {
+                "phrase": p.phrase,
+                "word1": p.word1,
+                "word2": p.word2,
+                "pfs": get_spoken_pfs(p.phrase),
+                "entropy": p.ces,
+                "category": p.category_tag,
+            }
+            for p in path
+        ],
+    }
+
+
 # =============================================================================
 # STEP 3: ABORT CHECK (Graph Sufficiency)
 # =============================================================================
@@ -303,10 +356,13 @@ def validate_level(level_data: dict, all_phrases_in_levels: Set[str]) -> Validat
     )
 
 
-def validate_all_levels(levels: List[dict]) -> Tuple[bool, List[str], List[str]]:
+def validate_all_levels(levels: List[dict], failed: Optional[List[int]] = None) -> Tuple[bool, List[str], List[str]]:
     """
     STEP 4: Validate all levels before writing JSON.
 
+    Args:
+        failed: If given, the number of each level with errors is appended
+
     Returns:
         Tuple of (all_passed, all_errors, all_warnings)
     """
@@ -322,6 +378,8 @@ def validate_all_levels(levels: List[dict]) -> Tuple[bool, List[str], List[str]]
         result = validate_level(level, all_phrases_used)
         all_errors.extend(result.errors)
         all_warnings.extend(result.warnings)
+        if result.errors and failed is not None:
+            failed.append(level["level"])
 
         # Track used phrases
         for p in level.get("phrases", []):
@@ -380,25 +438,40 @@ def generate_levels(
     num_levels: int = 20,
     phrases_per_level: int = 16,
     tier: int = 1,
-    seed: int = 42
+    seed: int = 42,
+    checkpoint_file: Optional[Path] = None,
+    checkpoint_every: int = 10,
+    checkpoint: bool = True
 ) -> Optional[dict]:
     """
     Main generation pipeline with strict tier filtering.
+
+    State is checkpointed every `checkpoint_every` levels and once more
+    after validation; a rerun with the same config (and the same input
+    file contents) resumes from it and produces the same output. Levels
+    that failed validation, or could not be generated, are recorded: the
+    rerun drops everything from the first of them on and regenerates it,
+    with a new RNG revision for each failed level, instead of replaying
+    the failure. The checkpoint is removed once the output is written.
+
+    checkpoint_file defaults to CHECKPOINT_FILE as set when the call is
+    made (so patching the module paths moves it too); checkpoint=False
+    disables checkpointing.
     """
+    if not checkpoint:
+        checkpoint_file = None
+    elif checkpoint_file is None:
+        checkpoint_file = CHECKPOINT_FILE
+
     print("\n" + "=" * 60)
     print("WORDRUN LEVEL GENERATION PIPELINE v2.1")
     print("=" * 60)
     print(f"\nConfig: {num_levels} levels, {phrases_per_level} phrases/level, Tier {tier}")
 
     # STEP 1: Filter phrases by tier
-    tier_config = {
-        1: {"entropy_cap": 2, "min_pfs": 4},
-        2: {"entropy_cap": 3, "min_pfs": 3},
-        3: {"entropy_cap": 4, "min_pfs": 0},
-    }
-    config = tier_config.get(tier, tier_config[1])
+    config = TIER_CONFIG.get(tier, TIER_CONFIG[1])
 
-    filtered_phrases, filter_stats = create_tier_filtered_phrases(
+    filtered_pids, filter_stats = create_tier_filtered_phrases(
         INPUT_FILE,
         tier=tier,
         entropy_cap=config["entropy_cap"],
@@ -407,7 +480,7 @@ def generate_levels(
     )
 
     # STEP 2: Build graph from filtered phrases only
-    graph, graph_stats = build_filtered_graph(filtered_phrases)
+    graph, graph_stats = build_filtered_graph(INPUT_FILE, filtered_pids)
 
     # STEP 3: Check graph sufficiency - ABORT if insufficient
     is_sufficient, abort_errors = check_graph_sufficiency(graph_stats, num_levels, phrases_per_level)
@@ -426,61 +499,101 @@ def generate_levels(
     pathfinder = Pathfinder(graph, reuse_penalty=0.3, max_reuse=1)
 
     levels = []
-    all_used_phrases = set()
+    all_used_phrases = PhraseBitset()
     reuse_tracker = PhraseReuseTracker()
 
     # Find starting words
-    start_words = []
-    for word in graph.get_unique_words():
-        outgoing = graph.get_outgoing(word)
-        if len(outgoing) >= 2:
-            incoming = graph.get_incoming(word)
-            score = len(outgoing) * 2 + len(incoming)
-            start_words.append((word, score))
-    start_words.sort(key=lambda x: -x[1])
+    start_words = rank_start_words(graph)
 
     attempts = 0
     max_attempts = num_levels * 10
     level_num = 1
 
+    revisions: Dict[int, int] = {}  # level -> RNG revision (bumped each time it fails)
+    failed: List[int] = []
+
+    run_config = {
+        "num_levels": num_levels,
+        "phrases_per_level": phrases_per_level,
+        "tier": tier,
+        "seed": seed,
+        "input_sha256": file_sha256(INPUT_FILE),
+    }
+
+    def write_checkpoint():
+        save_checkpoint(checkpoint_file, run_config, {
+            "levels": levels,
+            "reuse_tracker": reuse_tracker.to_state(),
+            "attempts": attempts,
+            "level_num": level_num,
+            "revisions": revisions,
+            "failed_levels": failed,
+        })
+
+    state = load_checkpoint(checkpoint_file, run_config)
+    if state is not None:
+        levels = state["levels"]
+        reuse_tracker = PhraseReuseTracker.from_state(state["reuse_tracker"])
+        attempts = state["attempts"]
+        level_num = state["level_num"]
+        revisions = {int(level): revision for level, revision in state["revisions"].items()}
+        if state["failed_levels"]:
+            # Regenerate from the first failed level on, failed levels reseeded
+            first_failed = min(state["failed_levels"])
+            levels = [level for level in levels if level["level"] < first_failed]
+            reuse_tracker = PhraseReuseTracker()
+            for level in levels:
+                for p in level["phrases"]:
+                    reuse_tracker.mark_used(p["phrase"], level["level"])
+            for level in state["failed_levels"]:
+                revisions[level] = revisions.get(level, 0) + 1
+            attempts = 0
+            level_num = first_failed
+            print(f"  Reseeding failed levels {sorted(state['failed_levels'])}; regenerating from level {first_failed}")
+        all_used_phrases.update(p["phrase"] for level in levels for p in level["phrases"])
+        print(f"  Resumed from checkpoint: {len(levels)} levels, {attempts} attempts")
+
+    # Each level draws its start words and tie-breaks from its own stream,
+    # so a level never depends on how many attempts earlier levels took
+    rng = level_rng(seed, tier, None, level_num, revisions.get(level_num, 0))
+    cursor = rng.randrange(len(start_words))
+
     while len(levels) < num_levels and attempts < max_attempts:
         attempts += 1
-        start_word = start_words[attempts % len(start_words)][0]
+        start_word = start_words[cursor % len(start_words)][0]
+        cursor += 1
 
         result = pathfinder.find_path(
             start_word=start_word,
             target_length=phrases_per_level - 1,  # 15 phrases = 16 words
-            used_phrases=all_used_phrases.copy(),
-            seed=seed + attempts
+            used_phrases=all_used_phrases,
+            rng=rng
         )
 
         if len(result.path) >= phrases_per_level - 1:
-            level_data = {
-                "level": level_num,
-                "start_word": start_word,
-                "phrases": [
-                    {
-                        "phrase": p.phrase,
-                        "word1": p.word1,
-                        "word2": p.word2,
-                        "pfs": get_spoken_pfs(p.phrase),
-                        "entropy": p.ces,
-                        "category": p.category_tag,
-                    }
-                    for p in result.path[:phrases_per_level - 1]
-                ],
-            }
+            level_data = build_level_data(level_num, start_word, result.path[:phrases_per_level - 1])
             levels.append(level_data)
 
             for p in result.path[:phrases_per_level - 1]:
-                all_used_phrases.add(p.phrase)
+                all_used_phrases.add_id(p.phrase_id)
                 reuse_tracker.mark_used(p.phrase, level_num)
 
             print(f"  Level {level_num}: {len(result.path)} phrases from '{start_word}'")
             level_num += 1
+            rng = level_rng(seed, tier, None, level_num, revisions.get(level_num, 0))
+            cursor = rng.randrange(len(start_words))
+
+            if checkpoint_file is not None and len(levels) % checkpoint_every == 0:
+                write_checkpoint()
 
     # STEP 4: Strict validation
-    validation_passed, errors, warnings = validate_all_levels(levels)
+    validation_passed, errors, warnings = validate_all_levels(levels, failed)
+    if len(levels) < num_levels:
+        failed.append(level_num)
+
+    # Keep the levels, and which ones a rerun must regenerate
+    if checkpoint_file is not None:
+        write_checkpoint()
 
     # Compile output
     output_data = {
@@ -508,8 +621,12 @@ def generate_levels(
     success = write_output(output_data, OUTPUT_FILE)
 
     if not success:
+        if checkpoint_file is not None:
+            print(f"  Levels so far kept in checkpoint: {checkpoint_file}")
         return None
 
+    clear_checkpoint(checkpoint_file)
+
     return output_data
 
 
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Incremental Phrase Rescoring for WordRun!
+
+Replaces the full merge -> CES -> PFS rebuild when phrase batches change.
+
+Each run:
+1. Content-hash every batch file; unchanged files reuse their cached,
+   normalized rows from the manifest (no CSV parsing)
+2. Screen profanity and merge with the same first-occurrence-wins
+   precedence as merge_phrases
+3. Content-hash every merged row and diff against the previous run
+4. Mark dirty entropy groups (word1, first letter of word2) touched by
+   added, removed or changed rows -- a new pair changes CES for its siblings
+5. Recompute CES for dirty groups only, PFS for new/changed rows only,
+   then §3.4 difficulty (it reads CES) and §5 tone for every row (one
+   column pass each)
+6. Write phrases_master_pfs.csv (and its compiled index) only on change
+
+CES for a phrase depends only on the rows in its own entropy group, in both
+CES modes, so rescoring a dirty group never needs the rest of the bank.
+
+The manifest stores file hashes, cached rows, per-row scores and per-group
+CES. Editing the scoring scripts, the profanity lists or the word
+categories invalidates everything.
+"""
+
+import argparse
+import csv
+import hashlib
+import inspect
+import json
+import os
+import sys
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import calculate_ces
+import calculate_difficulty
+import calculate_pfs
+import calculate_tone
+import merge_phrases
+import profanity_filter
+from calculate_ces import CES_MODES, calculate_ces_batch, entropy_group
+from calculate_difficulty import calculate_difficulty_batch
+from calculate_tone import WORD_CATEGORIES_FILE, calculate_tone_batch, load_word_categories
+from merge_phrases import (
+    BATCH_FILES, SCORED_FILE, UNIFIED_SCHEMA, open_profanity_filter, read_batch_file, read_scored_file, screen_rows
+)
+from profanity_filter import FILTER_FILE
+from phrase_index import build_index
+from checkpoint import file_sha256
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
+OUTPUT_FILE = DATA_DIR / "phrases_master_pfs.csv"
+MANIFEST_FILE = DATA_DIR / "pipeline_manifest.json"
+
+MANIFEST_VERSION = 1
+OUTPUT_SCHEMA = UNIFIED_SCHEMA + ["level_tier", "tone_score"]
+
+
+@dataclass
+class RescoreStats:
+    """What an incremental run touched."""
+    files_changed: List[str] = field(default_factory=list)
+    rows_total: int = 0
+    rows_added: int = 0
+    rows_removed: int = 0
+    rows_changed: int = 0
+    dirty_groups: int = 0
+    ces_rescored: int = 0
+    pfs_rescored: int = 0
+    profanity_rejected: List[Tuple[str, str]] = field(default_factory=list)
+    full_rebuild: bool = False
+    wrote_output: bool = False
+
+
+# =============================================================================
+# HASHING
+# =============================================================================
+
+def row_hash(row: dict) -> str:
+    """Content hash of one normalized row."""
+    return hashlib.sha256(json.dumps(row, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def scorer_fingerprint(
+    ces_mode: str,
+    filter_file: Optional[Path] = None,
+    word_categories_file: Optional[Path] = None
+) -> str:
+    """Hash of the normalization/scoring code and their data files; any edit forces a full rebuild."""
+    digest = hashlib.sha256(ces_mode.encode("utf-8"))
+    for module in (merge_phrases, profanity_filter, calculate_ces, calculate_pfs, calculate_difficulty, calculate_tone):
+        digest.update(inspect.getsource(module).encode("utf-8"))
+    for data_file in (filter_file, word_categories_file):
+        digest.update(b"\0")
+        if data_file is not None and data_file.exists():
+            digest.update(file_sha256(data_file).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _group_key(row: dict) -> str:
+    word1, letter = entropy_group(row["word1"], row["word2"])
+    return f"{word1}\t{letter}"
+
+
+# =============================================================================
+# MANIFEST
+# =============================================================================
+
+def load_manifest(path: Path) -> dict:
+    """Load the previous run's manifest (empty if missing or outdated)."""
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    return {}
+
+
+def save_manifest(manifest: dict, path: Path):
+    """Write the manifest atomically."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+# =============================================================================
+# INCREMENTAL PIPELINE
+# =============================================================================
+
+def read_sources(data_dir: Path, cached_files: Dict[str, dict], stats: RescoreStats) -> Tuple[List[Tuple[str, List[dict]]], Dict[str, dict]]:
+    """
+    Read source files in precedence order, reusing cached rows for files
+    whose content hash is unchanged.
+
+    Returns:
+        Tuple of ([(file_name, rows)], new file manifest entries)
+    """
+    sources = []
+    file_entries = {}
+
+    for name in BATCH_FILES + [SCORED_FILE]:
+        path = data_dir / name
+        if not path.exists():
+            if name in cached_files:
+                stats.files_changed.append(name)
+            continue
+
+        sha = file_sha256(path)
+        cached = cached_files.get(name)
+        if cached and cached["sha256"] == sha:
+            rows = cached["rows"]
+        else:
+            reader = read_scored_file if name == SCORED_FILE else read_batch_file
+            rows = reader(path)
+            stats.files_changed.append(name)
+
+        file_entries[name] = {"sha256": sha, "rows": rows}
+        sources.append((name, rows))
+
+    return sources, file_entries
+
+
+def merge_sources(sources: List[Tuple[str, List[dict]]], profanity=None, rejected=None) -> List[dict]:
+    """Screen profanity, deduplicate (first occurrence wins) and sort, as merge_and_deduplicate does."""
+    seen = set()
+    unique_phrases = []
+    for _, rows in sources:
+        for p in screen_rows(rows, profanity, rejected):
+            phrase_key = p["phrase"].lower().strip()
+            if phrase_key not in seen:
+                seen.add(phrase_key)
+                unique_phrases.append(p)
+    unique_phrases.sort(key=lambda x: x["phrase"].lower())
+    return unique_phrases
+
+
+def rescore(
+    data_dir: Path = DATA_DIR,
+    output_file: Path = OUTPUT_FILE,
+    manifest_file: Path = MANIFEST_FILE,
+    ces_mode: str = "known_bigrams",
+    full: bool = False,
+    filter_file: Optional[Path] = FILTER_FILE,
+    word_categories_file: Path = WORD_CATEGORIES_FILE
+) -> RescoreStats:
+    """
+    Bring phrases_master_pfs.csv up to date with the batch files.
+
+    Args:
+        data_dir: Directory holding the batch CSVs
+        output_file: Scored master CSV to write
+        manifest_file: Manifest from the previous run
+        ces_mode: CES mode (see calculate_ces.CES_MODES)
+        full: Ignore the manifest and rescore everything
+        filter_file: Profanity / safe-word lists (None: do not screen)
+        word_categories_file: Master Word DB categories for §5 tone
+
+    Returns:
+        RescoreStats describing the work done
+    """
+    stats = RescoreStats()
+    fingerprint = scorer_fingerprint(ces_mode, filter_file, word_categories_file)
+    manifest = {} if full else load_manifest(manifest_file)
+    if manifest.get("fingerprint") != fingerprint:
+        manifest = {}
+        stats.full_rebuild = True
+
+    sources, file_entries = read_sources(data_dir, manifest.get("files", {}), stats)
+    if not stats.files_changed and not stats.full_rebuild and output_file.exists():
+        stats.rows_total = len(manifest.get("rows", {}))
+        return stats
+
+    merged = merge_sources(sources, open_profanity_filter(filter_file), stats.profanity_rejected)
+    stats.rows_total = len(merged)
+
+    # Row-level diff against the previous run: phrase_key -> [row_hash, group]
+    old_rows: Dict[str, list] = manifest.get("rows", {})
+    new_rows: Dict[str, list] = {}
+    dirty_groups: Set[str] = set()
+
+    for p in merged:
+        phrase_key = p["phrase"].lower().strip()
+        entry = [row_hash(p), _group_key(p)]
+        new_rows[phrase_key] = entry
+
+        old = old_rows.get(phrase_key)
+        if old is None:
+            stats.rows_added += 1
+            dirty_groups.add(entry[1])
+        elif old[0] != entry[0]:
+            stats.rows_changed += 1
+            dirty_groups.add(old[1])
+            dirty_groups.add(entry[1])
+
+    for phrase_key, old in old_rows.items():
+        if phrase_key not in new_rows:
+            stats.rows_removed += 1
+            dirty_groups.add(old[1])
+
+    stats.dirty_groups = len(dirty_groups)
+
+    # CES: rescore only rows in dirty groups (a group's CES depends only on
+    # its own members, so the subset gives the same values as a full pass)
+    group_ces: Dict[str, int] = dict(manifest.get("groups", {}))
+    dirty_members = [p for p in merged if new_rows[p["phrase"].lower().strip()][1] in dirty_groups]
+    for group in dirty_groups:
+        group_ces.pop(group, None)
+    for p, ces in zip(dirty_members, calculate_ces_batch(dirty_members, mode=ces_mode)):
+        group_ces[new_rows[p["phrase"].lower().strip()][1]] = ces
+    stats.ces_rescored = len(dirty_members)
+
+    # PFS: depends only on the row itself, cached by row hash
+    old_scores: Dict[str, list] = manifest.get("scores", {})
+    new_scores: Dict[str, list] = {}
+    output_rows = []
+
+    for p in merged:
+        digest, group = new_rows[p["phrase"].lower().strip()]
+        score = old_scores.get(digest)
+        if score is None:
+            pfs = calculate_pfs.calculate_pfs(
+                p["phrase"],
+                p.get("bigram_frequency", "medium"),
+                p.get("avg_zipf", 5.5),
+                p.get("concreteness_score", 0.7)
+            )
+            score = [pfs, calculate_pfs.get_level_tier(pfs)]
+            stats.pfs_rescored += 1
+        new_scores[digest] = score
+
+        row = dict(p)
+        row["CES_estimate"] = group_ces[group]
+        row["PFS"] = score[0]
+        row["level_tier"] = score[1]
+        output_rows.append(row)
+
+    # §3.4 difficulty, as calculate_pfs writes it
+    for row, difficulty in zip(output_rows, calculate_difficulty_batch(output_rows)):
+        row["difficulty_score"] = difficulty
+
+    # §5 tone, as calculate_tone writes it
+    tones, _ = calculate_tone_batch(output_rows, load_word_categories(word_categories_file))
+    for row, tone in zip(output_rows, tones):
+        row["tone_score"] = int(tone)
+
+    # Write output and compiled index
+    with open(output_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_SCHEMA)
+        writer.writeheader()
+        writer.writerows(output_rows)
+    build_index(output_file)
+    stats.wrote_output = True
+
+    save_manifest({
+        "version": MANIFEST_VERSION,
+        "fingerprint": fingerprint,
+        "files": file_entries,
+        "rows": new_rows,
+        "groups": group_ces,
+        "scores": new_scores,
+    }, manifest_file)
+
+    return stats
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Incrementally rescore the master phrase file.")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and rescore everything")
+    parser.add_argument("--ces-mode", choices=CES_MODES, default="known_bigrams", help="CES mode (see calculate_ces.py)")
+    parser.add_argument("--profanity-filter", type=Path, default=FILTER_FILE, help="profanity / safe-word list")
+    parser.add_argument("--no-profanity-filter", action="store_true", help="do not screen rows")
+    parser.add_argument("--word-categories", type=Path, default=WORD_CATEGORIES_FILE, help="Master Word DB categories (§5 tone)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("INCREMENTAL PHRASE RESCORING")
+    print("=" * 60)
+
+    filter_file = None if args.no_profanity_filter else args.profanity_filter
+    stats = rescore(
+        ces_mode=args.ces_mode, full=args.full, filter_file=filter_file, word_categories_file=args.word_categories
+    )
+
+    if not stats.wrote_output:
+        print(f"\nUp to date: {stats.rows_total} phrases, no batch files changed")
+        return
+
+    print(f"\nFiles changed: {len(stats.files_changed)}")
+    for name in stats.files_changed:
+        print(f"  {name}")
+    print(f"\nRows: {stats.rows_total} total ({len(stats.profanity_rejected)} rejected for profanity)")
+    print(f"  Added:   {stats.rows_added}")
+    print(f"  Changed: {stats.rows_changed}")
+    print(f"  Removed: {stats.rows_removed}")
+    print(f"\nDirty entropy groups: {stats.dirty_groups}")
+    print(f"CES rescored: {stats.ces_rescored} rows")
+    print(f"PFS rescored: {stats.pfs_rescored} rows")
+    if stats.full_rebuild:
+        print("(full rebuild: no manifest or scoring code changed)")
+    print(f"\nOutput written to: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Level Constraints for WordRun! pathfinding (ContentRuleDoc §10).
+
+Checked DURING the search instead of after it:
+- §10.1 Difficulty band: every phrase's difficulty_score within
+  difficulty_target ± difficulty_target * window_percent
+- §10.4 Theme density: tagged phrases / path length within the tier range
+- §10.4 No more than 2 tagged phrases consecutively
+- §10.4 Tagged phrases cannot occupy positions 1-2 both, nor the last two
+
+Theme state is incremental (tags along the current path), with forward
+checking: a prefix is rejected as soon as the remaining positions cannot
+bring the density back into range.
+
+Theme tags use the approved §6.4 keyword lexicons: case-insensitive exact
+match on word1 or word2. The lexicons cover the opposing abstraction that
+dominates Acts 1-2 (§6.2); nations without one, and Act 3 (restoration,
+no approved lexicon yet), have no theme rule. Tags are read from the
+precomputed nation masks (tag_themes.py) when a stage passes them, and
+matched against the lexicon directly otherwise.
+"""
+
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+# =============================================================================
+# RULE TABLES
+# =============================================================================
+
+# §9.2 tier config (tier 3 values apply to every tier above)
+TIER_LEVEL_RULES = {
+    1: {"difficulty_target": 20, "window_percent": 8, "theme_density_range": (0.40, 0.55)},
+    2: {"difficulty_target": 25, "window_percent": 10, "theme_density_range": (0.45, 0.60)},
+    3: {"difficulty_target": 30, "window_percent": 12, "theme_density_range": (0.50, 0.65)},
+}
+
+MAX_CONSECUTIVE_TAGGED = 2
+
+# §6.4 approved keyword lexicons
+ADULTERY_LEXICON = frozenset("""
+    hidden secret double split side blind cover shadow mask false
+    second half dual two apart private closed behind under sneak
+    slip other veil cloak fold turn away break crack torn
+""".split())
+
+DRUNKENNESS_LEXICON = frozenset("""
+    liquid pour spill dizzy sway blur float tip tilt spin
+    rock wave flood flow drown deep cup glass full empty
+    stagger stumble heavy haze fog thick warm rush wild loose
+""".split())
+
+SEDITION_LEXICON = frozenset("""
+    whisper plot rebel covert code spy secret shadow under ground
+    cell group band gather meet plan signal sign mark hidden
+    silent quiet still wait watch rise stand fall break change
+""".split())
+
+# §6.1 nation abstractions: (primary / fruit, opposing / work)
+NATION_ABSTRACTIONS: Dict[str, Tuple[str, str]] = {
+    "Corinthia": ("Temperance", "Adultery"),
+    "Carnea": ("Joy", "Drunkenness"),
+    "Patmos": ("Meekness", "Seditions"),
+    "Gilead": ("Longsuffering", "Wrath"),
+    "Kanaan": ("Faith", "Idolatry"),
+    "Aethelgard": ("Love", "Hatred"),
+    "Niridia": ("Gentleness", "Murders"),
+    "Salomia": ("Peace", "Sedition"),
+    "Tobin": ("Goodness", "Envyings"),
+}
+
+
+def nation_abstraction(nation: str, act: int) -> str:
+    """§6.2: opposing abstraction dominates Acts 1-2, Act 3 restores the primary."""
+    primary, opposing = NATION_ABSTRACTIONS[nation]
+    return opposing if act <= 2 else primary
+
+
+# Theme mask bit of each nation (tag_themes.py), in §6.1 order
+NATION_BITS: Dict[str, int] = {nation: 1 << i for i, nation in enumerate(NATION_ABSTRACTIONS)}
+
+NATION_LEXICONS: Dict[str, FrozenSet[str]] = {
+    "Corinthia": ADULTERY_LEXICON,
+    "Carnea": DRUNKENNESS_LEXICON,
+    "Patmos": SEDITION_LEXICON,
+    "Salomia": SEDITION_LEXICON,
+}
+
+
+def keyword_tagger(keywords: FrozenSet[str]) -> Callable:
+    """Tag function: 1 if word1 or word2 is a keyword (case-insensitive exact)."""
+    def tag(phrase) -> bool:
+        return phrase.word1.lower() in keywords or phrase.word2.lower() in keywords
+    return tag
+
+
+def theme_mask_tagger(phrase_masks, nation: str) -> Callable:
+    """Tag function reading precomputed theme masks (indexed by Phrase.phrase_id)."""
+    bit = NATION_BITS[nation]
+    size = len(phrase_masks)
+
+    def tag(phrase) -> bool:
+        return phrase.phrase_id < size and bool(phrase_masks[phrase.phrase_id] & bit)
+    return tag
+
+
+# =============================================================================
+# CONSTRAINTS
+# =============================================================================
+
+@dataclass(eq=False)
+class LevelConstraints:
+    """§10 rules for one tier/nation, applied phrase by phrase during search."""
+    difficulty_min: float = float("-inf")
+    difficulty_max: float = float("inf")
+    density_range: Optional[Tuple[float, float]] = None  # None = no theme rule
+    tag_func: Optional[Callable] = None
+    max_consecutive: int = MAX_CONSECUTIVE_TAGGED
+    _tags: Dict[int, bool] = field(default_factory=dict, repr=False)  # phrase_id -> tag
+
+    def allows(self, phrase) -> bool:
+        """§10.1 difficulty band (static, per phrase)."""
+        return self.difficulty_min <= phrase.difficulty_score <= self.difficulty_max
+
+    def tag(self, phrase) -> bool:
+        """Theme tag of a phrase (cached by phrase ID)."""
+        if self.tag_func is None:
+            return False
+        tag = self._tags.get(phrase.phrase_id)
+        if tag is None:
+            tag = self._tags[phrase.phrase_id] = bool(self.tag_func(phrase))
+        return tag
+
+    @property
+    def has_theme_rule(self) -> bool:
+        return self.density_range is not None and self.tag_func is not None
+
+    def tagged_bounds(self, length: int) -> Tuple[int, int]:
+        """Allowed tagged-phrase count for a path of `length` phrases."""
+        low, high = self.density_range
+        # Epsilon so float error (e.g. 0.55 * 20 = 11.000000000000002) cannot shift a bound
+        return math.ceil(low * length - 1e-9), math.floor(high * length + 1e-9)
+
+    def can_extend(self, tags: List[bool], tagged: int, tag: bool, length: int) -> bool:
+        """
+        Whether a phrase with theme tag `tag` may be appended to a path.
+
+        Args:
+            tags: Theme tags of the phrases already on the path
+            tagged: sum(tags)
+            tag: Tag of the candidate phrase
+            length: Target path length
+        """
+        if not self.has_theme_rule:
+            return True
+
+        position = len(tags)
+        run = 0
+        while run < len(tags) and tags[-1 - run]:
+            run += 1
+
+        if tag:
+            if run >= self.max_consecutive:
+                return False
+            if position == 1 and tags[0]:
+                return False
+            if position == length - 1 and tags[-1]:
+                return False
+
+        # Forward check on density
+        min_tagged, max_tagged = self.tagged_bounds(length)
+        tagged += tag
+        if tagged > max_tagged:
+            return False
+        run = run + 1 if tag else 0
+        return tagged + _max_more_tags(length - position - 1, run, self.max_consecutive) >= min_tagged
+
+    def violations(self, path: list) -> List[str]:
+        """Every §10.1/§10.4 rule a finished path breaks (empty if valid)."""
+        errors = []
+        for i, p in enumerate(path, 1):
+            if not self.allows(p):
+                errors.append(f"Phrase {i} '{p.phrase}' difficulty {p.difficulty_score} outside band")
+        if not self.has_theme_rule or not path:
+            return errors
+
+        tags = [self.tag(p) for p in path]
+        min_tagged, max_tagged = self.tagged_bounds(len(path))
+        if not min_tagged <= sum(tags) <= max_tagged:
+            errors.append(f"Theme density {sum(tags)}/{len(path)} outside {self.density_range}")
+        run = 0
+        for tag in tags:
+            run = run + 1 if tag else 0
+            if run > self.max_consecutive:
+                errors.append(f"More than {self.max_consecutive} consecutive tagged phrases")
+                break
+        if len(tags) >= 2 and tags[0] and tags[1]:
+            errors.append("Tagged phrases at positions 1-2")
+        if len(tags) >= 2 and tags[-1] and tags[-2]:
+            errors.append("Tagged phrases at the last two positions")
+        return errors
+
+
+@lru_cache(maxsize=None)
+def _max_more_tags(remaining: int, run: int, max_consecutive: int) -> int:
+    """Most tags that fit in `remaining` positions after a run of `run` tags."""
+    count = 0
+    for _ in range(remaining):
+        if run >= max_consecutive:
+            run = 0
+        else:
+            run += 1
+            count += 1
+    return count
+
+
+def difficulty_window(tier: int) -> Tuple[float, float]:
+    """§10.1 (min, max) difficulty_score for a tier."""
+    rules = TIER_LEVEL_RULES[min(tier, max(TIER_LEVEL_RULES))]
+    window = rules["difficulty_target"] * rules["window_percent"] / 100
+    return rules["difficulty_target"] - window, rules["difficulty_target"] + window
+
+
+def constraints_for(tier: int, nation: Optional[str] = None, act: int = 1, phrase_masks=None) -> LevelConstraints:
+    """
+    Build the §10 constraints for a tier (and nation/act, for theme density).
+
+    phrase_masks: theme masks by phrase ID (tag_themes.phrase_theme_masks);
+    without them phrases are matched against the lexicon.
+    """
+    rules = TIER_LEVEL_RULES[min(tier, max(TIER_LEVEL_RULES))]
+    difficulty_min, difficulty_max = difficulty_window(tier)
+    lexicon = NATION_LEXICONS.get(nation) if act <= 2 else None
+    tag_func = None
+    if lexicon:
+        tag_func = theme_mask_tagger(phrase_masks, nation) if phrase_masks is not None else keyword_tagger(lexicon)
+    return LevelConstraints(
+        difficulty_min=difficulty_min,
+        difficulty_max=difficulty_max,
+        density_range=rules["theme_density_range"] if lexicon else None,
+        tag_func=tag_func,
+    )
@@ -1,17 +1,48 @@
 #!/usr/bin/env python3
 """
 Merge and deduplicate all phrase CSV files into a unified master file.
+
+Two modes:
+- in-memory (default): load every batch, dedupe, sort
+- streaming (--streaming): external merge sort with bounded memory; rows are
+  normalized one at a time, sorted in fixed-size runs spilled to temp files,
+  then k-way merged. First occurrence still wins, output order is identical.
+
+Both modes screen rows against the profanity / safe-word lists
+(data/filters/profanity_v1.json) as a streaming stage before deduplication,
+using one compiled automaton (profanity_filter.py).
 """
 
+import argparse
 import csv
+import heapq
+import json
 import os
+import sys
+import tempfile
 from pathlib import Path
 from collections import defaultdict
 
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from profanity_filter import FILTER_FILE, load_profanity_filter
+
 # Paths
 DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
 OUTPUT_FILE = DATA_DIR / "phrases_master.csv"
 
+# Source files in precedence order (first occurrence of a phrase wins)
+BATCH_FILES = [
+    "batch1_household_everyday.csv",
+    "batch2_food_drink.csv",
+    "batch3_transport_outdoor.csv",
+    "batch4_school_social.csv",
+    "batch5_commerce_work.csv",
+    "batch6_abstraction.csv"
+]
+SCORED_FILE = "phrases_scored.csv"
+
 # Unified schema for output
 UNIFIED_SCHEMA = [
     "phrase", "word1", "word2", "bigram_frequency", "avg_zipf", "PFS",
@@ -19,6 +50,10 @@ UNIFIED_SCHEMA = [
     "category_tag", "difficulty_score", "entropy", "familiarity"
 ]
 
+# Streaming merge settings
+RUN_SIZE = 100000      # rows sorted in memory per spilled run
+MAX_FAN_IN = 64        # runs merged at once (bounds open file handles)
+
 def normalize_bigram_frequency(value):
     """Convert various frequency formats to standardized values."""
     if isinstance(value, str):
@@ -62,9 +97,8 @@ def convert_concreteness(value, abstraction_level):
         return 0.5
     return 0.7  # default for semi-abstract
 
-def read_batch_file(filepath):
-    """Read a batch CSV file and normalize to unified schema."""
-    phrases = []
+def iter_batch_file(filepath):
+    """Stream a batch CSV file, yielding rows normalized to unified schema."""
     with open(filepath, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -116,12 +150,14 @@ def read_batch_file(filepath):
                 "entropy": int(float(row.get("entropy", 1))),
                 "familiarity": int(float(row.get("familiarity", 4)))
             }
-            phrases.append(normalized)
-    return phrases
+            yield normalized
 
-def read_scored_file(filepath):
-    """Read the original phrases_scored.csv with its different schema."""
-    phrases = []
+def read_batch_file(filepath):
+    """Read a batch CSV file and normalize to unified schema."""
+    return list(iter_batch_file(filepath))
+
+def iter_scored_file(filepath):
+    """Stream the original phrases_scored.csv, yielding normalized rows."""
     with open(filepath, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -170,25 +206,36 @@ def read_scored_file(filepath):
                 "entropy": entropy,
                 "familiarity": familiarity
             }
-            phrases.append(normalized)
-    return phrases
+            yield normalized
 
-def merge_and_deduplicate():
+def read_scored_file(filepath):
+    """Read the original phrases_scored.csv with its different schema."""
+    return list(iter_scored_file(filepath))
+
+def open_profanity_filter(filter_file):
+    """Compiled profanity filter, or None (with a note) if disabled or missing."""
+    if filter_file is None:
+        return None
+    profanity = load_profanity_filter(filter_file)
+    if profanity is None:
+        print(f"Profanity filter not found: {filter_file} (rows not screened)")
+    else:
+        print(f"Profanity filter: {len(profanity.profanity)} terms, {len(profanity.safe_words)} safe words")
+    return profanity
+
+def screen_rows(rows, profanity, rejected):
+    """Streaming profanity stage (pass-through without a filter)."""
+    return rows if profanity is None else profanity.screen(rows, rejected)
+
+def merge_and_deduplicate(filter_file=FILTER_FILE):
     """Main function to merge all files and remove duplicates."""
     all_phrases = []
     file_counts = {}
+    profanity = open_profanity_filter(filter_file)
+    rejected = []
 
     # Read batch files (batch1-6)
-    batch_files = [
-        "batch1_household_everyday.csv",
-        "batch2_food_drink.csv",
-        "batch3_transport_outdoor.csv",
-        "batch4_school_social.csv",
-        "batch5_commerce_work.csv",
-        "batch6_abstraction.csv"
-    ]
-
-    for batch_file in batch_files:
+    for batch_file in BATCH_FILES:
         filepath = DATA_DIR / batch_file
         if filepath.exists():
             phrases = read_batch_file(filepath)
@@ -197,19 +244,19 @@ def merge_and_deduplicate():
             print(f"Read {len(phrases)} phrases from {batch_file}")
 
     # Read original scored file
-    scored_file = DATA_DIR / "phrases_scored.csv"
+    scored_file = DATA_DIR / SCORED_FILE
     if scored_file.exists():
         phrases = read_scored_file(scored_file)
-        file_counts["phrases_scored.csv"] = len(phrases)
+        file_counts[SCORED_FILE] = len(phrases)
         all_phrases.extend(phrases)
-        print(f"Read {len(phrases)} phrases from phrases_scored.csv")
+        print(f"Read {len(phrases)} phrases from {SCORED_FILE}")
 
     # Deduplicate by phrase (keep first occurrence, which has better data)
     seen = set()
     unique_phrases = []
     duplicates = []
 
-    for p in all_phrases:
+    for p in screen_rows(all_phrases, profanity, rejected):
         phrase_key = p["phrase"].lower().strip()
         if phrase_key not in seen:
             seen.add(phrase_key)
@@ -227,24 +274,146 @@ def merge_and_deduplicate():
         for p in unique_phrases:
             writer.writerow(p)
 
-    # Print summary
+    print_merge_summary(len(all_phrases), len(unique_phrases), len(duplicates), duplicates[:20], file_counts, rejected)
+
+    return unique_phrases, duplicates
+
+def print_merge_summary(total_read, unique_count, duplicate_count, sample_duplicates, file_counts, rejected):
+    """Print the merge report shared by both merge modes."""
     print("\n" + "="*60)
     print("MERGE SUMMARY")
     print("="*60)
-    print(f"Total phrases read: {len(all_phrases)}")
-    print(f"Unique phrases: {len(unique_phrases)}")
-    print(f"Duplicates removed: {len(duplicates)}")
+    print(f"Total phrases read: {total_read}")
+    print(f"Profanity rejected: {len(rejected)}")
+    print(f"Unique phrases: {unique_count}")
+    print(f"Duplicates removed: {duplicate_count}")
     print(f"\nFile breakdown:")
     for fname, count in file_counts.items():
         print(f"  {fname}: {count}")
     print(f"\nOutput written to: {OUTPUT_FILE}")
 
-    if duplicates:
+    if sample_duplicates:
         print(f"\nFirst 20 duplicates removed:")
-        for d in duplicates[:20]:
+        for d in sample_duplicates:
             print(f"  - {d}")
 
-    return unique_phrases, duplicates
+    if rejected:
+        print(f"\nFirst 20 profanity rejections:")
+        for phrase, term in rejected[:20]:
+            print(f"  - {phrase} ('{term}')")
+
+# =============================================================================
+# STREAMING MERGE (external sort)
+# =============================================================================
+
+def iter_source_rows(file_counts):
+    """Yield normalized rows from every source file in precedence order."""
+    sources = [(name, iter_batch_file) for name in BATCH_FILES] + [(SCORED_FILE, iter_scored_file)]
+    for name, reader in sources:
+        filepath = DATA_DIR / name
+        if not filepath.exists():
+            continue
+        count = 0
+        for row in reader(filepath):
+            count += 1
+            yield row
+        file_counts[name] = count
+        print(f"Read {count} phrases from {name}")
+
+def _write_run(records, temp_dir):
+    """Sort one run by (phrase key, source order) and spill it to disk."""
+    records.sort(key=lambda r: (r[0], r[1]))
+    fd, path = tempfile.mkstemp(suffix=".run", dir=temp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return path
+
+def _iter_run(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+def _merge_runs(run_paths, temp_dir):
+    """Merge runs down to at most MAX_FAN_IN, then return the final merged stream."""
+    while len(run_paths) > MAX_FAN_IN:
+        merged_paths = []
+        for i in range(0, len(run_paths), MAX_FAN_IN):
+            group = run_paths[i:i + MAX_FAN_IN]
+            fd, path = tempfile.mkstemp(suffix=".run", dir=temp_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for record in heapq.merge(*[_iter_run(p) for p in group], key=lambda r: (r[0], r[1])):
+                    f.write(json.dumps(record) + "\n")
+            for p in group:
+                os.remove(p)
+            merged_paths.append(path)
+        run_paths = merged_paths
+    return heapq.merge(*[_iter_run(p) for p in run_paths], key=lambda r: (r[0], r[1]))
+
+def merge_streaming(run_size=RUN_SIZE, filter_file=FILTER_FILE):
+    """
+    Merge all files with bounded memory.
+
+    Rows are tagged with their global source position, sorted by
+    (phrase key, position) in runs of run_size, and k-way merged. The first
+    record of each key in the merged stream is the first occurrence across
+    the sources, so precedence matches merge_and_deduplicate. Output order is
+    phrase.lower(), the same as the in-memory sort.
+
+    Returns:
+        Tuple of (unique count, duplicate count)
+    """
+    file_counts = {}
+    profanity = open_profanity_filter(filter_file)
+    rejected = []
+    position = 0
+    unique_count = 0
+    duplicate_count = 0
+    sample_duplicates = []
+
+    with tempfile.TemporaryDirectory(prefix="merge_runs_") as temp_dir:
+        # Phase 1: spill sorted runs
+        run_paths = []
+        records = []
+        for row in screen_rows(iter_source_rows(file_counts), profanity, rejected):
+            records.append([row["phrase"].lower().strip(), position, row])
+            position += 1
+            if len(records) >= run_size:
+                run_paths.append(_write_run(records, temp_dir))
+                records = []
+        if records:
+            run_paths.append(_write_run(records, temp_dir))
+
+        # Phase 2: k-way merge, keep the first record of each key
+        with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=UNIFIED_SCHEMA)
+            writer.writeheader()
+            last_key = None
+            for phrase_key, _, row in _merge_runs(run_paths, temp_dir):
+                if phrase_key == last_key:
+                    duplicate_count += 1
+                    if len(sample_duplicates) < 20:
+                        sample_duplicates.append(row["phrase"])
+                    continue
+                last_key = phrase_key
+                writer.writerow(row)
+                unique_count += 1
+
+    total_read = sum(file_counts.values())
+    print_merge_summary(total_read, unique_count, duplicate_count, sample_duplicates, file_counts, rejected)
+
+    return unique_count, duplicate_count
 
 if __name__ == "__main__":
-    merge_and_deduplicate()
+    parser = argparse.ArgumentParser(description="Merge and deduplicate phrase CSV files.")
+    parser.add_argument("--streaming", action="store_true", help="bounded-memory external merge sort")
+    parser.add_argument("--run-size", type=int, default=RUN_SIZE, help="rows per sorted run in streaming mode")
+    parser.add_argument("--profanity-filter", type=Path, default=FILTER_FILE, help="profanity / safe-word list")
+    parser.add_argument("--no-profanity-filter", action="store_true", help="do not screen rows")
+    args = parser.parse_args()
+
+    filter_file = None if args.no_profanity_filter else args.profanity_filter
+    if args.streaming:
+        merge_streaming(run_size=args.run_size, filter_file=filter_file)
+    else:
+        merge_and_deduplicate(filter_file=filter_file)
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Async Google Ngrams Fetcher for WordRun!
+
+Replaces the one-curl-per-phrase loop in spoken_pfs with:
+- Request batching: the ngrams endpoint takes comma-separated phrases
+  (BATCH_SIZE per request)
+- Bounded-concurrency keep-alive HTTP/1.1 connection pool (asyncio streams)
+- Token-bucket rate limiter shared by all requests
+- Retries with exponential backoff + jitter on errors, 429 and 5xx
+
+Pseudo-counts match spoken_pfs.query_google_ngrams:
+    int(mean(timeseries) * 1_000_000_000); phrases absent from a response = 0.
+Phrases whose batch still fails after retries come back as None.
+
+Includes a local mock server that replays the frequency store's cached
+counts in the same JSON format, so the fetcher can be exercised offline:
+
+    python ngram_fetcher.py --serve                    # mock on 127.0.0.1:8765
+    python spoken_pfs.py --base-url http://127.0.0.1:8765/ngrams/json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import ssl
+import statistics
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from frequency_store import open_store
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data")
+PHRASES_DIR = DATA_DIR / "phrases"
+STORE_FILE = PHRASES_DIR / "frequency_store.db"
+
+NGRAMS_URL = "https://books.google.com/ngrams/json"
+START_YEAR = 2000
+END_YEAR = 2019
+CORPUS = "en-US-2019"  # American English
+
+# Fetcher defaults
+BATCH_SIZE = 12            # phrases per request
+CONCURRENCY = 8            # open connections
+RATE_PER_SECOND = 5.0      # requests per second (token refill rate)
+BURST = 5                  # token bucket capacity
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5         # seconds; doubled per retry
+REQUEST_TIMEOUT = 20.0
+
+MOCK_HOST = "127.0.0.1"
+MOCK_PORT = 8765
+
+
+def timeseries_to_count(timeseries: List[float]) -> int:
+    """Pseudo-count from a ngrams timeseries (same scaling as spoken_pfs)."""
+    if not timeseries:
+        return 0
+    return int(statistics.mean(timeseries) * 1_000_000_000)
+
+
+# =============================================================================
+# RATE LIMITER
+# =============================================================================
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, at most `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# =============================================================================
+# CONNECTION POOL
+# =============================================================================
+
+class HTTPError(Exception):
+    """Non-200 response."""
+
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, at most `size` open."""
+
+    def __init__(self, base_url: str, size: int, verify_ssl: bool = True):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.host = parsed.hostname
+        self.use_ssl = parsed.scheme == "https"
+        self.port = parsed.port or (443 if self.use_ssl else 80)
+        self.path = parsed.path or "/"
+        self.ssl_context = None
+        if self.use_ssl:
+            self.ssl_context = ssl.create_default_context()
+            if not verify_ssl:
+                self.ssl_context.check_hostname = False
+                self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def _connect(self):
+        return await asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl_context,
+            server_hostname=self.host if self.use_ssl else None
+        )
+
+    async def get(self, query: str, timeout: float = REQUEST_TIMEOUT) -> bytes:
+        """GET path?query on a pooled connection; returns the body."""
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                body, keep_alive = await asyncio.wait_for(self._request(conn, query), timeout)
+            except BaseException:
+                conn[1].close()
+                raise
+            if keep_alive:
+                self._idle.append(conn)
+            else:
+                conn[1].close()
+            return body
+
+    async def _request(self, conn, query: str) -> Tuple[bytes, bool]:
+        reader, writer = conn
+        writer.write((
+            f"GET {self.path}?{query} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            "Accept: application/json\r\n"
+            "Connection: keep-alive\r\n"
+            "User-Agent: wordrun-ngram-fetcher\r\n\r\n"
+        ).encode("ascii"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        if status != 200:
+            raise HTTPError(status)
+        return body, keep_alive
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+# =============================================================================
+# FETCHER
+# =============================================================================
+
+@dataclass
+class FetchStats:
+    """Counters for one fetch run."""
+    requests: int = 0
+    retries: int = 0
+    failed_batches: int = 0
+    phrases: int = 0
+    seconds: float = 0.0
+
+
+class NgramFetcher:
+    """Batched, concurrent, rate-limited ngrams client."""
+
+    def __init__(
+        self,
+        base_url: str = NGRAMS_URL,
+        batch_size: int = BATCH_SIZE,
+        concurrency: int = CONCURRENCY,
+        rate: float = RATE_PER_SECOND,
+        burst: int = BURST,
+        max_retries: int = MAX_RETRIES,
+        verify_ssl: bool = True
+    ):
+        self.base_url = base_url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.verify_ssl = verify_ssl
+        self.bucket = TokenBucket(rate, burst)
+        self.stats = FetchStats()
+
+    def _query(self, batch: List[str]) -> str:
+        return urllib.parse.urlencode({
+            "content": ",".join(batch),
+            "year_start": START_YEAR,
+            "year_end": END_YEAR,
+            "corpus": CORPUS,
+            "smoothing": 0,
+        })
+
+    async def _fetch_batch(self, pool: ConnectionPool, batch: List[str]) -> Dict[str, Optional[int]]:
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            self.stats.requests += 1
+            try:
+                body = await pool.get(self._query(batch))
+                data = json.loads(body)
+                counts = {
+                    item["ngram"].lower().strip(): timeseries_to_count(item.get("timeseries", []))
+                    for item in data if "ngram" in item
+                }
+                return {phrase: counts.get(phrase, 0) for phrase in batch}
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, HTTPError) as e:
+                retryable = not isinstance(e, HTTPError) or e.status == 429 or e.status >= 500
+                if not retryable or attempt == self.max_retries:
+                    print(f"  Error querying batch starting '{batch[0]}': {e}")
+                    break
+                self.stats.retries += 1
+                await asyncio.sleep(BACKOFF_BASE * (2 ** attempt) * (1 + random.random()))
+        self.stats.failed_batches += 1
+        return {phrase: None for phrase in batch}
+
+    async def fetch(
+        self,
+        phrases: List[str],
+        on_batch: Optional[Callable[[Dict[str, Optional[int]]], None]] = None
+    ) -> Dict[str, Optional[int]]:
+        """
+        Fetch pseudo-counts for phrases (lowercased, deduplicated).
+
+        Args:
+            phrases: Phrases to query
+            on_batch: Called with each batch's results as it completes
+
+        Returns:
+            Dict of phrase -> count (None if the request failed)
+        """
+        started = time.monotonic()
+        unique = list(dict.fromkeys(p.lower().strip() for p in phrases))
+        batches = [unique[i:i + self.batch_size] for i in range(0, len(unique), self.batch_size)]
+        queue: asyncio.Queue = asyncio.Queue()
+        for batch in batches:
+            queue.put_nowait(batch)
+
+        results: Dict[str, Optional[int]] = {}
+        pool = ConnectionPool(self.base_url, self.concurrency, self.verify_ssl)
+
+        async def worker():
+            while True:
+                try:
+                    batch = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                batch_results = await self._fetch_batch(pool, batch)
+                results.update(batch_results)
+                if on_batch:
+                    on_batch(batch_results)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(batches)))))
+        finally:
+            pool.close()
+
+        self.stats.phrases += len(unique)
+        self.stats.seconds += time.monotonic() - started
+        return results
+
+    def fetch_sync(self, phrases: List[str], on_batch=None) -> Dict[str, Optional[int]]:
+        """Blocking wrapper around fetch()."""
+        return asyncio.run(self.fetch(phrases, on_batch))
+
+
+# =============================================================================
+# MOCK SERVER (offline stand-in replaying cached counts)
+# =============================================================================
+
+class MockNgramServer:
+    """
+    Minimal keep-alive HTTP server answering /ngrams/json like Google does,
+    from a phrase -> count dict. Phrases not in the dict are omitted from the
+    response (as Google omits unseen ngrams).
+
+    latency: seconds added per request; fail_rate: fraction answered 503.
+    """
+
+    def __init__(self, counts: Dict[str, int], latency: float = 0.0, fail_rate: float = 0.0, seed: int = 0):
+        self.counts = counts
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._server = None
+        self._writers = set()
+
+    def _response_body(self, query: str) -> bytes:
+        params = urllib.parse.parse_qs(query)
+        content = params.get("content", [""])[0]
+        years = int(params.get("year_end", [END_YEAR])[0]) - int(params.get("year_start", [START_YEAR])[0]) + 1
+        items = []
+        for phrase in content.split(","):
+            count = self.counts.get(phrase.lower().strip())
+            if count:
+                # Half-unit offset so int(mean * 1e9) recovers the exact count
+                value = (count + 0.5) / 1_000_000_000
+                items.append({"ngram": phrase, "parent": "", "type": "NGRAM", "timeseries": [value] * years})
+        return json.dumps(items).encode("utf-8")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                target = request_line.split()[1].decode("ascii")
+                _, _, query = target.partition("?")
+                if self._rng.random() < self.fail_rate:
+                    status, body = "503 Service Unavailable", b"[]"
+                else:
+                    status, body = "200 OK", self._response_body(query)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode("ascii") + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # client went away, or server stopped mid keep-alive
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self, host: str = MOCK_HOST, port: int = MOCK_PORT) -> str:
+        """Start serving; returns the base URL (port 0 picks a free port)."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}/ngrams/json"
+
+    async def stop(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+
+def load_cache_counts(path: Path = STORE_FILE) -> Dict[str, int]:
+    """Load cached counts from the frequency store for replay."""
+    with open_store(path) as store:
+        return store.all_counts()
+
+
+async def _serve_forever(counts: Dict[str, int], host: str, port: int, latency: float, fail_rate: float):
+    server = MockNgramServer(counts, latency=latency, fail_rate=fail_rate)
+    url = await server.start(host, port)
+    print(f"Mock ngrams server replaying {len(counts)} cached phrases at {url}")
+    await asyncio.Event().wait()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Async ngrams fetcher / offline mock server.")
+    parser.add_argument("--serve", action="store_true", help="run the mock server")
+    parser.add_argument("--port", type=int, default=MOCK_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="mock: seconds per request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="mock: fraction of 503 responses")
+    parser.add_argument("--base-url", default=NGRAMS_URL, help="fetch: endpoint")
+    parser.add_argument("phrases", nargs="*", help="fetch: phrases to query")
+    args = parser.parse_args()
+
+    if args.serve:
+        try:
+            asyncio.run(_serve_forever(load_cache_counts(), MOCK_HOST, args.port, args.latency, args.fail_rate))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if not args.phrases:
+        parser.error("give phrases to fetch, or --serve")
+
+    fetcher = NgramFetcher(base_url=args.base_url)
+    for phrase, count in fetcher.fetch_sync(args.phrases).items():
+        print(f"  {phrase}: {count}")
+
+
+if __name__ == "__main__":
+    main()
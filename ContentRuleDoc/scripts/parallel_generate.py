@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+Parallel Level Generation for WordRun!
+
+Shards the campaign by (tier, nation) and generates shards across a
+ProcessPoolExecutor.
+
+Flow:
+1. Plan shards: every contiguous run of levels with the same tier, act and
+   nation (ContentRuleDoc.md sections 0.1 and 9.1)
+2. Build each tier's filtered graph once in the parent; forked workers share
+   it copy-on-write, spawned workers rebuild it from the mmap'd phrase index
+3. Workers propose candidate paths for their shard's next levels, blocking
+   the accepted phrases that the PhraseReuseTracker rules forbid there (no
+   repeats within the first 20 levels, then a reuse gap of 10 levels)
+4. The coordinator accepts candidates in shard order, rejecting any that
+   break the reuse rules against the levels accepted so far; short shards
+   are resubmitted next round, and accepted candidates are checkpointed
+   after every round
+5. Validate (reuse checked with PhraseReuseTracker) and write
+
+Results are collected by shard, never by completion order, and every task's
+RNG stream is derived from (seed, shard, round), so output is deterministic for a
+given seed regardless of worker count. The same holds for a run resumed
+from a checkpoint.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Set, Optional, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pathfinder import ENGINES, Pathfinder, PhraseBitset, PhraseGraph, Phrase
+from early_filter import PhraseReuseTracker
+from level_constraints import constraints_for, difficulty_window
+from checkpoint import clear_checkpoint, file_sha256, load_checkpoint, save_checkpoint
+from rng_streams import stream_seed
+from tag_themes import phrase_theme_masks, update_theme_tags
+from generate_early_levels import (
+    TIER_CONFIG, GraphStats, build_filtered_graph, build_level_data, check_graph_sufficiency,
+    create_tier_filtered_phrases, rank_start_words, validate_level, write_output
+)
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data")
+PHRASES_DIR = DATA_DIR / "phrases"
+LEVELS_DIR = DATA_DIR / "levels"
+INPUT_FILE = PHRASES_DIR / "phrases_master_pfs.csv"
+OUTPUT_FILE = LEVELS_DIR / "parallel_levels.json"
+CHECKPOINT_FILE = LEVELS_DIR / "parallel_levels.checkpoint.json"
+
+# Campaign structure (ContentRuleDoc.md section 0.1)
+TOTAL_LEVELS = 3024
+LEVELS_PER_ACT = 1008
+LEVELS_PER_NATION = 112
+NATIONS = [
+    "Corinthia", "Carnea", "Patmos", "Gilead", "Kanaan",
+    "Aethelgard", "Niridia", "Salomia", "Tobin"
+]
+
+# Last level of each difficulty tier (ContentRuleDoc.md section 9.1)
+TIER_LAST_LEVEL = [302, 604, 906, 1208, 1512, 1814, 2116, 2418, 2720, 3024]
+
+# Coordinator settings
+CANDIDATE_SURPLUS = 0.5    # extra candidates per shard to absorb conflicts
+MAX_ROUNDS = 5
+
+
+@dataclass
+class Shard:
+    """A contiguous block of levels sharing tier, act and nation."""
+    shard_id: int
+    tier: int
+    act: int
+    nation: str
+    levels: List[int] = field(default_factory=list)
+
+
+# =============================================================================
+# CAMPAIGN LAYOUT
+# =============================================================================
+
+def level_tier(level: int) -> int:
+    """Global difficulty tier (1-10) of a level."""
+    for tier, last_level in enumerate(TIER_LAST_LEVEL, start=1):
+        if level <= last_level:
+            return tier
+    raise ValueError(f"Level {level} outside campaign (1-{TOTAL_LEVELS})")
+
+
+def level_act(level: int) -> int:
+    """Act (1-3) of a level."""
+    return (level - 1) // LEVELS_PER_ACT + 1
+
+
+def level_nation(level: int) -> str:
+    """Nation visited at a level."""
+    return NATIONS[((level - 1) % LEVELS_PER_ACT) // LEVELS_PER_NATION]
+
+
+def plan_shards(first_level: int = 1, last_level: int = TOTAL_LEVELS) -> List[Shard]:
+    """Split a level range into (tier, act, nation) shards, in level order."""
+    shards: List[Shard] = []
+    for level in range(first_level, last_level + 1):
+        key = (level_tier(level), level_act(level), level_nation(level))
+        if not shards or (shards[-1].tier, shards[-1].act, shards[-1].nation) != key:
+            shards.append(Shard(shard_id=len(shards), tier=key[0], act=key[1], nation=key[2]))
+        shards[-1].levels.append(level)
+    return shards
+
+
+def reuse_neighbours(level: int) -> List[int]:
+    """Levels whose phrases may not appear at `level` (PhraseReuseTracker rules)."""
+    gap = PhraseReuseTracker.REUSE_GAP
+    neighbours = set(range(max(1, level - gap + 1), min(TOTAL_LEVELS, level + gap - 1) + 1))
+    if level <= PhraseReuseTracker.NO_REPEAT_LEVELS:
+        neighbours.update(range(1, PhraseReuseTracker.NO_REPEAT_LEVELS + 1))
+    neighbours.discard(level)
+    return sorted(neighbours)
+
+
+def reuse_blocked(level: int, level_phrases: Dict[int, List[str]]) -> Set[str]:
+    """Phrases already placed at other levels that may not appear at `level`."""
+    blocked: Set[str] = set()
+    for neighbour in reuse_neighbours(level):
+        blocked.update(level_phrases.get(neighbour, ()))
+    return blocked
+
+
+def tier_filter_config(tier: int) -> dict:
+    """Filter settings for a tier; tiers above the table use the last entry."""
+    return TIER_CONFIG[min(tier, max(TIER_CONFIG))]
+
+
+# =============================================================================
+# WORKER (read-only graph per tier)
+# =============================================================================
+
+_TIER_GRAPHS: Dict[int, PhraseGraph] = {}
+_TIER_START_WORDS: Dict[int, List[Tuple[str, int]]] = {}
+_TIER_STATS: Dict[int, GraphStats] = {}
+_TIER_PHRASES: Dict[int, Dict[str, Phrase]] = {}
+_INPUT_FILE: Path = INPUT_FILE
+_DIFFICULTY_BANDS = False
+_PHRASE_MASKS = None  # theme masks by phrase ID, loaded on first use
+
+
+def _init_worker(input_file: Path, difficulty_bands: bool = False):
+    """
+    Pool initializer: remember where to load graphs from if not inherited,
+    and whether tier graphs keep only their §10.1 difficulty window.
+    """
+    global _INPUT_FILE, _DIFFICULTY_BANDS, _PHRASE_MASKS
+    if (input_file, difficulty_bands) != (_INPUT_FILE, _DIFFICULTY_BANDS):
+        for cache in (_TIER_GRAPHS, _TIER_START_WORDS, _TIER_STATS, _TIER_PHRASES):
+            cache.clear()
+        _PHRASE_MASKS = None
+    _INPUT_FILE = input_file
+    _DIFFICULTY_BANDS = difficulty_bands
+
+
+def _tier_graph(tier: int) -> PhraseGraph:
+    """Filtered graph for a tier, built once per process."""
+    if tier not in _TIER_GRAPHS:
+        config = tier_filter_config(tier)
+        with contextlib.redirect_stdout(io.StringIO()):
+            pids, _ = create_tier_filtered_phrases(
+                _INPUT_FILE,
+                tier=tier,
+                entropy_cap=config["entropy_cap"],
+                min_pfs=config["min_pfs"],
+                enforce_categories=(tier <= 2),
+                difficulty_range=difficulty_window(tier) if _DIFFICULTY_BANDS else None
+            )
+            graph, stats = build_filtered_graph(_INPUT_FILE, pids)
+        _TIER_GRAPHS[tier] = graph
+        _TIER_STATS[tier] = stats
+        _TIER_PHRASES[tier] = graph.phrases
+        _TIER_START_WORDS[tier] = rank_start_words(graph)
+    return _TIER_GRAPHS[tier]
+
+
+def _theme_masks():
+    """Theme masks for this process's phrase IDs (tags file is current, see generate_parallel)."""
+    global _PHRASE_MASKS
+    if _PHRASE_MASKS is None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            _PHRASE_MASKS = phrase_theme_masks(_INPUT_FILE)
+    return _PHRASE_MASKS
+
+
+def _generate_candidates(
+    tier: int,
+    num_candidates: int,
+    phrases_per_level: int,
+    levels: List[int],
+    level_phrases: Dict[int, List[str]],
+    seed: int,
+    engine: str = "dfs",
+    nation: Optional[str] = None,
+    act: int = 1
+) -> List[dict]:
+    """
+    Worker task: propose up to num_candidates paths for consecutive levels.
+
+    Candidate i is searched for levels[i] (surplus candidates for the levels
+    after it), blocking what the reuse rules forbid there among the accepted
+    phrases in level_phrases and the task's own earlier candidates.
+
+    Start words and tie-breaks come from one RNG stream seeded by `seed`.
+    With a nation, paths are searched under that shard's §10 level
+    constraints (difficulty band, theme density).
+
+    Returns:
+        List of {"start_word", "phrases": [phrase text]} candidates
+    """
+    graph = _tier_graph(tier)
+    start_words = _TIER_START_WORDS[tier]
+    if not start_words:
+        return []
+
+    constraints = constraints_for(tier, nation, act, _theme_masks()) if nation else None
+    pathfinder = Pathfinder(graph, reuse_penalty=0.3, max_reuse=1, engine=engine, constraints=constraints)
+    level_phrases = dict(level_phrases)
+    rng = random.Random(seed)
+    cursor = rng.randrange(len(start_words))
+    candidates = []
+    attempts = 0
+    max_attempts = num_candidates * 10
+
+    while len(candidates) < num_candidates and attempts < max_attempts:
+        attempts += 1
+        start_word = start_words[(cursor + attempts) % len(start_words)][0]
+        level = levels[0] + len(candidates)
+
+        result = pathfinder.find_path(
+            start_word=start_word,
+            target_length=phrases_per_level - 1,
+            used_phrases=PhraseBitset(reuse_blocked(level, level_phrases)),
+            rng=rng
+        )
+
+        if len(result.path) >= phrases_per_level - 1:
+            path = [p.phrase for p in result.path[:phrases_per_level - 1]]
+            candidates.append({"start_word": start_word, "phrases": path})
+            level_phrases[level] = path
+
+    return candidates
+
+
+# =============================================================================
+# COORDINATOR
+# =============================================================================
+
+def _task_seed(seed: int, shard: Shard, round_num: int) -> int:
+    """Independent stream per (tier, nation, first level, round)."""
+    return stream_seed(seed, shard.tier, shard.nation, shard.levels[0], round_num)
+
+
+def validate_parallel_levels(levels: List[dict]) -> Tuple[bool, List[str], List[str]]:
+    """
+    validate_all_levels with the PhraseReuseTracker rules in place of
+    single use across levels.
+
+    Returns:
+        Tuple of (all_passed, all_errors, all_warnings)
+    """
+    print("\n" + "=" * 60)
+    print("STEP 4: STRICT VALIDATION")
+    print("=" * 60)
+
+    tracker = PhraseReuseTracker()
+    all_errors = []
+    all_warnings = []
+    for level_data in sorted(levels, key=lambda l: l["level"]):
+        result = validate_level(level_data, set())
+        all_errors.extend(result.errors)
+        all_warnings.extend(result.warnings)
+        for p in level_data["phrases"]:
+            if not tracker.can_use_phrase(p["phrase"], level_data["level"]):
+                all_errors.append(f"Level {level_data['level']}: Phrase '{p['phrase']}' breaks the reuse rules")
+        for p in level_data["phrases"]:
+            tracker.mark_used(p["phrase"], level_data["level"])
+
+    all_passed = len(all_errors) == 0
+    if all_passed:
+        print(f"  [PASS] All {len(levels)} levels passed validation")
+    else:
+        print(f"  [FAIL] Validation failed with {len(all_errors)} errors:")
+        for err in all_errors[:10]:
+            print(f"    - {err}")
+        if len(all_errors) > 10:
+            print(f"    ... and {len(all_errors) - 10} more errors")
+
+    if all_warnings:
+        print(f"\n  [WARN] {len(all_warnings)} warnings:")
+        for warn in all_warnings[:5]:
+            print(f"    - {warn}")
+
+    return all_passed, all_errors, all_warnings
+
+
+def generate_parallel(
+    first_level: int = 1,
+    last_level: int = TOTAL_LEVELS,
+    phrases_per_level: int = 16,
+    seed: int = 42,
+    workers: Optional[int] = None,
+    engine: str = "dfs",
+    level_constraints: bool = False,
+    input_file: Path = INPUT_FILE,
+    output_file: Path = OUTPUT_FILE,
+    checkpoint_file: Optional[Path] = CHECKPOINT_FILE
+) -> Optional[dict]:
+    """
+    Generate a level range in parallel, sharded by tier and nation.
+
+    Args:
+        first_level: First campaign level to generate
+        last_level: Last campaign level to generate
+        phrases_per_level: Words per level (paths are one phrase shorter)
+        seed: Base seed; output is deterministic for a given seed
+        workers: Process count (default: os.cpu_count())
+        engine: Pathfinder engine ("dfs" or "beam")
+        level_constraints: Enforce §10 difficulty band / theme density in the
+            search; tier graphs are built from the band's index range only
+        input_file: Scored phrase CSV (compiled index is used)
+        output_file: Output JSON
+        checkpoint_file: Accepted candidates are saved here after every
+            round; a rerun with the same config resumes from the next round
+            (None disables)
+
+    Returns:
+        Output data, or None on abort/validation failure
+    """
+    _init_worker(input_file, level_constraints)
+
+    print("\n" + "=" * 60)
+    print("WORDRUN PARALLEL LEVEL GENERATION")
+    print("=" * 60)
+
+    # Workers only read the theme tags, so bring them up to date once here
+    if level_constraints:
+        update_theme_tags(input_file)
+
+    shards = plan_shards(first_level, last_level)
+    workers = workers or os.cpu_count() or 1
+    print(f"\nConfig: levels {first_level}-{last_level}, {len(shards)} shards, {workers} workers")
+
+    # Build every needed tier graph in the parent (shared by forked workers)
+    graph_stats = {}
+    for tier in sorted({s.tier for s in shards}):
+        _tier_graph(tier)
+        stats = _TIER_STATS[tier]
+        tier_levels = sum(len(s.levels) for s in shards if s.tier == tier)
+        is_sufficient, errors = check_graph_sufficiency(stats, tier_levels, phrases_per_level)
+        graph_stats[tier] = {
+            "total_phrases": stats.total_phrases,
+            "unique_words": stats.unique_words,
+            "avg_out_degree": stats.avg_out_degree,
+        }
+        if not is_sufficient:
+            print("\n" + "=" * 60)
+            print(f"GENERATION ABORTED - INSUFFICIENT GRAPH (TIER {tier})")
+            print("=" * 60)
+            return None
+
+    print("\n" + "=" * 60)
+    print("PARALLEL PATHFINDING")
+    print("=" * 60)
+
+    accepted: Dict[int, List[dict]] = {s.shard_id: [] for s in shards}
+    level_phrases: Dict[int, List[str]] = {}  # level -> accepted phrases
+    conflicts = 0
+    pending = list(shards)
+    first_round = 0
+
+    run_config = {
+        "first_level": first_level,
+        "last_level": last_level,
+        "phrases_per_level": phrases_per_level,
+        "seed": seed,
+        "engine": engine,
+        "level_constraints": level_constraints,
+        "input_file": str(input_file),
+        "input_sha256": file_sha256(input_file),
+    }
+    state = load_checkpoint(checkpoint_file, run_config)
+    if state is not None:
+        accepted = {int(shard_id): candidates for shard_id, candidates in state["accepted"].items()}
+        for shard in shards:
+            for level_num, candidate in zip(shard.levels, accepted[shard.shard_id]):
+                level_phrases[level_num] = candidate["phrases"]
+        conflicts = state["conflicts"]
+        pending = [s for s in shards if s.shard_id in set(state["pending"])]
+        first_round = state["next_round"]
+        print(f"  Resumed from checkpoint: round {first_round + 1}, {len(shards) - len(pending)}/{len(shards)} shards complete")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(input_file, level_constraints)) as pool:
+        for round_num in range(first_round, MAX_ROUNDS):
+            if not pending:
+                break
+
+            # Every task in a round sees the same snapshot of accepted levels,
+            # cut down to those that can block its own
+            futures = []
+            for shard in pending:
+                open_levels = shard.levels[len(accepted[shard.shard_id]):]
+                needed = len(open_levels)
+                num_candidates = needed + int(needed * CANDIDATE_SURPLUS) + 1
+                window = set()
+                for level_num in range(open_levels[0], open_levels[0] + num_candidates):
+                    window.update(reuse_neighbours(level_num))
+                futures.append(pool.submit(
+                    _generate_candidates,
+                    shard.tier,
+                    num_candidates,
+                    phrases_per_level,
+                    open_levels,
+                    {level_num: level_phrases[level_num] for level_num in window if level_num in level_phrases},
+                    _task_seed(seed, shard, round_num),
+                    engine,
+                    shard.nation if level_constraints else None,
+                    shard.act
+                ))
+
+            # Settle cross-shard reuse in shard order (deterministic)
+            still_pending = []
+            for shard, future in zip(pending, futures):
+                shard_levels = accepted[shard.shard_id]
+                for candidate in future.result():
+                    if len(shard_levels) >= len(shard.levels):
+                        break
+                    level_num = shard.levels[len(shard_levels)]
+                    blocked = reuse_blocked(level_num, level_phrases)
+                    if any(phrase in blocked for phrase in candidate["phrases"]):
+                        conflicts += 1
+                        continue
+                    shard_levels.append(candidate)
+                    level_phrases[level_num] = candidate["phrases"]
+                if len(shard_levels) < len(shard.levels):
+                    still_pending.append(shard)
+
+            done = len(shards) - len(still_pending)
+            print(f"  Round {round_num + 1}: {done}/{len(shards)} shards complete, {conflicts} conflicts so far")
+            pending = still_pending
+
+            if checkpoint_file is not None:
+                save_checkpoint(checkpoint_file, run_config, {
+                    "accepted": accepted,
+                    "conflicts": conflicts,
+                    "pending": [s.shard_id for s in pending],
+                    "next_round": round_num + 1,
+                })
+
+    # Assign level numbers and materialize phrase data from the tier graphs
+    levels = []
+    for shard in shards:
+        by_phrase = _TIER_PHRASES[shard.tier]
+        for level_num, candidate in zip(shard.levels, accepted[shard.shard_id]):
+            path = [by_phrase[phrase] for phrase in candidate["phrases"]]
+            level_data = build_level_data(level_num, candidate["start_word"], path)
+            level_data.update({"tier": shard.tier, "act": shard.act, "nation": shard.nation})
+            levels.append(level_data)
+
+    if pending:
+        missing = sum(len(s.levels) - len(accepted[s.shard_id]) for s in pending)
+        print(f"  [WARN] {missing} levels could not be generated after {MAX_ROUNDS} rounds")
+
+    validation_passed, errors, warnings = validate_parallel_levels(levels)
+    if pending:
+        validation_passed = False
+        errors.append(f"{len(pending)} shards incomplete")
+
+    output_data = {
+        "generated_at": datetime.now().isoformat(),
+        "pipeline_version": "2.1",
+        "config": {
+            "first_level": first_level,
+            "last_level": last_level,
+            "phrases_per_level": phrases_per_level,
+            "seed": seed,
+            "engine": engine,
+            "level_constraints": level_constraints,
+            "shards": len(shards),
+        },
+        "graph_stats": graph_stats,
+        "conflicts_resolved": conflicts,
+        "validation_passed": validation_passed,
+        "validation_errors": errors,
+        "validation_warnings": warnings,
+        "levels": levels,
+    }
+
+    if not write_output(output_data, output_file):
+        if checkpoint_file is not None:
+            print(f"  Accepted candidates kept in checkpoint: {checkpoint_file}")
+        return None
+
+    clear_checkpoint(checkpoint_file)
+    return output_data
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Generate campaign levels in parallel.")
+    parser.add_argument("--first-level", type=int, default=1)
+    parser.add_argument("--last-level", type=int, default=LEVELS_PER_ACT)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--engine", choices=ENGINES, default="dfs", help="pathfinder engine")
+    parser.add_argument("--constraints", action="store_true", help="enforce §10 difficulty band and theme density")
+    args = parser.parse_args()
+
+    result = generate_parallel(
+        first_level=args.first_level,
+        last_level=args.last_level,
+        seed=args.seed,
+        workers=args.workers,
+        engine=args.engine,
+        level_constraints=args.constraints
+    )
+
+    if result is None:
+        print("\n[PIPELINE FAILED]")
+        sys.exit(1)
+    else:
+        print("\n[PIPELINE SUCCESS]")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
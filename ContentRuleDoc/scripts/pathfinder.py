@@ -14,20 +14,28 @@ Finds paths of specified length using:
 - Category filtering via external filter function
 
 Features:
-- Backtracking when stuck
+- Backtracking when stuck (engine="dfs", default)
+- Beam search (engine="beam"): keeps the beam_width best partial chains by
+  calculate_score at each depth, under a fixed node budget
+- Reachability pruning: branches whose word cannot reach target_length
+  (upper bound from SCC condensation, cached per filter) are never entered
+- Level constraints (optional, see level_constraints.py): §10 difficulty
+  band and theme density rules checked per step with forward checking
 - Node reuse with penalty (soft constraint)
 - Comprehensive logging
 """
 
-import csv
 import json
 import random
 from pathlib import Path
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import List, Dict, Set, Optional, Tuple
+from typing import List, Dict, Set, Optional, Tuple, Iterable
+import heapq
 import logging
 
+from rng_streams import stream_seed
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,7 +48,141 @@ DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases
 INPUT_FILE = DATA_DIR / "phrases_master_pfs.csv"
 
 
-@dataclass
+# Interned word IDs, shared by every graph in the process. Words are
+# lowercased once here, so the DFS hot path only compares ints.
+_WORD_IDS: Dict[str, int] = {}
+_WORDS: List[str] = []
+
+
+def intern_word(word: str) -> int:
+    """Return the interned ID for a word (case-insensitive)."""
+    word = word.lower()
+    word_id = _WORD_IDS.get(word)
+    if word_id is None:
+        word_id = len(_WORDS)
+        _WORD_IDS[word] = word_id
+        _WORDS.append(word)
+    return word_id
+
+
+def word_for_id(word_id: int) -> str:
+    """Return the lowercase word for an interned ID."""
+    return _WORDS[word_id]
+
+
+# Interned phrase IDs (lowercased, stripped phrase text), dense from 0 so
+# per-phrase state can live in bytearray masks indexed by ID.
+_PHRASE_IDS: Dict[str, int] = {}
+_PHRASES: List[str] = []
+
+
+def intern_phrase(phrase: str) -> int:
+    """Return the interned ID for a phrase (case-insensitive)."""
+    key = phrase.lower().strip()
+    phrase_id = _PHRASE_IDS.get(key)
+    if phrase_id is None:
+        phrase_id = len(_PHRASES)
+        _PHRASE_IDS[key] = phrase_id
+        _PHRASES.append(key)
+    return phrase_id
+
+
+def num_phrase_ids() -> int:
+    """Number of phrase IDs issued so far (upper bound for masks)."""
+    return len(_PHRASES)
+
+
+class PhraseBitset:
+    """
+    Set of interned phrase IDs, one byte per ID.
+
+    Membership is an index into a bytearray. Every change is recorded in an
+    undo log, so checkpoint()/rollback() snapshot the set in O(1) and undo
+    in O(changes): a search marks phrases as it goes and rolls back instead
+    of working on a copy.
+    """
+
+    __slots__ = ("bits", "_log")
+
+    def __init__(self, phrases: Iterable[str] = ()):
+        self.bits = bytearray(num_phrase_ids())
+        self._log: List[int] = []  # +(id + 1) = set, -(id + 1) = cleared
+        for phrase in phrases:
+            self.add_id(intern_phrase(phrase))
+
+    def has_id(self, phrase_id: int) -> bool:
+        return phrase_id < len(self.bits) and self.bits[phrase_id] == 1
+
+    def add_id(self, phrase_id: int):
+        bits = self.bits
+        if phrase_id >= len(bits):
+            bits.extend(bytes(max(phrase_id + 1, num_phrase_ids()) - len(bits)))
+        if not bits[phrase_id]:
+            bits[phrase_id] = 1
+            self._log.append(phrase_id + 1)
+
+    def discard_id(self, phrase_id: int):
+        if self.has_id(phrase_id):
+            self.bits[phrase_id] = 0
+            self._log.append(-(phrase_id + 1))
+
+    def __contains__(self, phrase: str) -> bool:
+        phrase_id = _PHRASE_IDS.get(phrase.lower().strip())
+        return phrase_id is not None and self.has_id(phrase_id)
+
+    def add(self, phrase: str):
+        self.add_id(intern_phrase(phrase))
+
+    def discard(self, phrase: str):
+        phrase_id = _PHRASE_IDS.get(phrase.lower().strip())
+        if phrase_id is not None:
+            self.discard_id(phrase_id)
+
+    def update(self, phrases: Iterable[str]):
+        for phrase in phrases:
+            self.add(phrase)
+
+    def __len__(self) -> int:
+        return self.bits.count(1)
+
+    def __iter__(self):
+        """Member phrases (lowercase interned text), in ID order."""
+        find = self.bits.find
+        i = find(1)
+        while i != -1:
+            yield _PHRASES[i]
+            i = find(1, i + 1)
+
+    def checkpoint(self) -> int:
+        """Mark the current state; pass to rollback() to return to it."""
+        return len(self._log)
+
+    def rollback(self, checkpoint: int):
+        """Undo every change made since checkpoint()."""
+        log, bits = self._log, self.bits
+        while len(log) > checkpoint:
+            entry = log.pop()
+            if entry > 0:
+                bits[entry - 1] = 0
+            else:
+                bits[-entry - 1] = 1
+
+    def commit(self):
+        """Forget the undo log (changes so far can no longer be rolled back)."""
+        self._log.clear()
+
+    def union(self, other: "PhraseBitset") -> "PhraseBitset":
+        """New bitset with the members of both (no undo history)."""
+        size = max(len(self.bits), len(other.bits))
+        result = PhraseBitset()
+        result.bits = bytearray(size)
+        result.bits[:len(self.bits)] = self.bits
+        merged = int.from_bytes(result.bits, "little") | int.from_bytes(other.bits, "little")
+        result.bits = bytearray(merged.to_bytes(size, "little"))
+        return result
+
+
+@dataclass(slots=True)
 class Phrase:
     """Represents a phrase with all its attributes."""
     phrase: str
@@ -52,6 +194,15 @@ class Phrase:
     tone_tag: str
     category_tag: str
     level_tier: str
+    difficulty_score: float = 20.0  # Content rules §3.4 (filter only)
+    word1_id: int = field(init=False, repr=False, compare=False)  # Interned lowercase word1
+    word2_id: int = field(init=False, repr=False, compare=False)  # Interned lowercase word2
+    phrase_id: int = field(init=False, repr=False, compare=False)  # Interned lowercase phrase
+
+    def __post_init__(self):
+        self.word1_id = intern_word(self.word1)
+        self.word2_id = intern_word(self.word2)
+        self.phrase_id = intern_phrase(self.phrase)
 
     def __hash__(self):
         return hash(self.phrase)
@@ -70,6 +221,9 @@ class PathfinderStats:
     unique_nodes_available: int = 0
     max_depth_reached: int = 0
     reuses: int = 0
+    pruned: int = 0             # candidates skipped by the reachability table
+    nodes_expanded: int = 0     # beam: candidate chains scored
+    constraint_pruned: int = 0  # candidates rejected by level constraints
 
 
 @dataclass
@@ -86,46 +240,216 @@ class PhraseGraph:
 
     def __init__(self):
         self.phrases: Dict[str, Phrase] = {}  # phrase -> Phrase
-        self.edges: Dict[str, List[Phrase]] = defaultdict(list)  # word -> [phrases starting with word]
-        self.reverse_edges: Dict[str, List[Phrase]] = defaultdict(list)  # word -> [phrases ending with word]
+        self.edges: Dict[int, List[Phrase]] = defaultdict(list)  # word ID -> [phrases starting with word]
+        self.reverse_edges: Dict[int, List[Phrase]] = defaultdict(list)  # word ID -> [phrases ending with word]
+        self.word_ids: Dict[int, None] = {}  # word IDs in the graph, in insertion order
 
     def add_phrase(self, phrase: Phrase):
         """Add a phrase to the graph."""
         self.phrases[phrase.phrase] = phrase
-        self.edges[phrase.word1.lower()].append(phrase)
-        self.reverse_edges[phrase.word2.lower()].append(phrase)
+        self.edges[phrase.word1_id].append(phrase)
+        self.reverse_edges[phrase.word2_id].append(phrase)
+        self.word_ids[phrase.word1_id] = None
+        self.word_ids[phrase.word2_id] = None
+
+    @classmethod
+    def from_index(cls, index, pids: Optional[Iterable[int]] = None) -> "PhraseGraph":
+        """
+        Build a graph from a PhraseIndex's CSR adjacency.
+
+        Only the included rows (pids, default every valid row) become
+        Phrase objects. Each word's edge lists are its CSR slices restricted
+        to those rows, so the graph equals add_phrase() over the rows in
+        CSV order, without appending phrase by phrase.
+        """
+        keep = bytearray(len(index))
+        for pid in (range(len(index)) if pids is None else pids):
+            keep[pid] = index.valid[pid]
+
+        graph = cls()
+        by_pid: Dict[int, Phrase] = {}
+        node_ids: Dict[int, int] = {}  # index word ID -> interned word ID, in first-use order
+        word1, word2 = index.word1, index.word2
+        for pid in range(len(index)):
+            if keep[pid]:
+                # This module's Phrase: run as a script, pathfinder is
+                # imported twice and each copy has its own word registry
+                phrase = by_pid[pid] = index.phrase(pid, Phrase)
+                graph.phrases[phrase.phrase] = phrase
+                node_ids.setdefault(word1[pid], phrase.word1_id)
+                node_ids.setdefault(word2[pid], phrase.word2_id)
+
+        for word_id, node_id in node_ids.items():
+            graph.word_ids[node_id] = None
+            outgoing = [by_pid[pid] for pid in index.outgoing(word_id) if keep[pid]]
+            if outgoing:
+                graph.edges[node_id] = outgoing
+            incoming = [by_pid[pid] for pid in index.incoming(word_id) if keep[pid]]
+            if incoming:
+                graph.reverse_edges[node_id] = incoming
+        return graph
 
     def get_outgoing(self, word: str) -> List[Phrase]:
         """Get all phrases that start with word (can continue from word)."""
-        return self.edges.get(word.lower(), [])
+        return self.edges.get(_WORD_IDS.get(word.lower()), [])
 
     def get_incoming(self, word: str) -> List[Phrase]:
         """Get all phrases that end with word."""
-        return self.reverse_edges.get(word.lower(), [])
+        return self.reverse_edges.get(_WORD_IDS.get(word.lower()), [])
+
+    def get_outgoing_ids(self, word_id: int) -> List[Phrase]:
+        """Get all phrases that start with an interned word ID."""
+        return self.edges.get(word_id, [])
+
+    def get_incoming_ids(self, word_id: int) -> List[Phrase]:
+        """Get all phrases that end with an interned word ID."""
+        return self.reverse_edges.get(word_id, [])
 
     def get_unique_words(self) -> Set[str]:
         """Get all unique words in the graph."""
-        words = set()
-        for phrase in self.phrases.values():
-            words.add(phrase.word1.lower())
-            words.add(phrase.word2.lower())
-        return words
+        return {_WORDS[word_id] for word_id in self.word_ids}
+
+    def num_words(self) -> int:
+        """Number of unique words in the graph."""
+        return len(self.word_ids)
+
+
+def compute_reach_table(graph: PhraseGraph, filter_func=None, max_reuse: int = 1) -> Dict[int, int]:
+    """
+    Upper bound on the number of phrases a path can chain from each word.
+
+    Condenses the (filtered) graph into strongly connected components with
+    Tarjan's algorithm, then runs DP over the condensation DAG. A path
+    passes through components in topological order and uses each phrase at
+    most once, so within a component it can use at most that component's
+    internal phrases; with max_reuse == 1 it can also visit at most the
+    component's words. Tarjan emits sinks first, so successors are always
+    resolved before the components that reach them.
+
+    Returns:
+        Dict of word ID -> max reachable chain length (phrases)
+    """
+    def outgoing(word_id):
+        phrases = graph.edges.get(word_id, [])
+        if filter_func:
+            phrases = [p for p in phrases if filter_func(p)]
+        return phrases
+
+    adjacency = {word_id: outgoing(word_id) for word_id in graph.word_ids}
+
+    # Iterative Tarjan SCC
+    index_of: Dict[int, int] = {}
+    lowlink: Dict[int, int] = {}
+    on_stack: Set[int] = set()
+    stack: List[int] = []
+    component_of: Dict[int, int] = {}
+    components: List[List[int]] = []
+
+    for root in adjacency:
+        if root in index_of:
+            continue
+        work = [(root, 0)]
+        while work:
+            word_id, edge_pos = work.pop()
+            if edge_pos == 0:
+                index_of[word_id] = lowlink[word_id] = len(index_of)
+                stack.append(word_id)
+                on_stack.add(word_id)
+            edges = adjacency[word_id]
+            recursed = False
+            while edge_pos < len(edges):
+                succ = edges[edge_pos].word2_id
+                edge_pos += 1
+                if succ not in index_of:
+                    work.append((word_id, edge_pos))
+                    work.append((succ, 0))
+                    recursed = True
+                    break
+                if succ in on_stack:
+                    lowlink[word_id] = min(lowlink[word_id], index_of[succ])
+            if recursed:
+                continue
+            if lowlink[word_id] == index_of[word_id]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component_of[member] = len(components)
+                    component.append(member)
+                    if member == word_id:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[word_id])
+
+    # DP over the condensation (components are in reverse topological order)
+    component_bound: List[int] = []
+    for comp_id, members in enumerate(components):
+        internal = 0
+        best_exit = 0
+        for word_id in members:
+            for p in adjacency[word_id]:
+                succ_comp = component_of[p.word2_id]
+                if succ_comp == comp_id:
+                    internal += 1
+                else:
+                    best_exit = max(best_exit, 1 + component_bound[succ_comp])
+        if max_reuse <= 1:
+            internal = min(internal, len(members) - 1)
+        component_bound.append(internal + best_exit)
+
+    return {word_id: component_bound[component_of[word_id]] for word_id in adjacency}
+
+
+ENGINES = ("dfs", "beam")
 
 
 class Pathfinder:
-    """Backtracking DFS pathfinder for level generation."""
+    """Pathfinder for level generation (backtracking DFS or beam search)."""
 
     def __init__(
         self,
         graph: PhraseGraph,
         filter_func=None,
         reuse_penalty: float = 0.5,
-        max_reuse: int = 2
+        max_reuse: int = 2,
+        use_reachability: bool = True,
+        engine: str = "dfs",
+        beam_width: int = 16,
+        node_budget: int = 20000,
+        constraints=None
     ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {ENGINES})")
         self.graph = graph
         self.filter_func = filter_func  # Optional filter for valid phrases
         self.reuse_penalty = reuse_penalty
         self.max_reuse = max_reuse
+        self.use_reachability = use_reachability
+        self.engine = engine
+        self.beam_width = beam_width
+        self.node_budget = node_budget  # beam: max candidate chains scored per find_path
+        self.constraints = constraints  # Optional LevelConstraints
+        self._reach_tables: Dict[tuple, Dict[int, int]] = {}
+
+    def reach_table(self) -> Dict[int, int]:
+        """Reachability bounds for the current filter, computed once and cached."""
+        key = (self.filter_func, self.constraints, self.max_reuse, len(self.graph.phrases))
+        table = self._reach_tables.get(key)
+        if table is None:
+            table = compute_reach_table(self.graph, self._static_filter(), self.max_reuse)
+            self._reach_tables[key] = table
+        return table
+
+    def _static_filter(self):
+        """Per-phrase filter: filter_func plus the constraints' difficulty band."""
+        filter_func, constraints = self.filter_func, self.constraints
+        if constraints is None:
+            return filter_func
+        if filter_func is None:
+            return constraints.allows
+        return lambda p: filter_func(p) and constraints.allows(p)
 
     def calculate_score(
         self,
@@ -154,41 +478,66 @@ class Pathfinder:
         start_word: str,
         target_length: int,
         max_depth: int = 50,
-        used_phrases: Set[str] = None,
-        seed: int = None
+        used_phrases: Optional[Iterable[str]] = None,
+        seed: int = None,
+        rng: Optional[random.Random] = None
     ) -> PathResult:
         """
-        Find a path of target_length phrases using backtracking DFS.
+        Find a path of target_length phrases with the configured engine.
 
         Args:
             start_word: Word to start the path from
             target_length: Number of phrases to find
             max_depth: Maximum search depth before abandoning
-            used_phrases: Set of phrases already used (from previous levels)
-            seed: Random seed for reproducibility
+            used_phrases: Phrases already used (from previous levels), as a
+                PhraseBitset or a set of phrase text; left unchanged
+            seed: Seed for a private generator, if no rng is given
+            rng: Generator that breaks ties between equally scored
+                continuations (DFS only; beam ties are broken by CES and
+                expansion order). Without rng or seed, ties keep graph order.
+                The global `random` module is never reseeded.
 
         Returns:
             PathResult with path, score, and statistics
         """
-        if seed is not None:
-            random.seed(seed)
+        if rng is None and seed is not None:
+            rng = random.Random(seed)
 
         if used_phrases is None:
-            used_phrases = set()
+            used_phrases = PhraseBitset()
+        elif not isinstance(used_phrases, PhraseBitset):
+            used_phrases = PhraseBitset(used_phrases)
+
+        if self.engine == "beam":
+            return self._find_path_beam(start_word, target_length, used_phrases)
+
+        # The DFS marks its path in used_phrases and rolls back when done
+        checkpoint = used_phrases.checkpoint()
 
         stats = PathfinderStats()
-        stats.unique_nodes_available = len(self.graph.get_unique_words())
+        stats.unique_nodes_available = self.graph.num_words()
 
-        # Track word usage in current path
-        used_words: Dict[str, int] = defaultdict(int)
-        used_words[start_word.lower()] = 1
+        # Track word usage in current path (keyed by interned word ID)
+        start_id = intern_word(start_word)
+        used_words: Dict[int, int] = defaultdict(int)
+        used_words[start_id] = 1
 
-        # Current path
+        # Current path (and theme tags along it, for level constraints)
         path: List[Phrase] = []
-        dead_ends: List[str] = []
+        constraints = self.constraints
+        tags: List[bool] = []
+        tagged = 0
+        dead_ends: List[int] = []
+
+        # Reachability bounds: skip starts and branches that cannot reach target_length
+        reach = self.reach_table() if self.use_reachability else None
+        if reach is not None and reach.get(start_id, 0) < target_length:
+            stats.pruned += 1
+            logger.warning(f"'{start_word}' cannot reach {target_length} phrases")
+            return PathResult(path=[], score=0.0, stats=stats, dead_end_words=[_WORDS[start_id]])
 
         # DFS with backtracking
-        current_word = start_word.lower()
+        current_word = start_id
         choice_stack: List[List[Phrase]] = []  # Stack of remaining choices at each level
 
         while len(path) < target_length:
@@ -196,32 +545,45 @@ class Pathfinder:
             stats.max_depth_reached = max(stats.max_depth_reached, len(path))
 
             # Get valid continuations
-            candidates = self.graph.get_outgoing(current_word)
+            candidates = self.graph.get_outgoing_ids(current_word)
 
             # Filter candidates
             valid_candidates = []
+            remaining = target_length - len(path) - 1
             for c in candidates:
                 # Skip already used in this path (unless allowing reuse)
-                if c.phrase in used_phrases:
+                if used_phrases.has_id(c.phrase_id):
                     continue
 
-                # Check reuse limit
-                w1_usage = used_words.get(c.word1.lower(), 0)
-                w2_usage = used_words.get(c.word2.lower(), 0)
-                if w1_usage >= self.max_reuse or w2_usage >= self.max_reuse:
+                # Check reuse limit (word1 is the current word, already on the
+                # path; only the word being entered can exceed the limit)
+                w2_usage = used_words.get(c.word2_id, 0)
+                if w2_usage >= self.max_reuse:
                     continue
 
                 # Apply filter function if provided
                 if self.filter_func and not self.filter_func(c):
                     continue
 
+                # Prune branches that cannot be extended far enough
+                if reach is not None and reach[c.word2_id] < remaining:
+                    stats.pruned += 1
+                    continue
+
+                # Level constraints: difficulty band, theme density forward check
+                if constraints is not None and not (
+                    constraints.allows(c) and constraints.can_extend(tags, tagged, constraints.tag(c), target_length)
+                ):
+                    stats.constraint_pruned += 1
+                    continue
+
                 valid_candidates.append(c)
 
-            # Sort by score (prefer higher PFS, lower CES)
-            valid_candidates.sort(
-                key=lambda p: (p.pfs - p.ces * 0.1),
-                reverse=True
-            )
+            # Sort by score (prefer higher PFS, lower CES); ties drawn from rng
+            if rng is None:
+                valid_candidates.sort(key=lambda p: (p.pfs - p.ces * 0.1), reverse=True)
+            else:
+                valid_candidates.sort(key=lambda p: (p.pfs - p.ces * 0.1, rng.random()), reverse=True)
 
             if not valid_candidates:
                 # Dead end - need to backtrack
@@ -242,22 +604,34 @@ class Pathfinder:
                     choice_stack.pop()
                     if path:
                         removed = path.pop()
-                        used_phrases.discard(removed.phrase)
-                        used_words[removed.word1.lower()] -= 1
-                        used_words[removed.word2.lower()] -= 1
+                        used_phrases.discard_id(removed.phrase_id)
+                        used_words[removed.word1_id] -= 1
+                        used_words[removed.word2_id] -= 1
+                        if constraints is not None:
+                            tagged -= tags.pop()
 
                 if not choice_stack:
                     # Exhausted all options
                     logger.warning(f"Exhausted all options, path length: {len(path)}")
                     break
 
-                # Try next choice
+                # Replace the choice made at this level with its next alternative
+                replaced = path.pop()
+                used_phrases.discard_id(replaced.phrase_id)
+                used_words[replaced.word1_id] -= 1
+                used_words[replaced.word2_id] -= 1
+                if constraints is not None:
+                    tagged -= tags.pop()
+
                 next_phrase = choice_stack[-1].pop(0)
                 path.append(next_phrase)
-                used_phrases.add(next_phrase.phrase)
-                used_words[next_phrase.word1.lower()] += 1
-                used_words[next_phrase.word2.lower()] += 1
-                current_word = next_phrase.word2.lower()
+                used_phrases.add_id(next_phrase.phrase_id)
+                used_words[next_phrase.word1_id] += 1
+                used_words[next_phrase.word2_id] += 1
+                if constraints is not None:
+                    tags.append(constraints.tag(next_phrase))
+                    tagged += tags[-1]
+                current_word = next_phrase.word2_id
 
             else:
                 # Choose best candidate, save alternatives for backtracking
@@ -266,12 +640,15 @@ class Pathfinder:
 
                 choice_stack.append(alternatives)
                 path.append(chosen)
-                used_phrases.add(chosen.phrase)
-                used_words[chosen.word1.lower()] += 1
-                used_words[chosen.word2.lower()] += 1
-                stats.reuses += max(0, used_words[chosen.word2.lower()] - 1)
+                used_phrases.add_id(chosen.phrase_id)
+                used_words[chosen.word1_id] += 1
+                used_words[chosen.word2_id] += 1
+                if constraints is not None:
+                    tags.append(constraints.tag(chosen))
+                    tagged += tags[-1]
+                stats.reuses += max(0, used_words[chosen.word2_id] - 1)
 
-                current_word = chosen.word2.lower()
+                current_word = chosen.word2_id
 
             # Safety check
             if stats.total_branches_explored > max_depth * target_length * 10:
@@ -281,13 +658,123 @@ class Pathfinder:
         if len(path) >= target_length:
             stats.paths_found = 1
 
+        used_phrases.rollback(checkpoint)
         score = self.calculate_score(path, used_words)
 
         return PathResult(
             path=path[:target_length] if len(path) >= target_length else path,
             score=score,
             stats=stats,
-            dead_end_words=list(set(dead_ends))
+            dead_end_words=[_WORDS[word_id] for word_id in set(dead_ends)]
+        )
+
+    def _find_path_beam(self, start_word: str, target_length: int, used_phrases: PhraseBitset) -> PathResult:
+        """
+        Beam search over chains, ranked by calculate_score.
+
+        Each depth extends every chain in the beam by every valid phrase
+        (same used_phrases / max_reuse / filter / reachability rules as the
+        DFS) and keeps the beam_width best. Ties prefer lower total CES, then
+        earlier expansion order, so results are deterministic. Stops as soon
+        as node_budget candidate chains have been scored: the candidates of
+        the interrupted depth are ranked as usual and no deeper depth is
+        expanded. If no chain reached target_length, the best chain of the
+        deepest depth is returned as a partial path.
+        """
+        stats = PathfinderStats()
+        stats.unique_nodes_available = self.graph.num_words()
+
+        start_id = intern_word(start_word)
+        reach = self.reach_table() if self.use_reachability else None
+        if reach is not None and reach.get(start_id, 0) < target_length:
+            stats.pruned += 1
+            logger.warning(f"'{start_word}' cannot reach {target_length} phrases")
+            return PathResult(path=[], score=0.0, stats=stats, dead_end_words=[_WORDS[start_id]])
+
+        # Beam state: (score, ces_sum, path, used_words, phrase texts in path, theme tags)
+        beam = [(0.0, 0, [], {start_id: 1}, frozenset(), [])]
+        constraints = self.constraints
+        dead_ends: Set[int] = set()
+
+        budget_hit = False
+        for depth in range(target_length):
+            remaining = target_length - depth - 1
+            scored = []  # (-score, ces_sum, order, parent index, phrase)
+            for parent_idx, (score, ces_sum, path, used_words, in_path, tags) in enumerate(beam):
+                if budget_hit:
+                    break
+                stats.total_branches_explored += 1
+                current_word = path[-1].word2_id if path else start_id
+                w1_usage = used_words.get(current_word, 0)
+                extended = False
+                for c in self.graph.get_outgoing_ids(current_word):
+                    if used_phrases.has_id(c.phrase_id) or c.phrase in in_path:
+                        continue
+                    w2_usage = used_words.get(c.word2_id, 0)
+                    if w2_usage >= self.max_reuse:
+                        continue
+                    if self.filter_func and not self.filter_func(c):
+                        continue
+                    if reach is not None and reach[c.word2_id] < remaining:
+                        stats.pruned += 1
+                        continue
+                    if constraints is not None and not (
+                        constraints.allows(c)
+                        and constraints.can_extend(tags, sum(tags), constraints.tag(c), target_length)
+                    ):
+                        stats.constraint_pruned += 1
+                        continue
+
+                    # Incremental calculate_score: PFS gain minus the penalty
+                    # for the two word-usage increments (word1 and word2)
+                    new_reuses = (w1_usage >= 1) + (w2_usage + (c.word2_id == current_word) >= 1)
+                    child_score = score + c.pfs - new_reuses * self.reuse_penalty
+                    scored.append((-child_score, ces_sum + c.ces, len(scored), parent_idx, c))
+                    extended = True
+                    if stats.nodes_expanded + len(scored) >= self.node_budget:
+                        budget_hit = True
+                        break
+                if not extended:
+                    dead_ends.add(current_word)
+                    stats.dead_ends += 1
+
+            stats.nodes_expanded += len(scored)
+            if not scored:
+                break
+
+            next_beam = []
+            for neg_score, ces_sum, _, parent_idx, c in heapq.nsmallest(self.beam_width, scored):
+                _, _, path, used_words, in_path, tags = beam[parent_idx]
+                child_words = dict(used_words)
+                child_words[c.word1_id] = child_words.get(c.word1_id, 0) + 1
+                child_words[c.word2_id] = child_words.get(c.word2_id, 0) + 1
+                child_tags = tags + [constraints.tag(c)] if constraints is not None else tags
+                next_beam.append((-neg_score, ces_sum, path + [c], child_words, in_path | {c.phrase}, child_tags))
+            beam = next_beam
+            stats.max_depth_reached = depth + 1
+
+            if budget_hit:
+                if depth + 1 < target_length:
+                    logger.warning(f"Hit node budget, path length: {depth + 1}")
+                break
+
+        score, _, path, used_words, _, _ = beam[0]
+        if len(path) >= target_length:
+            stats.paths_found = 1
+        replay: Dict[int, int] = defaultdict(int)
+        replay[start_id] = 1
+        for p in path:
+            replay[p.word1_id] += 1
+            replay[p.word2_id] += 1
+            stats.reuses += max(0, replay[p.word2_id] - 1)
+        if not path:
+            logger.warning(f"No valid path from '{start_word}'")
+
+        return PathResult(
+            path=path,
+            score=self.calculate_score(path, used_words),
+            stats=stats,
+            dead_end_words=[_WORDS[word_id] for word_id in dead_ends]
         )
 
     def find_multiple_paths(
@@ -304,28 +791,25 @@ class Pathfinder:
             num_paths: Number of paths to generate
             phrases_per_path: Phrases per path
             filter_func: Optional filter for valid phrases
-            seed: Random seed
+            seed: Base seed; each attempt gets its own stream
 
         Returns:
             List of PathResults
         """
-        if seed is not None:
-            random.seed(seed)
-
         if filter_func:
             self.filter_func = filter_func
 
         results: List[PathResult] = []
-        all_used_phrases: Set[str] = set()
+        all_used_phrases = PhraseBitset()
 
         # Find good starting words (words with many outgoing edges)
         start_candidates = []
-        for word in self.graph.get_unique_words():
-            outgoing = self.graph.get_outgoing(word)
+        for word_id in self.graph.word_ids:
+            outgoing = self.graph.get_outgoing_ids(word_id)
             if filter_func:
                 outgoing = [p for p in outgoing if filter_func(p)]
             if len(outgoing) >= 3:  # Need at least 3 options
-                start_candidates.append((word, len(outgoing)))
+                start_candidates.append((word_for_id(word_id), len(outgoing)))
 
         start_candidates.sort(key=lambda x: x[1], reverse=True)
 
@@ -348,15 +832,15 @@ class Pathfinder:
             result = self.find_path(
                 start_word=start_word,
                 target_length=phrases_per_path,
-                used_phrases=all_used_phrases.copy(),
-                seed=seed + attempts if seed else None
+                used_phrases=all_used_phrases,
+                rng=random.Random(stream_seed(seed, attempts)) if seed is not None else None
             )
 
             if len(result.path) >= phrases_per_path:
                 results.append(result)
                 # Add used phrases to global set
                 for p in result.path:
-                    all_used_phrases.add(p.phrase)
+                    all_used_phrases.add_id(p.phrase_id)
                 logger.info(
                     f"Path {len(results)}: {phrases_per_path} phrases, "
                     f"score={result.score:.2f}, "
@@ -372,29 +856,19 @@ class Pathfinder:
 
 
 def load_phrases(filepath: Path) -> PhraseGraph:
-    """Load phrases from CSV and build graph."""
-    graph = PhraseGraph()
-
-    with open(filepath, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                phrase = Phrase(
-                    phrase=row["phrase"],
-                    word1=row["word1"],
-                    word2=row["word2"],
-                    pfs=float(row.get("PFS", 1.5)),  # Legacy - kept for compatibility
-                    ces=int(float(row.get("CES_estimate", 1))),  # Entropy
-                    avg_zipf=float(row.get("avg_zipf", 5.0)),
-                    tone_tag=row.get("tone_tag", "neutral"),
-                    category_tag=row.get("category_tag", "general"),
-                    level_tier=row.get("level_tier", "mid (21-50)")
-                )
-                graph.add_phrase(phrase)
-            except (ValueError, KeyError) as e:
-                logger.warning(f"Skipping invalid row: {row.get('phrase', 'unknown')} - {e}")
-
-    return graph
+    """
+    Load phrases and build graph.
+
+    Reads through the compiled phrase index (see phrase_index.py), building
+    it first if it is missing or older than the CSV.
+    """
+    from phrase_index import open_index
+
+    with open_index(filepath) as index:
+        for pid in range(index.num_phrases):
+            if not index.valid[pid]:
+                logger.warning(f"Skipping invalid row: {index.value(pid, 'phrase') or 'unknown'}")
+        return PhraseGraph.from_index(index)
 
 
 def demo():
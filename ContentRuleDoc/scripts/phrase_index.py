@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Compiled Phrase-Graph Index for WordRun! pipeline stages.
+
+Every stage used to re-parse phrases_master_pfs.csv with csv.DictReader and
+rebuild PhraseGraph from scratch. This module compiles the master CSV ONCE
+into a binary index that every stage memory-maps instead.
+
+Index contents:
+- String table: every distinct CSV string stored once (interned)
+- Word IDs: lowercase graph nodes, sorted so lookup is a binary search
+- CSR adjacency: out_offsets/out_edges (word1 -> phrases, PhraseGraph.edges)
+  and in_offsets/in_edges (word2 -> phrases, PhraseGraph.reverse_edges)
+- Columnar score arrays: PFS, CES_estimate, avg_zipf, difficulty_score,
+  tone_score
+- Difficulty order: valid phrase IDs sorted by difficulty_score, so a
+  §10.1 window is a binary-searched slice (difficulty_range)
+- Tone order: valid phrase IDs sorted by tone_score, so the phrases allowed
+  under a §5.2 tone cap are a prefix (tone_prefix)
+- One string-ID column per CSV column, so rows() reproduces the CSV exactly
+
+Opening the index is constant time: sections are sliced out of the mmap and
+nothing is decoded until a stage asks for it.
+Open it in a with-block (or call close()) so the mapping is released.
+
+File layout (native little-endian):
+    header   MAGIC, version, counts, source size/mtime
+    sections table of (name, offset, nbytes, typecode)
+    data     8-byte aligned section payloads
+"""
+
+import csv
+import mmap
+from bisect import bisect_left, bisect_right
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pathfinder import Phrase, PhraseGraph
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
+INPUT_FILE = DATA_DIR / "phrases_master_pfs.csv"
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 4
+MAGIC = b"WRPIDX\x00\x01"
+
+# magic, version, n_phrases, n_words, n_strings, n_sections, source_size, source_mtime_ns
+HEADER = struct.Struct("<8sIIIIIqq")
+# name, offset, nbytes, typecode
+SECTION = struct.Struct("<24sQQ1s7x")
+
+# CSV columns that also get a typed column, with the defaults load_phrases used
+TYPED_COLUMNS = {
+    "PFS": ("d", 1.5),
+    "CES_estimate": ("i", 1),
+    "avg_zipf": ("d", 5.0),
+    "difficulty_score": ("d", 20.0),
+    "tone_score": ("d", 0.0),
+}
+
+
+def index_path_for(csv_path: Path) -> Path:
+    """Return the compiled index path that sits next to a phrase CSV."""
+    return Path(csv_path).with_suffix(INDEX_SUFFIX)
+
+
+# =============================================================================
+# BUILD STEP
+# =============================================================================
+
+def build_index(csv_path: Path = INPUT_FILE, index_path: Optional[Path] = None) -> Path:
+    """
+    Compile a master-schema phrase CSV into a binary index.
+
+    Rows that cannot be parsed into a Phrase (missing words, non-numeric
+    scores) are kept for rows() but flagged invalid and left out of the
+    graph, matching load_phrases().
+
+    Returns:
+        Path of the written index
+    """
+    csv_path = Path(csv_path)
+    index_path = Path(index_path) if index_path else index_path_for(csv_path)
+
+    with open(csv_path, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        rows = list(reader)
+
+    # Intern graph nodes first and sorted, so word_id == string_id and
+    # word lookup is a binary search over the string table.
+    node_words = set()
+    for row in rows:
+        node_words.add((row.get("word1") or "").lower())
+        node_words.add((row.get("word2") or "").lower())
+    node_words = sorted(node_words)
+
+    strings: List[str] = list(node_words)
+    string_ids: Dict[str, int] = {s: i for i, s in enumerate(strings)}
+
+    def intern(value: str) -> int:
+        sid = string_ids.get(value)
+        if sid is None:
+            sid = len(strings)
+            string_ids[value] = sid
+            strings.append(value)
+        return sid
+
+    columns = {name: array("i") for name in fieldnames}
+    typed = {name: array(code) for name, (code, _) in TYPED_COLUMNS.items()}
+    word1_ids = array("i")
+    word2_ids = array("i")
+    valid = array("B")
+
+    for row in rows:
+        for name in fieldnames:
+            columns[name].append(intern(row.get(name) or ""))
+
+        try:
+            values = {
+                "PFS": float(row.get("PFS", 1.5)),
+                "CES_estimate": int(float(row.get("CES_estimate", 1))),
+                "avg_zipf": float(row.get("avg_zipf", 5.0)),
+            }
+            ok = None not in (row["phrase"], row["word1"], row["word2"])
+        except (ValueError, KeyError, TypeError):
+            values = {name: default for name, (_, default) in TYPED_COLUMNS.items()}
+            ok = False
+
+        # Not parsed by load_phrases, so a bad value falls back instead of invalidating the row
+        try:
+            values["difficulty_score"] = float(row.get("difficulty_score") or 20.0)
+        except ValueError:
+            values["difficulty_score"] = 20.0
+        try:
+            values["tone_score"] = float(row.get("tone_score") or 0.0)
+        except ValueError:
+            values["tone_score"] = 0.0
+
+        for name, value in values.items():
+            typed[name].append(value)
+        word1_ids.append(string_ids[(row.get("word1") or "").lower()])
+        word2_ids.append(string_ids[(row.get("word2") or "").lower()])
+        valid.append(1 if ok else 0)
+
+    # CSR adjacency, phrases kept in row order within each word (same order
+    # PhraseGraph.add_phrase appends them)
+    n_words = len(node_words)
+    out_offsets, out_edges = _build_csr(word1_ids, valid, n_words)
+    in_offsets, in_edges = _build_csr(word2_ids, valid, n_words)
+
+    # Valid phrase IDs by (difficulty_score, pid), with the sorted scores to bisect
+    scores = typed["difficulty_score"]
+    difficulty_order = array("i", sorted((pid for pid in range(len(rows)) if valid[pid]), key=lambda pid: scores[pid]))
+    difficulty_sorted = array("d", (scores[pid] for pid in difficulty_order))
+
+    # Same for tone_score
+    tones = typed["tone_score"]
+    tone_order = array("i", sorted((pid for pid in range(len(rows)) if valid[pid]), key=lambda pid: tones[pid]))
+    tone_sorted = array("d", (tones[pid] for pid in tone_order))
+
+    # String table
+    blob = bytearray()
+    string_offsets = array("q", [0])
+    for s in strings:
+        blob += s.encode("utf-8")
+        string_offsets.append(len(blob))
+
+    sections = [
+        ("fieldnames", "B", bytes("\n".join(fieldnames), "utf-8")),
+        ("string_offsets", "q", string_offsets.tobytes()),
+        ("string_blob", "B", bytes(blob)),
+        ("word1", "i", word1_ids.tobytes()),
+        ("word2", "i", word2_ids.tobytes()),
+        ("valid", "B", valid.tobytes()),
+        ("out_offsets", "i", out_offsets.tobytes()),
+        ("out_edges", "i", out_edges.tobytes()),
+        ("in_offsets", "i", in_offsets.tobytes()),
+        ("in_edges", "i", in_edges.tobytes()),
+        ("difficulty_order", "i", difficulty_order.tobytes()),
+        ("difficulty_sorted", "d", difficulty_sorted.tobytes()),
+        ("tone_order", "i", tone_order.tobytes()),
+        ("tone_sorted", "d", tone_sorted.tobytes()),
+    ]
+    for name, values in typed.items():
+        sections.append((f"n:{name}", values.typecode, values.tobytes()))
+    for name, values in columns.items():
+        sections.append((f"s:{name}", "i", values.tobytes()))
+
+    stat = csv_path.stat()
+    header = HEADER.pack(
+        MAGIC, INDEX_VERSION, len(rows), n_words, len(strings), len(sections),
+        stat.st_size, stat.st_mtime_ns
+    )
+
+    # Lay out section payloads after the header and section table
+    offset = _align(HEADER.size + SECTION.size * len(sections))
+    table = bytearray()
+    for name, code, payload in sections:
+        table += SECTION.pack(name.encode("utf-8"), offset, len(payload), code.encode("ascii"))
+        offset = _align(offset + len(payload))
+
+    # Write atomically so a reader never maps a half-written index
+    tmp_path = index_path.with_suffix(index_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(table)
+        for _, _, payload in sections:
+            f.write(b"\x00" * (_align(f.tell()) - f.tell()))
+            f.write(payload)
+    os.replace(tmp_path, index_path)
+
+    return index_path
+
+
+def _align(offset: int, boundary: int = 8) -> int:
+    return (offset + boundary - 1) // boundary * boundary
+
+
+def _build_csr(keys: array, valid: array, n_nodes: int):
+    """Counting-sort phrase IDs by node ID into (offsets, edges) arrays."""
+    offsets = array("i", [0]) * (n_nodes + 1)
+    for pid, key in enumerate(keys):
+        if valid[pid]:
+            offsets[key + 1] += 1
+    for i in range(n_nodes):
+        offsets[i + 1] += offsets[i]
+
+    cursor = array("i", offsets[:-1])
+    edges = array("i", [0]) * offsets[n_nodes]
+    for pid, key in enumerate(keys):
+        if valid[pid]:
+            edges[cursor[key]] = pid
+            cursor[key] += 1
+    return offsets, edges
+
+
+# =============================================================================
+# MEMORY-MAPPED READER
+# =============================================================================
+
+class PhraseIndex:
+    """Read-only, memory-mapped view of a compiled phrase index."""
+
+    def __init__(self, index_path: Path):
+        self.path = Path(index_path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.num_phrases, self.num_words, self.num_strings,
+         n_sections, self.source_size, self.source_mtime_ns) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"{self.path} is not a phrase index (version {INDEX_VERSION})")
+
+        # Every view into the mmap is kept so close() can release them all
+        self._views = [memoryview(self._mm)]
+        self._sections = {}
+        for i in range(n_sections):
+            name, offset, nbytes, code = SECTION.unpack_from(self._mm, HEADER.size + i * SECTION.size)
+            section = self._views[0][offset:offset + nbytes]
+            typed = section.cast(code.decode("ascii"))
+            self._views.extend([section, typed])
+            self._sections[name.rstrip(b"\x00").decode("utf-8")] = typed
+
+        self.fieldnames = str(self._sections["fieldnames"], "utf-8").split("\n")
+        self._string_offsets = self._sections["string_offsets"]
+        self._blob = self._sections["string_blob"]
+
+        # Columnar arrays, exposed directly
+        self.word1 = self._sections["word1"]
+        self.word2 = self._sections["word2"]
+        self.valid = self._sections["valid"]
+        self.pfs = self._sections["n:PFS"]
+        self.ces = self._sections["n:CES_estimate"]
+        self.avg_zipf = self._sections["n:avg_zipf"]
+        self.difficulty_score = self._sections["n:difficulty_score"]
+        self.tone_score = self._sections["n:tone_score"]
+        self.out_offsets = self._sections["out_offsets"]
+        self.out_edges = self._sections["out_edges"]
+        self.in_offsets = self._sections["in_offsets"]
+        self.in_edges = self._sections["in_edges"]
+        self.difficulty_order = self._sections["difficulty_order"]
+        self.difficulty_sorted = self._sections["difficulty_sorted"]
+        self.tone_order = self._sections["tone_order"]
+        self.tone_sorted = self._sections["tone_sorted"]
+
+    def __len__(self) -> int:
+        return self.num_phrases
+
+    def __enter__(self) -> "PhraseIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _track(self, view: memoryview) -> memoryview:
+        """Register a view handed out to callers, so close() releases it too."""
+        self._views.append(view)
+        return view
+
+    def string(self, sid: int) -> str:
+        """Decode one entry of the string table."""
+        return str(self._blob[self._string_offsets[sid]:self._string_offsets[sid + 1]], "utf-8")
+
+    def word(self, word_id: int) -> str:
+        """Lowercase word for a graph node ID."""
+        return self.string(word_id)
+
+    def word_id(self, word: str) -> Optional[int]:
+        """Binary-search the sorted node table for a word (case-insensitive)."""
+        word = word.lower()
+        lo, hi = 0, self.num_words
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.string(mid) < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.num_words and self.string(lo) == word:
+            return lo
+        return None
+
+    def column(self, name: str):
+        """String-ID column for a CSV field (decode with string())."""
+        return self._sections[f"s:{name}"]
+
+    def value(self, pid: int, name: str) -> str:
+        """Original CSV text of one field of one row."""
+        return self.string(self._sections[f"s:{name}"][pid])
+
+    def outgoing(self, word_id: int) -> List[int]:
+        """Phrase IDs starting with word_id, in CSV order (copy of the CSR slice)."""
+        return self.out_edges[self.out_offsets[word_id]:self.out_offsets[word_id + 1]].tolist()
+
+    def incoming(self, word_id: int) -> List[int]:
+        """Phrase IDs ending with word_id, in CSV order (copy of the CSR slice)."""
+        return self.in_edges[self.in_offsets[word_id]:self.in_offsets[word_id + 1]].tolist()
+
+    def difficulty_range(self, low: float, high: float):
+        """
+        Valid phrase IDs with low <= difficulty_score <= high, by score
+        (O(log N), no copy; the view is released by close()).
+        """
+        start = bisect_left(self.difficulty_sorted, low)
+        end = bisect_right(self.difficulty_sorted, high)
+        return self._track(self.difficulty_order[start:end])
+
+    def tone_prefix(self, cap: float):
+        """
+        Valid phrase IDs with tone_score <= cap, by score (O(log N), no
+        copy; the view is released by close()).
+        """
+        return self._track(self.tone_order[:bisect_right(self.tone_sorted, cap)])
+
+    def phrase(self, pid: int, phrase_cls=Phrase) -> Phrase:
+        """Materialize one row as a pathfinder Phrase."""
+        value = self.value
+        return phrase_cls(
+            phrase=value(pid, "phrase"),
+            word1=value(pid, "word1"),
+            word2=value(pid, "word2"),
+            pfs=self.pfs[pid],
+            ces=self.ces[pid],
+            avg_zipf=self.avg_zipf[pid],
+            difficulty_score=self.difficulty_score[pid],
+            tone_tag=value(pid, "tone_tag") if "tone_tag" in self.fieldnames else "neutral",
+            category_tag=value(pid, "category_tag") if "category_tag" in self.fieldnames else "general",
+            level_tier=value(pid, "level_tier") if "level_tier" in self.fieldnames else "mid (21-50)",
+        )
+
+    def iter_phrases(self) -> Iterator[Phrase]:
+        """All valid rows as Phrase objects, in CSV order."""
+        for pid in range(self.num_phrases):
+            if self.valid[pid]:
+                yield self.phrase(pid)
+
+    def rows(self) -> Iterator[Dict[str, str]]:
+        """All rows as csv.DictReader-style dicts, in CSV order."""
+        columns = [(name, self._sections[f"s:{name}"]) for name in self.fieldnames]
+        for pid in range(self.num_phrases):
+            yield {name: self.string(col[pid]) for name, col in columns}
+
+    def to_graph(self, pids: Optional[Iterable[int]] = None) -> PhraseGraph:
+        """Build a PhraseGraph from the CSR adjacency (see PhraseGraph.from_index)."""
+        return PhraseGraph.from_index(self, pids)
+
+    def close(self):
+        """Release the mapping and every view handed out by this index."""
+        for view in reversed(self._views):
+            view.release()
+        self._mm.close()
+
+
+def is_stale(csv_path: Path, index_path: Optional[Path] = None) -> bool:
+    """True if the index is missing or older than its source CSV."""
+    csv_path = Path(csv_path)
+    index_path = Path(index_path) if index_path else index_path_for(csv_path)
+    if not index_path.exists():
+        return True
+    try:
+        with open(index_path, "rb") as f:
+            header = f.read(HEADER.size)
+        (magic, version, _, _, _, _, size, mtime_ns) = HEADER.unpack(header)
+    except struct.error:
+        return True
+    stat = csv_path.stat()
+    return (magic != MAGIC or version != INDEX_VERSION
+            or size != stat.st_size or mtime_ns != stat.st_mtime_ns)
+
+
+def open_index(csv_path: Path = INPUT_FILE, rebuild: bool = True) -> PhraseIndex:
+    """
+    Open the compiled index for a phrase CSV.
+
+    Builds (or rebuilds) the index first if it is missing or stale and
+    rebuild is True.
+    """
+    index_path = index_path_for(csv_path)
+    if rebuild and is_stale(csv_path, index_path):
+        build_index(csv_path, index_path)
+    return PhraseIndex(index_path)
+
+
+def main():
+    """Compile the master phrase CSV into its binary index."""
+    print("=" * 60)
+    print("PHRASE INDEX BUILD")
+    print("=" * 60)
+
+    index_path = build_index(INPUT_FILE)
+    with PhraseIndex(index_path) as index:
+        print(f"Source: {INPUT_FILE}")
+        print(f"Index:  {index_path} ({index_path.stat().st_size:,} bytes)")
+        print(f"  Phrases: {index.num_phrases}")
+        print(f"  Words:   {index.num_words}")
+        print(f"  Strings: {index.num_strings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Compiled Profanity Filter for WordRun! phrase stages (ContentRuleDoc §4.2).
+
+Python counterpart of scripts/tools/profanity_filter.gd, reading the same
+data/filters/profanity_v1.json:
+- profanity: banned substrings
+- safe_words: words that contain a banned substring but are fine
+  ("assassin", "cockatoo")
+
+Every profanity term and safe word is compiled into ONE Aho-Corasick
+automaton, so a text is scanned once, in time linear in its length plus
+matches, however long the lists get.
+
+Safe-word rule (same as the GDScript _is_safe_context): a banned term found
+in a text is excused if any safe word that contains the term also occurs
+in the text, wherever it occurs. A text that is itself a safe word is clean.
+
+Phrases are checked like ProfanityFilter.check_compound(): word1, word2
+and word1+word2 (catches terms split across the join). All three come
+from a single scan of word1+word2.
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+# Paths
+FILTER_FILE = Path("/Users/nathanielgiddens/WordRunGame/data/filters/profanity_v1.json")
+
+# Pattern kinds
+PROFANE = 0
+SAFE = 1
+
+
+class ProfanityFilter:
+    """Profanity + safe-word lists compiled into one multi-pattern automaton."""
+
+    def __init__(self, profanity: Iterable[str], safe_words: Iterable[str] = ()):
+        self.profanity = sorted({w.lower() for w in profanity if w})
+        self.safe_words = sorted({w.lower() for w in safe_words if w})
+
+        # Trie: goto[state] maps a character to the next state
+        self._goto: List[Dict[str, int]] = [{}]
+        own: List[List[Tuple[int, int, str]]] = [[]]  # (kind, length, term)
+        for kind, terms in ((PROFANE, self.profanity), (SAFE, self.safe_words)):
+            for term in terms:
+                state = 0
+                for ch in term:
+                    nxt = self._goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[state][ch] = nxt
+                        self._goto.append({})
+                        own.append([])
+                    state = nxt
+                own[state].append((kind, len(term), term))
+        self._safe_set = frozenset(self.safe_words)
+
+        # Failure links (BFS); each state's outputs include its suffix states'
+        self._fail = [0] * len(self._goto)
+        self._out: List[Tuple[Tuple[int, int, str], ...]] = [()] * len(self._goto)
+        self._out[0] = tuple(own[0])
+        queue = deque()
+        for nxt in self._goto[0].values():
+            queue.append(nxt)
+            self._out[nxt] = tuple(own[nxt])
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = tuple(own[nxt]) + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+        # Banned terms each safe word contains (the terms it can excuse)
+        self._excuses: Dict[str, FrozenSet[str]] = {
+            safe: frozenset(term for kind, _, _, term in self.scan(safe) if kind == PROFANE)
+            for safe in self.safe_words
+        }
+
+    def __len__(self) -> int:
+        return len(self.profanity)
+
+    def scan(self, text: str) -> List[Tuple[int, int, int, str]]:
+        """Every pattern occurrence in text as (kind, start, end, term), by end."""
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        state = 0
+        for i, ch in enumerate(text.lower()):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for kind, length, term in out[state]:
+                matches.append((kind, i + 1 - length, i + 1, term))
+        return matches
+
+    def _first_unsafe(self, matches: List[Tuple[int, int, int, str]], text: str, lo: int, hi: int) -> Optional[str]:
+        """First banned term inside text[lo:hi] that no safe word inside it excuses."""
+        if text[lo:hi] in self._safe_set:
+            return None
+        inside = [(kind, term) for kind, start, end, term in matches if lo <= start and end <= hi]
+        excused = set()
+        for kind, term in inside:
+            if kind == SAFE:
+                excused |= self._excuses[term]
+        for kind, term in inside:
+            if kind == PROFANE and term not in excused:
+                return term
+        return None
+
+    def check_word(self, word: str) -> Optional[str]:
+        """Banned term found in a word, or None if it is clean."""
+        word = word.lower()
+        return self._first_unsafe(self.scan(word), word, 0, len(word))
+
+    def check_phrase(self, word1: str, word2: str) -> Optional[str]:
+        """Banned term in word1, word2 or word1+word2, or None if clean."""
+        if not self.profanity:
+            return None
+        split = len(word1)
+        compound = (word1 + word2).lower()
+        matches = self.scan(compound)
+        return (self._first_unsafe(matches, compound, 0, split)
+                or self._first_unsafe(matches, compound, split, len(compound))
+                or self._first_unsafe(matches, compound, 0, len(compound)))
+
+    def screen(self, rows: Iterable[dict], rejected: Optional[List[Tuple[str, str]]] = None) -> Iterator[dict]:
+        """
+        Streaming stage: yield the clean rows, skip the rest.
+
+        Args:
+            rows: Dicts with word1/word2 (phrase is used for reporting)
+            rejected: If given, (phrase, term) is appended for each skipped row
+        """
+        for row in rows:
+            term = self.check_phrase(row.get("word1") or "", row.get("word2") or "")
+            if term is None:
+                yield row
+            elif rejected is not None:
+                rejected.append((row.get("phrase", ""), term))
+
+
+def load_profanity_filter(path: Path = FILTER_FILE) -> Optional[ProfanityFilter]:
+    """Compile the filter lists; None if the file is absent."""
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return ProfanityFilter(data.get("profanity", []), data.get("safe_words", []))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Single-Level Regeneration for WordRun!
+
+Replaces levels that failed review in a campaign written by
+campaign_generate.py, leaving every other level frozen.
+
+Flow:
+1. Read the campaign manifest (seed, engine, constraints, input file)
+2. Load only the land files holding the stale levels and their reuse
+   neighbours, plus the one tier graph each stale level needs
+3. Block every phrase a neighbour uses where PhraseReuseTracker rules
+   forbid sharing it (within the first 20 levels, or less than 10 levels
+   apart), the stale level's own rejected phrases and, if the campaign
+   used the tone schedule, phrases above the level's tone cap
+4. Search the level from a fresh RNG stream (revision n+1 of the level)
+5. Validate and rewrite the affected land files atomically
+
+Stale levels are regenerated in level order, so each one sees the
+replacements made before it.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pathfinder import PhraseBitset
+from generate_early_levels import validate_level
+from rng_streams import level_rng
+from tag_themes import phrase_theme_masks
+from campaign_generate import (
+    MANIFEST_NAME, OUTPUT_DIR, GraphCache, build_campaign_level, generate_level, land_for_level,
+    land_pathfinder, level_phrases, load_tone_schedule, tone_cap, write_land
+)
+from parallel_generate import level_tier, reuse_neighbours
+
+
+class FrozenCampaign:
+    """Land files of a campaign, loaded on demand and written back when changed."""
+
+    def __init__(self, campaign_dir: Path):
+        self.campaign_dir = campaign_dir
+        self.lands: Dict[str, Optional[dict]] = {}
+        self.dirty: set = set()
+
+    def level(self, level: int) -> Optional[dict]:
+        land_id = land_for_level(level).land_id
+        if land_id not in self.lands:
+            land_file = self.campaign_dir / f"{land_id}.json"
+            if land_file.exists():
+                with open(land_file, "r", encoding="utf-8") as f:
+                    self.lands[land_id] = json.load(f)
+            else:
+                self.lands[land_id] = None
+        land_data = self.lands[land_id]
+        if land_data is None:
+            return None
+        for level_data in land_data["levels"]:
+            if level_data["campaign_level"] == level:
+                return level_data
+        return None
+
+    def replace(self, level: int, level_data: dict):
+        land_id = land_for_level(level).land_id
+        levels = self.lands[land_id]["levels"]
+        for i, old in enumerate(levels):
+            if old["campaign_level"] == level:
+                levels[i] = level_data
+        self.dirty.add(land_id)
+
+    def save(self) -> List[Path]:
+        return [write_land(self.lands[land_id], self.campaign_dir) for land_id in sorted(self.dirty)]
+
+
+def regenerate_levels(
+    stale_levels: List[int],
+    campaign_dir: Path = OUTPUT_DIR,
+    input_file: Optional[Path] = None
+) -> bool:
+    """
+    Regenerate stale levels of a frozen campaign in place.
+
+    Args:
+        stale_levels: Campaign level numbers to replace
+        campaign_dir: Directory written by campaign_generate
+        input_file: Scored phrase CSV (default: the one the campaign used)
+
+    Returns:
+        True if every stale level was replaced and written
+    """
+    start_time = time.time()
+    print("\n" + "=" * 60)
+    print("WORDRUN LEVEL REGENERATION")
+    print("=" * 60)
+
+    manifest_file = campaign_dir / MANIFEST_NAME
+    if not manifest_file.exists():
+        print(f"  [ABORT] No campaign manifest in {campaign_dir}")
+        return False
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        config = json.load(f)["config"]
+    input_file = input_file or Path(config["input_file"])
+    tones = load_tone_schedule(input_file) if config["tone_schedule"] else None
+    if config["tone_schedule"] and tones is None:
+        return False
+
+    phrase_masks = phrase_theme_masks(input_file) if config["level_constraints"] else None
+    campaign = FrozenCampaign(campaign_dir)
+    graphs = GraphCache(input_file, difficulty_bands=config["level_constraints"])
+    stale = sorted(set(stale_levels))
+    pending = set(stale)
+    path_length = config["phrases_per_level"] - 1
+
+    for level in stale:
+        old = campaign.level(level)
+        if old is None:
+            print(f"  [ABORT] Level {level} not found in {campaign_dir}")
+            return False
+        pending.discard(level)
+
+        # Phrases the reuse rules forbid here; stale levels not yet
+        # regenerated are about to be replaced, so they block nothing
+        blocked = PhraseBitset(level_phrases(old))
+        for neighbour in reuse_neighbours(level):
+            if neighbour in pending:
+                continue
+            neighbour_data = campaign.level(neighbour)
+            if neighbour_data is not None:
+                blocked.update(level_phrases(neighbour_data))
+        if tones is not None:
+            if not tones.admits_any(level):
+                print(f"  [ABORT] Tone cap {tone_cap(level):g} admits no phrases at level {level} "
+                      f"(lowest tone score {tones.tones[0]:g})")
+                return False
+            blocked = blocked.union(tones.blocked_at(level))
+
+        land = land_for_level(level)
+        tier = level_tier(level)
+        graph, start_words = graphs.get(tier)
+        pathfinder = land_pathfinder(graph, tier, land, config["engine"], config["level_constraints"], phrase_masks)
+
+        revision = old.get("revision", 0) + 1
+        rng = level_rng(config["seed"], tier, land.nation, level, revision)
+        found = generate_level(pathfinder, start_words, blocked, path_length, rng)
+        if found is None:
+            print(f"  [ABORT] Level {level}: no path outside {len(blocked)} blocked phrases")
+            return False
+
+        start_word, path = found
+        index = land.levels.index(level) + 1
+        level_data = build_campaign_level(land, index, level, tier, start_word, path)
+        level_data["revision"] = revision
+
+        phrases = [{"phrase": p.phrase, "word1": p.word1, "word2": p.word2} for p in path]
+        errors = validate_level({"level": level, "phrases": phrases}, set()).errors
+        errors += [f"Level {level}: Phrase '{p.phrase}' breaks the reuse rules" for p in path if p.phrase in blocked]
+        if errors:
+            print(f"  [ABORT] Level {level} failed validation:")
+            for err in errors[:10]:
+                print(f"    - {err}")
+            return False
+
+        campaign.replace(level, level_data)
+        print(f"  Level {level} ({level_data['level_id']}): revision {revision}, from '{start_word}'")
+
+    written = campaign.save()
+    print(f"\n  [SUCCESS] {len(stale)} levels regenerated, {len(written)} land files rewritten "
+          f"({len(campaign.lands)} loaded) in {time.time() - start_time:.2f}s")
+    return True
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Regenerate stale levels of a generated campaign.")
+    parser.add_argument("levels", type=int, nargs="+", help="campaign level numbers to regenerate")
+    parser.add_argument("--campaign", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--input", type=Path, default=None, help="phrase CSV (default: from the campaign manifest)")
+    args = parser.parse_args()
+
+    success = regenerate_levels(args.levels, campaign_dir=args.campaign, input_file=args.input)
+
+    if not success:
+        print("\n[PIPELINE FAILED]")
+        sys.exit(1)
+    else:
+        print("\n[PIPELINE SUCCESS]")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
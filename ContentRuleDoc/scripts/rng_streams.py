@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Deterministic RNG Streams for WordRun! level generation.
+
+Every (tier, nation, level) gets its own random.Random, seeded from a hash
+of (seed, tier, nation, level):
+- Streams are independent: a level's start words and tie-breaks do not
+  depend on how many attempts earlier levels needed, on worker count, or
+  on which other levels are being (re)generated
+- Setup is O(1): any single level can be regenerated on its own
+- The global `random` module is never reseeded
+"""
+
+import hashlib
+import random
+from typing import Optional
+
+
+def stream_seed(seed: int, *key) -> int:
+    """64-bit seed for the stream identified by (seed, *key)."""
+    text = ":".join(str(part) for part in (seed,) + key)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def level_rng(seed: int, tier: int, nation: Optional[str], level: int, revision: int = 0) -> random.Random:
+    """Independent generator for one level (revision > 0: for a regenerated level)."""
+    if revision:
+        return random.Random(stream_seed(seed, tier, nation or "", level, revision))
+    return random.Random(stream_seed(seed, tier, nation or "", level))
@@ -20,23 +20,32 @@ Tier Enforcement:
 - Tier 3+ → no PFS restriction
 """
 
+import argparse
 import csv
 import json
 import re
+import sys
 import time
 import urllib.request
 import urllib.parse
+from bisect import bisect_left, insort
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 import statistics
 
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ngram_fetcher import CORPUS, END_YEAR, NGRAMS_URL, START_YEAR, NgramFetcher
+from frequency_store import FrequencyStore, open_store
+
 # Paths
 DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data")
 PHRASES_DIR = DATA_DIR / "phrases"
 INPUT_FILE = PHRASES_DIR / "phrases_master_pfs.csv"
 OUTPUT_FILE = PHRASES_DIR / "phrases_spoken_pfs.csv"
-CACHE_FILE = PHRASES_DIR / "ngram_cache.json"
+STORE_FILE = PHRASES_DIR / "frequency_store.db"
 AUDIT_FILE = DATA_DIR / "tier1_frequency_audit.md"
 
 
@@ -52,7 +61,7 @@ class PhraseFrequency:
     source: str       # Data source used
 
 
-def query_google_ngrams(phrase: str, start_year: int = 2000, end_year: int = 2019) -> Optional[int]:
+def query_google_ngrams(phrase: str, start_year: int = START_YEAR, end_year: int = END_YEAR) -> Optional[int]:
     """
     Query Google Ngrams for bigram frequency.
 
@@ -70,7 +79,7 @@ def query_google_ngrams(phrase: str, start_year: int = 2000, end_year: int = 201
         "content": clean_phrase,
         "year_start": start_year,
         "year_end": end_year,
-        "corpus": "en-US-2019",  # American English
+        "corpus": CORPUS,  # American English
         "smoothing": 0,
     }
     url = f"{base_url}?{urllib.parse.urlencode(params)}"
@@ -105,27 +114,60 @@ def query_google_ngrams(phrase: str, start_year: int = 2000, end_year: int = 201
         return None
 
 
-def load_cache() -> Dict[str, int]:
-    """Load cached frequency data."""
-    if CACHE_FILE.exists():
-        with open(CACHE_FILE, "r") as f:
-            return json.load(f)
-    return {}
+def load_cache(store: FrequencyStore) -> Dict[str, int]:
+    """Load cached frequency data from the frequency store."""
+    return store.all_counts()
 
 
-def save_cache(cache: Dict[str, int]):
-    """Save frequency cache."""
-    with open(CACHE_FILE, "w") as f:
-        json.dump(cache, f, indent=2)
+def save_counts(store: FrequencyStore, counts: Dict[str, int]):
+    """Commit fetched counts with their query window."""
+    store.put_counts(counts, source="google_ngrams", year_start=START_YEAR, year_end=END_YEAR, corpus=CORPUS)
 
 
 def calculate_percentile(value: int, all_values: List[int]) -> float:
     """Calculate percentile rank of a value within a distribution."""
-    if not all_values:
-        return 50.0
-    sorted_values = sorted(all_values)
-    rank = sum(1 for v in sorted_values if v < value)
-    return (rank / len(sorted_values)) * 100
+    return PercentileRanker(all_values).percentile(value)
+
+
+class PercentileRanker:
+    """
+    Percentile ranks over a multiset of counts.
+
+    Sorted once (O(N log N)); each lookup is a binary search. Percentile is
+    the share of values strictly below the value, so ties share a rank (same
+    semantics as the original linear count). Counts can be added, removed or
+    replaced as new frequencies arrive without re-sorting.
+    """
+
+    def __init__(self, values: List[int] = ()):
+        self._sorted = sorted(values)
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def add(self, value: int):
+        insort(self._sorted, value)
+
+    def remove(self, value: int):
+        i = bisect_left(self._sorted, value)
+        if i == len(self._sorted) or self._sorted[i] != value:
+            raise ValueError(f"{value} not in ranker")
+        del self._sorted[i]
+
+    def replace(self, old_value: int, new_value: int):
+        self.remove(old_value)
+        self.add(new_value)
+
+    def percentile(self, value: int) -> float:
+        if not self._sorted:
+            return 50.0
+        return (bisect_left(self._sorted, value) / len(self._sorted)) * 100
+
+
+def percentile_ranks(values: List[int]) -> List[float]:
+    """Percentile rank of every value in `values` (one sort for the batch)."""
+    ranker = PercentileRanker(values)
+    return [ranker.percentile(v) for v in values]
 
 
 def percentile_to_pfs(percentile: float) -> int:
@@ -171,11 +213,17 @@ def get_tier1_phrases(phrases: List[dict]) -> List[dict]:
     return tier1
 
 
-def query_frequencies_batch(phrases: List[dict], cache: Dict[str, int], limit: int = None) -> Dict[str, int]:
+def query_frequencies_batch(
+    phrases: List[dict],
+    cache: Dict[str, int],
+    store: FrequencyStore,
+    limit: int = None
+) -> Dict[str, int]:
     """
     Query frequencies for a batch of phrases.
 
-    Uses cache to avoid redundant queries.
+    Uses cache to avoid redundant queries. Each result is committed to the
+    store as soon as it arrives.
     """
     frequencies = {}
     queries_made = 0
@@ -192,24 +240,76 @@ def query_frequencies_batch(phrases: List[dict], cache: Dict[str, int], limit: i
         print(f"  [{i+1}/{len(phrase_list)}] Querying: {phrase}")
 
         freq = query_google_ngrams(phrase)
-        if freq is not None:
-            frequencies[phrase] = freq
-            cache[phrase] = freq
-        else:
+        if freq is None:
             # Mark as queried but failed
-            frequencies[phrase] = 0
-            cache[phrase] = 0
+            freq = 0
+        frequencies[phrase] = freq
+        cache[phrase] = freq
+        save_counts(store, {phrase: freq})
 
         queries_made += 1
 
         # Rate limiting
         if queries_made % 10 == 0:
-            save_cache(cache)
             time.sleep(1)  # Be respectful to the API
 
     return frequencies
 
 
+def query_frequencies_async(
+    phrases: List[dict],
+    cache: Dict[str, int],
+    store: FrequencyStore,
+    limit: int = None,
+    base_url: str = NGRAMS_URL,
+    verify_ssl: bool = True
+) -> Dict[str, int]:
+    """
+    Query frequencies with the batched, concurrent, rate-limited fetcher.
+
+    Cached phrases are not re-queried. Each completed batch is committed to
+    the store. Unlike the curl path, phrases whose request failed are reported
+    as 0 but not cached, so a rerun retries them. TLS certificates are
+    verified unless verify_ssl is False (--insecure).
+    """
+    phrase_list = phrases[:limit] if limit else phrases
+    frequencies = {}
+    missing = []
+    for p in phrase_list:
+        phrase = p["phrase"].lower().strip()
+        if phrase in cache:
+            frequencies[phrase] = cache[phrase]
+        else:
+            missing.append(phrase)
+
+    print(f"  {len(frequencies)} cached, {len(missing)} to query")
+    if not missing:
+        return frequencies
+
+    last_report = time.monotonic()
+    done = 0
+
+    def on_batch(batch_results: Dict[str, Optional[int]]):
+        nonlocal last_report, done
+        done += len(batch_results)
+        counts = {phrase: count for phrase, count in batch_results.items() if count is not None}
+        cache.update(counts)
+        save_counts(store, counts)
+        if time.monotonic() - last_report >= 5.0:
+            last_report = time.monotonic()
+            print(f"  [{done}/{len(missing)}] queried")
+
+    fetcher = NgramFetcher(base_url=base_url, verify_ssl=verify_ssl)
+    results = fetcher.fetch_sync(missing, on_batch)
+    for phrase, count in results.items():
+        frequencies[phrase] = count if count is not None else 0
+
+    stats = fetcher.stats
+    print(f"  {stats.phrases} phrases in {stats.requests} requests, {stats.retries} retries, "
+          f"{stats.failed_batches} failed batches, {stats.seconds:.1f}s")
+    return frequencies
+
+
 def generate_audit_table(
     phrases: List[dict],
     frequencies: Dict[str, int],
@@ -219,13 +319,11 @@ def generate_audit_table(
 
     # Calculate all percentiles
     all_counts = [frequencies.get(p["phrase"].lower(), 0) for p in phrases]
+    percentiles = percentile_ranks(all_counts)
 
     # Build results
     results = []
-    for p in phrases:
-        phrase = p["phrase"].lower()
-        count = frequencies.get(phrase, 0)
-        percentile = calculate_percentile(count, all_counts)
+    for p, count, percentile in zip(phrases, all_counts, percentiles):
         pfs = percentile_to_pfs(percentile)
 
         results.append({
@@ -294,13 +392,11 @@ def update_phrases_csv(phrases: List[dict], frequencies: Dict[str, int]):
     """Update phrases CSV with new spoken PFS values."""
 
     all_counts = [frequencies.get(p["phrase"].lower(), 0) for p in phrases]
+    percentiles = percentile_ranks(all_counts)
 
     # Add new columns
     updated_rows = []
-    for p in phrases:
-        phrase = p["phrase"].lower()
-        count = frequencies.get(phrase, 0)
-        percentile = calculate_percentile(count, all_counts)
+    for p, count, percentile in zip(phrases, all_counts, percentiles):
         pfs = percentile_to_pfs(percentile)
 
         row = dict(p)
@@ -322,6 +418,13 @@ def update_phrases_csv(phrases: List[dict], frequencies: Dict[str, int]):
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Score spoken PFS from Google Ngrams.")
+    parser.add_argument("--limit", type=int, default=None, help="only score the first N candidates")
+    parser.add_argument("--base-url", default=NGRAMS_URL, help="ngrams endpoint (e.g. the ngram_fetcher mock)")
+    parser.add_argument("--legacy", action="store_true", help="sequential curl queries")
+    parser.add_argument("--insecure", action="store_true", help="skip TLS certificate verification")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("SPOKEN CORPUS PFS GENERATOR")
     print("=" * 60)
@@ -346,19 +449,24 @@ def main():
         print(f"Filtered Tier 1 candidates: {len(tier1_phrases)}")
 
     # Load cache
-    cache = load_cache()
-    print(f"Cached frequencies: {len(cache)}")
+    store = open_store(STORE_FILE)
+    cache = load_cache(store)
+    print(f"Cached frequencies: {len(cache)} ({STORE_FILE.name})")
 
-    # Query frequencies (limit for initial run)
+    # Query frequencies
     print("\nQuerying Google Ngrams...")
-    frequencies = query_frequencies_batch(tier1_phrases, cache, limit=100)
-
-    # Save cache
-    save_cache(cache)
+    if args.legacy:
+        frequencies = query_frequencies_batch(tier1_phrases, cache, store, limit=args.limit)
+    else:
+        frequencies = query_frequencies_async(
+            tier1_phrases, cache, store, limit=args.limit, base_url=args.base_url, verify_ssl=not args.insecure
+        )
+    store.close()
 
     # Generate audit table
     print("\nGenerating audit table...")
-    results = generate_audit_table(tier1_phrases[:100], frequencies, AUDIT_FILE)
+    scored_phrases = tier1_phrases[:args.limit] if args.limit else tier1_phrases
+    results = generate_audit_table(scored_phrases, frequencies, AUDIT_FILE)
 
     # Summary
     passing = sum(1 for r in results if r["pfs"] >= 4)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Synthetic Phrase Bank Generator for WordRun!
+
+Emits stress datasets in the pipeline's own formats so every stage can
+consume them unchanged:
+- phrases_master.csv      (UNIFIED_SCHEMA, input to calculate_ces)
+- phrases_master_pfs.csv  (UNIFIED_SCHEMA + level_tier, input to the pathfinder
+                           and generators; compiled index built alongside)
+- batch*_*.csv            (optional, input to merge_phrases)
+- spoken_pfs_manual.json  (spoken PFS per phrase, read by early_filter)
+
+Tunable:
+- word count and phrase count (average degree = phrases / words)
+- out-degree distribution: regular, poisson, powerlaw (Zipf-like hubs)
+- entropy (CES) distribution, category mix, spoken PFS distribution
+
+Words are random letter strings, phrases are distinct (word1, word2) pairs.
+Output is deterministic for a given seed.
+"""
+
+import argparse
+import csv
+import json
+import random
+import sys
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import List, Dict
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from merge_phrases import BATCH_FILES, UNIFIED_SCHEMA, convert_pfs_from_frequency
+from calculate_pfs import calculate_pfs, get_level_tier
+from phrase_index import build_index
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data")
+OUTPUT_DIR = DATA_DIR / "synthetic"
+
+DEGREE_DISTRIBUTIONS = ("regular", "poisson", "powerlaw")
+
+# Defaults roughly follow the real bank: mostly CES 1-2, Tier 1-2 categories dominant
+DEFAULT_ENTROPY_WEIGHTS = {1: 0.50, 2: 0.25, 3: 0.12, 4: 0.08, 5: 0.03, 6: 0.02}
+DEFAULT_CATEGORY_WEIGHTS = {
+    "household": 0.15, "food": 0.15, "object": 0.12, "transport": 0.10,
+    "nature": 0.08, "animal": 0.06, "clothing": 0.05, "drink": 0.04,
+    "commerce": 0.08, "technology": 0.06, "social": 0.06, "sports": 0.05,
+}
+DEFAULT_SPOKEN_PFS_WEIGHTS = {1: 0.10, 2: 0.15, 3: 0.25, 4: 0.30, 5: 0.20}
+
+
+@dataclass
+class SyntheticConfig:
+    """Shape of a synthetic phrase bank."""
+    num_phrases: int = 10000
+    num_words: int = 3000
+    degree_distribution: str = "poisson"
+    powerlaw_alpha: float = 1.1          # word1 weight = rank ** -alpha
+    entropy_weights: Dict[int, float] = field(default_factory=lambda: dict(DEFAULT_ENTROPY_WEIGHTS))
+    category_weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_CATEGORY_WEIGHTS))
+    spoken_pfs_weights: Dict[int, float] = field(default_factory=lambda: dict(DEFAULT_SPOKEN_PFS_WEIGHTS))
+    seed: int = 42
+
+
+# =============================================================================
+# GENERATION
+# =============================================================================
+
+def _random_words(rng: random.Random, count: int) -> List[str]:
+    """Distinct random lowercase words, 3-8 letters."""
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 8))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def _weighted_sampler(rng: random.Random, weights: Dict):
+    """Return a zero-argument sampler over a {value: weight} dict."""
+    values = list(weights)
+    cum_weights = list(accumulate(weights[v] for v in values))
+    total = cum_weights[-1]
+    return lambda: values[bisect_left(cum_weights, rng.random() * total)]
+
+
+def _word1_sequence(rng: random.Random, config: SyntheticConfig, words: List[str]):
+    """Yield word1 choices following the configured out-degree distribution."""
+    if config.degree_distribution == "regular":
+        while True:
+            for word in words:
+                yield word
+    elif config.degree_distribution == "poisson":
+        while True:
+            yield words[rng.randrange(len(words))]
+    elif config.degree_distribution == "powerlaw":
+        cum_weights = list(accumulate((rank + 1) ** -config.powerlaw_alpha for rank in range(len(words))))
+        total = cum_weights[-1]
+        while True:
+            yield words[bisect_left(cum_weights, rng.random() * total)]
+    else:
+        raise ValueError(f"Unknown degree distribution: {config.degree_distribution} (expected one of {DEGREE_DISTRIBUTIONS})")
+
+
+def generate_bank(config: SyntheticConfig) -> List[dict]:
+    """
+    Generate a synthetic bank as UNIFIED_SCHEMA rows plus "spoken_pfs".
+
+    Returns:
+        Rows sorted by phrase, as merge_phrases writes them
+    """
+    max_pairs = config.num_words * (config.num_words - 1)
+    if config.num_phrases > max_pairs:
+        raise ValueError(f"{config.num_phrases} phrases impossible with {config.num_words} words (max {max_pairs})")
+
+    rng = random.Random(config.seed)
+    words = _random_words(rng, config.num_words)
+    sample_entropy = _weighted_sampler(rng, config.entropy_weights)
+    sample_category = _weighted_sampler(rng, config.category_weights)
+    sample_spoken_pfs = _weighted_sampler(rng, config.spoken_pfs_weights)
+
+    pairs = set()
+    rows = []
+    attempts = 0
+    max_attempts = config.num_phrases * 50
+    word1_sequence = _word1_sequence(rng, config, words)
+
+    while len(rows) < config.num_phrases:
+        attempts += 1
+        if attempts > max_attempts:
+            raise ValueError(
+                f"Could not place {config.num_phrases} distinct phrases; "
+                f"degree distribution too skewed for {config.num_words} words"
+            )
+        word1 = next(word1_sequence)
+        word2 = words[rng.randrange(len(words))]
+        if word1 == word2 or (word1, word2) in pairs:
+            continue
+        pairs.add((word1, word2))
+
+        bigram_frequency = rng.choice(["high", "medium", "low"])
+        abstraction_level = rng.choice(["concrete", "concrete", "semi-abstract", "abstract"])
+        entropy = sample_entropy()
+        rows.append({
+            "phrase": f"{word1} {word2}",
+            "word1": word1,
+            "word2": word2,
+            "bigram_frequency": bigram_frequency,
+            "avg_zipf": round(rng.uniform(3.5, 6.5), 1),
+            "PFS": convert_pfs_from_frequency(bigram_frequency),
+            "CES_estimate": entropy,
+            "concreteness_score": round(rng.uniform(0.3, 1.0), 1),
+            "abstraction_level": abstraction_level,
+            "tone_tag": "neutral",
+            "category_tag": sample_category(),
+            "difficulty_score": 20.0,
+            "entropy": entropy,
+            "familiarity": 4,
+            "spoken_pfs": sample_spoken_pfs(),
+        })
+
+    rows.sort(key=lambda x: x["phrase"].lower())
+    return rows
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def write_master(rows: List[dict], path: Path):
+    """Write phrases_master.csv (UNIFIED_SCHEMA)."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=UNIFIED_SCHEMA, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_scored(rows: List[dict], path: Path) -> Path:
+    """Write phrases_master_pfs.csv (PFS + level_tier) and its compiled index."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=UNIFIED_SCHEMA + ["level_tier"], extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            pfs = calculate_pfs(row["phrase"], row["bigram_frequency"], row["avg_zipf"], row["concreteness_score"])
+            writer.writerow(dict(row, PFS=pfs, level_tier=get_level_tier(pfs)))
+    return build_index(path)
+
+
+def write_batches(rows: List[dict], output_dir: Path):
+    """Split rows round-robin across the batch files merge_phrases reads."""
+    handles = [open(output_dir / name, "w", newline="", encoding="utf-8") for name in BATCH_FILES]
+    writers = [csv.DictWriter(f, fieldnames=UNIFIED_SCHEMA, extrasaction="ignore") for f in handles]
+    for writer in writers:
+        writer.writeheader()
+    for i, row in enumerate(rows):
+        writers[i % len(writers)].writerow(row)
+    for f in handles:
+        f.close()
+
+
+def write_spoken_pfs(rows: List[dict], path: Path):
+    """Write the spoken PFS lookup early_filter reads."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({row["phrase"]: row["spoken_pfs"] for row in rows}, f)
+
+
+def degree_summary(rows: List[dict]) -> Dict[str, float]:
+    """Out-degree statistics of a generated bank."""
+    out_degree: Dict[str, int] = {}
+    words = set()
+    for row in rows:
+        out_degree[row["word1"]] = out_degree.get(row["word1"], 0) + 1
+        words.add(row["word1"])
+        words.add(row["word2"])
+    degrees = sorted(out_degree.values())
+    return {
+        "words": len(words),
+        "avg_out_degree": round(len(rows) / len(words), 2) if words else 0,
+        "median_out_degree": degrees[len(degrees) // 2] if degrees else 0,
+        "max_out_degree": degrees[-1] if degrees else 0,
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic phrase bank.")
+    parser.add_argument("--phrases", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=3000)
+    parser.add_argument("--degree", choices=DEGREE_DISTRIBUTIONS, default="poisson", help="out-degree distribution")
+    parser.add_argument("--alpha", type=float, default=1.1, help="power-law exponent")
+    parser.add_argument("--entropy", default="", help="CES weights, e.g. 1:0.6,2:0.3,3:0.1")
+    parser.add_argument("--categories", default="", help="category weights, e.g. food:2,household:1")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batches", action="store_true", help="also write batch CSVs for merge_phrases")
+    parser.add_argument("--out", type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    config = SyntheticConfig(
+        num_phrases=args.phrases,
+        num_words=args.words,
+        degree_distribution=args.degree,
+        powerlaw_alpha=args.alpha,
+        seed=args.seed,
+    )
+    if args.entropy:
+        config.entropy_weights = {int(k): float(v) for k, v in (item.split(":") for item in args.entropy.split(","))}
+    if args.categories:
+        config.category_weights = {k: float(v) for k, v in (item.split(":") for item in args.categories.split(","))}
+
+    print("=" * 60)
+    print("SYNTHETIC PHRASE BANK")
+    print("=" * 60)
+
+    rows = generate_bank(config)
+    args.out.mkdir(parents=True, exist_ok=True)
+    write_master(rows, args.out / "phrases_master.csv")
+    index_path = write_scored(rows, args.out / "phrases_master_pfs.csv")
+    write_spoken_pfs(rows, args.out / "spoken_pfs_manual.json")
+    if args.batches:
+        write_batches(rows, args.out)
+
+    summary = degree_summary(rows)
+    print(f"\nPhrases: {len(rows)}")
+    print(f"Words: {summary['words']}")
+    print(f"Out-degree ({config.degree_distribution}): avg {summary['avg_out_degree']}, "
+          f"median {summary['median_out_degree']}, max {summary['max_out_degree']}")
+    print(f"\nOutput written to: {args.out}")
+    print(f"Index written to: {index_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Theme Tagging for WordRun! (ContentRuleDoc.md §6.3-6.4)
+
+Tags every phrase of the master DB against every nation's keyword lexicon
+in one pass and writes a per-phrase nation bitmask (bit i = nation i of
+NATION_ABSTRACTIONS; set if word1 or word2 is in that nation's lexicon).
+
+§6.4 match rule: case-insensitive exact match on word1 or word2, no partial
+matches. The lexicons are compiled into one keyword -> nation-mask table,
+resolved once per graph word (index word IDs), so a phrase costs two
+lookups however many nations and keywords there are:
+    word_masks[word_id] = OR of the masks of its keyword
+    mask[phrase]        = word_masks[word1] | word_masks[word2]
+
+Incremental: the tags file records the lexicons it was built from. When a
+lexicon changes, only phrases containing an added or removed keyword are
+re-tagged (found through the index's word -> phrase CSR). A changed source
+CSV forces a full pass.
+
+Output: <csv>.themes.json next to the phrase CSV. Generation stages read it
+through phrase_theme_masks() and hand the masks to
+level_constraints.constraints_for(), so §10.4 theme density uses these tags.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from level_constraints import NATION_ABSTRACTIONS, NATION_BITS, NATION_LEXICONS
+from pathfinder import intern_phrase, num_phrase_ids
+from phrase_index import PhraseIndex, open_index
+
+# Paths
+DATA_DIR = Path("/Users/nathanielgiddens/WordRunGame/ContentRuleDoc/data/phrases")
+INPUT_FILE = DATA_DIR / "phrases_master_pfs.csv"
+
+THEMES_SUFFIX = ".themes.json"
+THEMES_VERSION = 1
+
+
+def themes_path_for(csv_path: Path) -> Path:
+    """Return the theme tags path that sits next to a phrase CSV."""
+    return Path(csv_path).with_suffix(THEMES_SUFFIX)
+
+
+# =============================================================================
+# TAGGING
+# =============================================================================
+
+def compile_lexicons(lexicons: Dict[str, Iterable[str]]) -> Dict[str, int]:
+    """keyword -> mask of the nations whose lexicon contains it."""
+    keyword_masks: Dict[str, int] = {}
+    for nation, keywords in lexicons.items():
+        for keyword in keywords:
+            keyword = keyword.lower()
+            keyword_masks[keyword] = keyword_masks.get(keyword, 0) | NATION_BITS[nation]
+    return keyword_masks
+
+
+def word_masks_for(index: PhraseIndex, keyword_masks: Dict[str, int]) -> array:
+    """Nation mask of every graph word (keywords missing from the DB are skipped)."""
+    word_masks = array("I", [0]) * index.num_words
+    for keyword, mask in keyword_masks.items():
+        word_id = index.word_id(keyword)
+        if word_id is not None:
+            word_masks[word_id] |= mask
+    return word_masks
+
+
+def tag_phrases(index: PhraseIndex, keyword_masks: Dict[str, int]) -> array:
+    """Nation mask of every row, in CSV order (invalid rows are 0)."""
+    word_masks = word_masks_for(index, keyword_masks)
+    return array("I", (
+        (word_masks[w1] | word_masks[w2]) if ok else 0
+        for w1, w2, ok in zip(index.word1, index.word2, index.valid)
+    ))
+
+
+def retag_phrases(
+    index: PhraseIndex,
+    masks: array,
+    old_lexicons: Dict[str, FrozenSet[str]],
+    new_lexicons: Dict[str, FrozenSet[str]]
+) -> int:
+    """
+    Update masks in place for a lexicon change.
+
+    Returns:
+        Number of phrases re-tagged
+    """
+    changed: Set[str] = set()
+    for nation in set(old_lexicons) | set(new_lexicons):
+        changed |= old_lexicons.get(nation, frozenset()) ^ new_lexicons.get(nation, frozenset())
+
+    affected: Set[int] = set()
+    for keyword in changed:
+        word_id = index.word_id(keyword)
+        if word_id is not None:
+            affected.update(index.outgoing(word_id))
+            affected.update(index.incoming(word_id))
+
+    word_masks = word_masks_for(index, compile_lexicons(new_lexicons))
+    word1, word2 = index.word1, index.word2
+    for pid in affected:
+        masks[pid] = word_masks[word1[pid]] | word_masks[word2[pid]]
+    return len(affected)
+
+
+def tagged_phrases(masks: array, nation: str) -> List[int]:
+    """Row IDs tagged for a nation."""
+    bit = NATION_BITS[nation]
+    return [pid for pid, mask in enumerate(masks) if mask & bit]
+
+
+# =============================================================================
+# TAGS FILE
+# =============================================================================
+
+def load_theme_tags(csv_path: Path) -> Optional[Tuple[array, Dict[str, FrozenSet[str]], bool]]:
+    """
+    Theme tags written for a phrase CSV.
+
+    Returns:
+        (masks, lexicons, current) or None if absent or unreadable;
+        current is False if the CSV changed since the tags were written
+    """
+    path = themes_path_for(csv_path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != THEMES_VERSION or data.get("nations") != list(NATION_BITS):
+        return None
+    stat = Path(csv_path).stat()
+    current = data["source_size"] == stat.st_size and data["source_mtime_ns"] == stat.st_mtime_ns
+    lexicons = {nation: frozenset(keywords) for nation, keywords in data["lexicons"].items()}
+    return array("I", data["masks"]), lexicons, current
+
+
+def write_theme_tags(csv_path: Path, masks: array, lexicons: Dict[str, FrozenSet[str]]) -> Path:
+    """Write theme tags atomically."""
+    path = themes_path_for(csv_path)
+    stat = Path(csv_path).stat()
+    data = {
+        "version": THEMES_VERSION,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "nations": list(NATION_BITS),
+        "lexicons": {nation: sorted(keywords) for nation, keywords in lexicons.items()},
+        "masks": masks.tolist(),
+    }
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def update_theme_tags(
+    csv_path: Path = INPUT_FILE,
+    lexicons: Dict[str, FrozenSet[str]] = NATION_LEXICONS,
+    full: bool = False
+) -> array:
+    """Bring a CSV's theme tags up to date, re-tagging only what changed."""
+    start_time = time.time()
+    previous = None if full else load_theme_tags(csv_path)
+
+    with open_index(csv_path) as index:
+        if previous is not None and previous[2] and len(previous[0]) == len(index):
+            masks, old_lexicons, _ = previous
+            if old_lexicons == lexicons:
+                print(f"  Theme tags up to date ({len(masks)} phrases)")
+                return masks
+            retagged = retag_phrases(index, masks, old_lexicons, lexicons)
+            print(f"  Lexicons changed: re-tagged {retagged} of {len(masks)} phrases")
+        else:
+            masks = tag_phrases(index, compile_lexicons(lexicons))
+            print(f"  Tagged {len(masks)} phrases against {len(lexicons)} nation lexicons")
+
+    path = write_theme_tags(csv_path, masks, lexicons)
+    print(f"  Wrote: {path} ({time.time() - start_time:.2f}s)")
+
+    print("\n  Tagged phrases per nation:")
+    for nation in NATION_BITS:
+        if nation in lexicons:
+            print(f"    {nation:<12} {NATION_ABSTRACTIONS[nation][1]:<12} {len(tagged_phrases(masks, nation)):5d}")
+    multi = sum(1 for mask in masks if mask & (mask - 1))
+    print(f"  Phrases tagged for more than one nation: {multi}")
+    return masks
+
+
+def phrase_theme_masks(csv_path: Path = INPUT_FILE, lexicons: Dict[str, FrozenSet[str]] = NATION_LEXICONS) -> array:
+    """
+    Theme masks indexed by interned phrase ID (Phrase.phrase_id), for
+    LevelConstraints. The tags file is only rewritten if it is out of date.
+    """
+    previous = load_theme_tags(csv_path)
+    if previous is not None and previous[2] and previous[1] == lexicons:
+        masks = previous[0]
+    else:
+        masks = update_theme_tags(csv_path, lexicons)
+
+    with open_index(csv_path) as index:
+        phrase_ids = [intern_phrase(index.value(pid, "phrase")) if index.valid[pid] else -1 for pid in range(len(index))]
+    by_id = array("I", [0]) * num_phrase_ids()
+    for phrase_id, mask in zip(phrase_ids, masks):
+        if phrase_id >= 0:
+            by_id[phrase_id] |= mask
+    return by_id
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Tag the phrase DB against the §6.4 nation lexicons.")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE)
+    parser.add_argument("--full", action="store_true", help="re-tag every phrase")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("THEME TAGGING")
+    print("=" * 60)
+
+    update_theme_tags(args.input, full=args.full)
+
+
+if __name__ == "__main__":
+    main()
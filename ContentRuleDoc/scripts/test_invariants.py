@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Invariant tests for the level-generation scripts.
+
+Covers the places where an optimized path must agree with a simpler one:
+- PhraseReuseTracker.get_blocked_bitset vs can_use_phrase, across the
+  level-20 rule and the reuse window (including queries behind it)
+- PhraseBitset checkpoint()/rollback() restoring membership
+- PhraseReuseTracker.from_state(to_state()) blocking the same phrases
+- calculate_ces_batch vs the per-phrase reference calculate_ces()
+- generate_levels resumed from a checkpoint vs an uninterrupted run
+- ProfanityFilter vs the rules of scripts/tools/profanity_filter.gd
+
+Run from ContentRuleDoc/scripts:
+    python -m pytest -q test_invariants.py
+"""
+
+import json
+import logging
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import early_filter
+import generate_early_levels
+import pathfinder
+from calculate_ces import KNOWN_BIGRAMS, build_corpus_bigrams, calculate_ces, calculate_ces_batch
+from early_filter import PhraseReuseTracker
+from pathfinder import PhraseBitset
+from profanity_filter import ProfanityFilter
+from synthetic_bank import SyntheticConfig, generate_bank, write_scored, write_spoken_pfs
+
+# Paths
+PROFANITY_FILE = Path(__file__).resolve().parents[2] / "data" / "filters" / "profanity_v1.json"
+
+
+def _random_word(rng: random.Random, alphabet: str = "abcdefgh", max_length: int = 4) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(1, max_length)))
+
+
+# =============================================================================
+# PHRASE REUSE
+# =============================================================================
+
+def _random_tracker(seed: int, last_level: int = 45) -> PhraseReuseTracker:
+    """Tracker fed level by level, the way the generators feed it."""
+    rng = random.Random(seed)
+    pool = [f"reuse{seed} {i}" for i in range(60)]
+    tracker = PhraseReuseTracker()
+    for level in range(1, last_level + 1):
+        for phrase in rng.sample(pool, 5):
+            tracker.mark_used(phrase, level)
+    return tracker
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_blocked_bitset_matches_can_use_phrase(seed):
+    tracker = _random_tracker(seed)
+    phrases = list(tracker.phrase_last_used)
+    # 1..20 (first-20 rule), the window edges after 20, and levels behind the window
+    for level in range(1, 60):
+        blocked = tracker.get_blocked_bitset(level)
+        for phrase in phrases:
+            assert (phrase in blocked) == (not tracker.can_use_phrase(phrase, level)), (phrase, level)
+
+
+def test_blocked_bitset_at_rule_boundaries():
+    tracker = PhraseReuseTracker()
+    tracker.mark_used("early bird", 5)
+    tracker.mark_used("late show", 21)
+
+    assert "early bird" in tracker.get_blocked_bitset(20)       # first-20 rule
+    assert "early bird" not in tracker.get_blocked_bitset(21)   # 16 levels later
+    assert "late show" in tracker.get_blocked_bitset(30)        # gap 9
+    assert "late show" not in tracker.get_blocked_bitset(31)    # gap 10
+
+
+def test_tracker_state_round_trip():
+    tracker = _random_tracker(7)
+    restored = PhraseReuseTracker.from_state(json.loads(json.dumps(tracker.to_state())))
+    for level in range(1, 60):
+        assert restored.get_blocked_phrases(level) == tracker.get_blocked_phrases(level), level
+
+
+# =============================================================================
+# PHRASE BITSET
+# =============================================================================
+
+def test_bitset_rollback_restores_membership():
+    rng = random.Random(3)
+    pool = [f"bitset {i}" for i in range(40)]
+    bits = PhraseBitset(pool[:10])
+    snapshots = []
+    for _ in range(6):
+        snapshots.append((bits.checkpoint(), set(bits)))
+        for phrase in rng.sample(pool, 8):
+            if rng.random() < 0.5:
+                bits.add(phrase)
+            else:
+                bits.discard(phrase)
+
+    # Nested snapshots unwind innermost first
+    for mark, members in reversed(snapshots):
+        bits.rollback(mark)
+        assert set(bits) == members
+        assert all((phrase in bits) == (phrase in members) for phrase in pool)
+
+
+# =============================================================================
+# CES
+# =============================================================================
+
+def test_batch_ces_matches_reference():
+    rng = random.Random(11)
+    starters = list(KNOWN_BIGRAMS)[:20] + [_random_word(rng) for _ in range(20)]
+    phrases = []
+    for _ in range(2000):
+        word1 = rng.choice(starters)
+        word2 = _random_word(rng, "abcdefghijklmnopqrstuvwxyz", 6)
+        if rng.random() < 0.1:
+            word1 = word1.upper()
+        if rng.random() < 0.02:
+            word2 = ""
+        phrases.append({"word1": word1, "word2": word2})
+
+    corpus_bigrams = build_corpus_bigrams(phrases)
+    expected = [calculate_ces(p["word1"], p["word2"], corpus_bigrams) for p in phrases]
+    assert calculate_ces_batch(phrases, mode="known_bigrams") == expected
+
+
+# =============================================================================
+# CHECKPOINT / RESUME
+# =============================================================================
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def small_bank(tmp_path, monkeypatch):
+    """A scored synthetic bank wired in as generate_early_levels' input."""
+    rows = generate_bank(SyntheticConfig(num_phrases=3000, num_words=1000))
+    input_file = tmp_path / "phrases_master_pfs.csv"
+    write_scored(rows, input_file)
+    write_spoken_pfs(rows, tmp_path / "spoken_pfs_manual.json")
+
+    monkeypatch.setattr(early_filter, "SPOKEN_PFS_FILE", tmp_path / "spoken_pfs_manual.json")
+    monkeypatch.setattr(early_filter, "STORE_FILE", tmp_path / "frequency_store.db")
+    monkeypatch.setattr(early_filter, "_SPOKEN_PFS_CACHE", {})
+    monkeypatch.setattr(generate_early_levels, "INPUT_FILE", input_file)
+    monkeypatch.setattr(generate_early_levels, "OUTPUT_FILE", tmp_path / "levels.json")
+    logging.disable(logging.WARNING)
+    yield tmp_path
+    logging.disable(logging.NOTSET)
+
+
+def test_resumed_run_matches_uninterrupted(small_bank, monkeypatch):
+    def generate(**kwargs):
+        return generate_early_levels.generate_levels(num_levels=12, tier=3, seed=7, **kwargs)
+
+    expected = generate(checkpoint=False)
+    assert expected is not None and len(expected["levels"]) == 12
+
+    # Interrupt partway through, after at least one checkpoint was written
+    checkpoint_file = small_bank / "levels.checkpoint.json"
+    find_path = pathfinder.Pathfinder.find_path
+    calls = []
+
+    def interrupted_find_path(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) > 9:
+            raise Interrupted
+        return find_path(self, *args, **kwargs)
+
+    monkeypatch.setattr(pathfinder.Pathfinder, "find_path", interrupted_find_path)
+    with pytest.raises(Interrupted):
+        generate(checkpoint_file=checkpoint_file, checkpoint_every=2)
+    monkeypatch.setattr(pathfinder.Pathfinder, "find_path", find_path)
+    assert checkpoint_file.exists()
+
+    resumed = generate(checkpoint_file=checkpoint_file, checkpoint_every=2)
+    assert resumed["levels"] == expected["levels"]
+    assert not checkpoint_file.exists()
+
+
+# =============================================================================
+# PROFANITY
+# =============================================================================
+
+def _gdscript_check_word(word, profanity, safe_words):
+    """Port of ProfanityFilter.check_word / _is_safe_context (profanity_filter.gd)."""
+    lower = word.lower()
+    if lower in safe_words:
+        return False
+    if lower in profanity:
+        return True
+    for profane in profanity:
+        if profane in lower:
+            if not any(profane in safe and safe in lower for safe in safe_words):
+                return True
+    return False
+
+
+def _gdscript_check_compound(word_a, word_b, profanity, safe_words):
+    return any(_gdscript_check_word(w, profanity, safe_words) for w in (word_a, word_b, word_a + word_b))
+
+
+def test_profanity_filter_matches_gdscript():
+    profanity = ["ass", "cock", "tit", "shit", "hell"]
+    safe_words = ["class", "assassin", "basement", "assist", "cockatoo", "peacock", "titmouse", "shitake", "hello", "shell"]
+    compiled = ProfanityFilter(profanity, safe_words)
+    rng = random.Random(5)
+    for _ in range(20000):
+        word1 = _random_word(rng, "aclsotkhiem", 7)
+        word2 = _random_word(rng, "aclsotkhiem", 7)
+        expected = _gdscript_check_compound(word1, word2, profanity, safe_words)
+        assert (compiled.check_phrase(word1, word2) is not None) == expected, (word1, word2)
+
+
+@pytest.mark.skipif(not PROFANITY_FILE.exists(), reason="profanity_v1.json not present")
+def test_profanity_filter_matches_gdscript_on_shipped_lists():
+    with open(PROFANITY_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    profanity = [w.lower() for w in data.get("profanity", [])]
+    safe_words = [w.lower() for w in data.get("safe_words", [])]
+    compiled = ProfanityFilter(profanity, safe_words)
+
+    words = safe_words + profanity + ["glass", "house", "pea", "sea", "room", "kitty", "sub", "ment"]
+    for word1 in words:
+        for word2 in words:
+            expected = _gdscript_check_compound(word1, word2, profanity, safe_words)
+            assert (compiled.check_phrase(word1, word2) is not None) == expected, (word1, word2)